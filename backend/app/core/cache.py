@@ -0,0 +1,143 @@
+# app/core/cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU cache with optional TTL.
+    get_or_build() coalesces concurrent misses: the first caller for a cold
+    key builds the value while later callers wait for it instead of
+    rebuilding it themselves (stampede protection).
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = None, name: str = "cache"):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._inflight: Dict[Hashable, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "builds": 0,
+            "coalesced": 0,
+            "build_errors": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+
+    # ----------------------------
+    # Basic operations
+    # ----------------------------
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            found, value = self._lookup(key)
+            self._counters["hits" if found else "misses"] += 1
+            return value if found else default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._store(key, value)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    # ----------------------------
+    # Read-through with stampede protection
+    # ----------------------------
+    def get_or_build(self, key: Hashable, build: Callable[[], Any], wait_timeout: float = 10.0) -> Any:
+        """
+        Returns the cached value for `key`, building it with `build()` on a
+        miss. Only one caller builds a cold key; concurrent callers block
+        (up to `wait_timeout`) and reuse its result. If the build fails or
+        times out, waiters fall back to building themselves.
+        """
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self._counters["hits"] += 1
+                return value
+            self._counters["misses"] += 1
+            pending = self._inflight.get(key)
+            if pending is None:
+                pending = self._inflight[key] = threading.Event()
+                owner = True
+            else:
+                self._counters["coalesced"] += 1
+                owner = False
+
+        if not owner:
+            pending.wait(wait_timeout)
+            with self._lock:
+                found, value = self._lookup(key)
+            if found:
+                return value
+            return self._build(key, build)
+
+        try:
+            return self._build(key, build)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            pending.set()
+
+    def _build(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        try:
+            value = build()
+        except Exception:
+            with self._lock:
+                self._counters["build_errors"] += 1
+            raise
+        with self._lock:
+            self._counters["builds"] += 1
+            self._store(key, value)
+        return value
+
+    # ----------------------------
+    # Internals (caller holds the lock)
+    # ----------------------------
+    def _lookup(self, key: Hashable):
+        entry = self._data.get(key)
+        if entry is None:
+            return False, None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            self._counters["expirations"] += 1
+            return False, None
+        self._data.move_to_end(key)
+        return True, value
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    # ----------------------------
+    # Metrics
+    # ----------------------------
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            c = dict(self._counters)
+            c["size"] = len(self._data)
+        lookups = c["hits"] + c["misses"]
+        c["name"] = self.name
+        c["max_entries"] = self.max_entries
+        c["hit_rate"] = c["hits"] / lookups if lookups else 0.0
+        return c
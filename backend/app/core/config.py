@@ -7,6 +7,92 @@ class Settings(BaseSettings):
     AI_SUMMARY_URL: str | None = None
     DATABASE_URL: str | None = None
 
+    # Event ingestion pipeline
+    EVENT_QUEUE_MAX_SIZE: int = 10000
+    EVENT_BATCH_SIZE: int = 500
+    EVENT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    EVENT_ENQUEUE_TIMEOUT_SECONDS: float = 0.05
+    EVENT_SHUTDOWN_TIMEOUT_SECONDS: float = 10.0
+
+    # Hot score decay half-life; changing it requires
+    # `python -m scripts.verify_hot_scores --fix`
+    HOT_SCORE_HALF_LIFE_HOURS: float = 72.0
+
+    # Write-behind for likes/answers/comments counters (per process)
+    COUNTER_WRITE_BEHIND: bool = True
+    COUNTER_FLUSH_INTERVAL_SECONDS: float = 1.0
+
+    # Assembled question card cache (per process)
+    QUESTION_CARD_CACHE_MAX_ENTRIES: int = 2048
+    QUESTION_CARD_CACHE_TTL_SECONDS: float = 300.0
+
+    # Viewer liked/disliked/reported flags per (user, target) (per process;
+    # other workers see a user's new reaction after at most the TTL)
+    VIEWER_REACTIONS_CACHE_MAX_ENTRIES: int = 100000
+    VIEWER_REACTIONS_CACHE_TTL_SECONDS: float = 30.0
+
+    # Resident 1h/24h/7d trending windows (per process); each worker tails
+    # the events table every poll interval
+    TRENDING_ENGINE_ENABLED: bool = True
+    TRENDING_POLL_INTERVAL_SECONDS: float = 5.0
+    TRENDING_TOP_N: int = 100
+    # How long an unseen event id below the tail position is waited for
+    TRENDING_GAP_TIMEOUT_SECONDS: float = 60.0
+    # "exact" keeps a sum per target; "sketch" keeps Count-Min + Space-Saving
+    # sketches whose size doesn't depend on the number of targets (also used
+    # by EventAggregator.top_n)
+    TRENDING_BACKEND: str = "exact"
+    # Count-Min overestimates by at most epsilon * window weight, with
+    # probability 1 - delta
+    TRENDING_SKETCH_EPSILON: float = 0.002
+    TRENDING_SKETCH_DELTA: float = 0.01
+    # Space-Saving counters per target type and time bucket
+    TRENDING_SKETCH_CAPACITY: int = 1000
+
+    # Resident index of the questions created in the last
+    # RECENT_INDEX_MAX_AGE_DAYS (per process) that feed and trending
+    # candidates are drawn from; each worker tails the events table
+    RECENT_INDEX_ENABLED: bool = True
+    RECENT_INDEX_MAX_AGE_DAYS: int = 30
+    RECENT_INDEX_POLL_INTERVAL_SECONDS: float = 2.0
+
+    # Newest questions scored by FeedBuilder's ranking="engagement"; only
+    # the returned page is hydrated
+    FEED_CANDIDATE_POOL: int = 200
+    # Fan-out on write: new questions are pushed into followers' inboxes,
+    # except from authors with more than FEED_FANOUT_MAX_FOLLOWERS followers,
+    # whose questions are pulled at read time instead
+    FEED_FANOUT_ENABLED: bool = True
+    FEED_INBOX_CAP: int = 500
+    FEED_FANOUT_MAX_FOLLOWERS: int = 10000
+    FEED_FANOUT_BATCH_SIZE: int = 1000
+    # Questions waiting for the fan-out worker (per process)
+    FEED_FANOUT_QUEUE_MAX_SIZE: int = 10000
+    # Ranked feeds are kept as snapshots that later pages slice; stored in
+    # the database (cursors work on any worker) with a per-process LRU front
+    FEED_SNAPSHOT_TTL_SECONDS: float = 900.0
+    FEED_SNAPSHOT_CACHE_MAX_ENTRIES: int = 10000
+    # Questions shown to a user, kept as one Bloom filter per time bucket;
+    # storage per user is at most FEED_SEEN_BUCKETS filters sized for
+    # FEED_SEEN_CAPACITY items at FEED_SEEN_ERROR_RATE (about 2.4 KB each
+    # at the defaults). FEED_SEEN_MODE: "demote" | "filter" | "off"
+    FEED_SEEN_MODE: str = "demote"
+    FEED_SEEN_BUCKET_HOURS: int = 24
+    FEED_SEEN_BUCKETS: int = 7
+    FEED_SEEN_CAPACITY: int = 2000
+    FEED_SEEN_ERROR_RATE: float = 0.01
+
+    # View/impression events are coalesced per (visitor, target, window)
+    # in each process and flushed as counts into the rollups and unique
+    # sketches; only a sample of windows is kept as raw events
+    VIEW_COALESCING_ENABLED: bool = True
+    VIEW_COALESCE_WINDOW_SECONDS: int = 300
+    VIEW_COALESCE_FLUSH_INTERVAL_SECONDS: float = 10.0
+    # Open windows held before an early flush
+    VIEW_COALESCE_MAX_ENTRIES: int = 100000
+    # Share of coalesced windows also written to `events` (0 disables the trail)
+    VIEW_SAMPLE_RATE: float = 0.01
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,119 @@
+# app/core/pagination.py
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple, Union
+
+from sqlalchemy import String, or_, type_coerce
+from sqlalchemy.orm import Query, Session
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+# ----------------------------
+# Cursor tokens
+# ----------------------------
+def encode_cursor(created_at: Union[datetime, str, None], row_id: int) -> str:
+    """
+    Opaque token for the position after (created_at, id). created_at is a
+    datetime, or the stored text on SQLite.
+    """
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+    raw = json.dumps([created_at, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[Optional[str], int]:
+    """
+    (created_at as ISO text, id); raises InvalidCursor for anything else.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        created_at, row_id = json.loads(raw)
+        if created_at is not None:
+            datetime.fromisoformat(created_at)
+        return created_at, int(row_id)
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor(f"invalid cursor: {token!r}") from exc
+
+
+# ----------------------------
+# Keyset pages
+# ----------------------------
+def paginate(
+    query: Query,
+    created_col,
+    id_col,
+    page_size: int,
+    cursor: Optional[str] = None,
+    page: int = 1,
+    descending: bool = True,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    One page of `query` (a single-entity query) ordered by (created_at, id).
+    With a cursor the query seeks straight past it (keyset), so every page
+    costs the same however deep; without one it falls back to `page` via
+    OFFSET for old clients. Either way returns (rows, next_cursor), with
+    next_cursor None on the last page.
+    """
+    # SQLite keeps DATETIME as text in two shapes (CURRENT_TIMESTAMP has no
+    # fraction, SQLAlchemy writes microseconds) that compare unequal for the
+    # same instant. Page on the stored text itself: it orders the same way
+    # and keeps the index usable.
+    stored_text = query.session.get_bind().dialect.name == "sqlite"
+    if stored_text:
+        query = query.add_columns(type_coerce(created_col, String).label("_keyset_created"))
+
+    if cursor:
+        after_created, after_id = decode_cursor(cursor)
+        if after_created is not None:
+            bound = type_coerce(after_created, String) if stored_text else datetime.fromisoformat(after_created)
+            # The leading range on created_at is what lets the index seek
+            if descending:
+                query = query.filter(created_col <= bound, or_(created_col < bound, id_col < after_id))
+            else:
+                query = query.filter(created_col >= bound, or_(created_col > bound, id_col > after_id))
+        else:
+            query = query.filter(id_col < after_id if descending else id_col > after_id)
+
+    if descending:
+        query = query.order_by(created_col.desc(), id_col.desc())
+    else:
+        query = query.order_by(created_col.asc(), id_col.asc())
+    if not cursor and page > 1:
+        query = query.offset((page - 1) * page_size)
+
+    rows = query.limit(page_size + 1).all()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if stored_text:
+        last_created = rows[-1][1] if rows else None
+        rows = [row[0] for row in rows]
+    elif rows:
+        last_created = getattr(rows[-1], created_col.key)
+
+    if not has_more:
+        return rows, None
+    return rows, encode_cursor(last_created, getattr(rows[-1], id_col.key))
+
+
+# ----------------------------
+# Totals
+# ----------------------------
+def estimate_count(db: Session, query: Query) -> int:
+    """
+    Planner row estimate for `query` on PostgreSQL (no scan); an exact
+    COUNT(*) elsewhere.
+    """
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return query.order_by(None).count()
+
+    compiled = query.order_by(None).statement.compile(bind)
+    plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled.string}", compiled.params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
@@ -0,0 +1,90 @@
+# app/core/sketch_rows.py
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Tuple
+
+from sqlalchemy import bindparam
+from sqlalchemy.orm import Session
+
+from app.core.upserts import insert_ignore
+
+
+class SketchRowStore:
+    """
+    Sketch blobs (Bloom filters, HyperLogLogs) stored one row per key tuple
+    and merged read-modify-write: lock() creates any missing rows and reads
+    them back under row locks, update() writes the merged blobs. Keys are
+    locked in one order in every worker, so concurrent writers can't
+    deadlock. Lookups group keys on every column but `in_column` and read
+    each group with one IN query per chunk.
+    """
+
+    CHUNK_SIZE = 500
+
+    def __init__(
+        self,
+        db: Session,
+        model,
+        key_columns: List[str],
+        blob_column: str,
+        in_column: str,
+        defaults: Dict[str, Any]
+    ):
+        self.db = db
+        self.model = model
+        self.table = model.__table__
+        self.key_columns = key_columns
+        self.blob_column = blob_column
+        self.in_column = in_column
+        self.defaults = defaults
+
+    def lock(self, keys: Iterable[Tuple]) -> Dict[Tuple, Tuple[int, bytes]]:
+        """
+        Stored (id, blob) per key, creating empty rows for new keys and
+        locking all of them until the transaction ends. Does not commit.
+        """
+        keys = sorted(keys)
+        insert_ignore(
+            self.db,
+            self.table,
+            [dict(zip(self.key_columns, key), **self.defaults) for key in keys],
+            self.key_columns
+        )
+        return self.load(keys, for_update=True)
+
+    def load(self, keys: Iterable[Tuple], for_update: bool = False) -> Dict[Tuple, Tuple[int, bytes]]:
+        """Stored (id, blob) per key; keys without a row are left out."""
+        position = self.key_columns.index(self.in_column)
+        groups: Dict[Tuple, List[Any]] = defaultdict(list)
+        for key in keys:
+            groups[key[:position] + key[position + 1:]].append(key[position])
+
+        M = self.model
+        columns = [getattr(M, c) for c in self.key_columns if c != self.in_column]
+        in_column = getattr(M, self.in_column)
+        found: Dict[Tuple, Tuple[int, bytes]] = {}
+        for rest, values in groups.items():
+            for i in range(0, len(values), self.CHUNK_SIZE):
+                query = self.db.query(M.id, in_column, getattr(M, self.blob_column)).filter(
+                    *[column == value for column, value in zip(columns, rest)],
+                    in_column.in_(values[i:i + self.CHUNK_SIZE])
+                )
+                if for_update:
+                    query = query.order_by(M.id).with_for_update()
+                for row_id, value, blob in query.all():
+                    found[rest[:position] + (value,) + rest[position:]] = (row_id, blob)
+        return found
+
+    def update(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Writes merged values back by row id. Each row is {"id": ..., column:
+        value, ...}, with the same columns in every row.
+        """
+        if not rows:
+            return
+        columns = [c for c in rows[0] if c != "id"]
+        self.db.execute(
+            self.table.update()
+            .where(self.table.c.id == bindparam("_id"))
+            .values({c: bindparam(f"_{c}") for c in columns}),
+            [{f"_{c}": v for c, v in row.items()} for row in rows]
+        )
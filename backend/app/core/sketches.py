@@ -0,0 +1,393 @@
+# app/core/sketches.py
+import hashlib
+import heapq
+import math
+import struct
+import zlib
+from array import array
+from collections import Counter
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+class CountMinSketch:
+    """
+    Count-Min sketch over non-negative weighted counts.
+    estimate(key) never underestimates and, with probability 1 - delta,
+    overestimates by at most epsilon * total. Hashing is keyed on repr(key),
+    so sketches built with the same parameters in different processes can
+    be merged (or subtracted, to slide a window).
+    """
+
+    def __init__(self, epsilon: float = 0.001, delta: float = 0.01, seed: int = 0):
+        if not 0 < epsilon < 1 or not 0 < delta < 1:
+            raise ValueError("epsilon and delta must be in (0, 1)")
+        self.epsilon = epsilon
+        self.delta = delta
+        self.seed = seed
+        self.width = math.ceil(math.e / epsilon)
+        self.depth = math.ceil(math.log(1 / delta))
+        self.total = 0.0
+        self._salt = seed.to_bytes(8, "little", signed=False)
+        self._rows = [array("d", bytes(8 * self.width)) for _ in range(self.depth)]
+
+    # ----------------------------
+    # Hashing
+    # ----------------------------
+    def indexes(self, key: Hashable) -> List[int]:
+        """
+        Column per row for `key`; pass it back to add()/estimate() to hash a
+        key once across several sketches with the same parameters.
+        """
+        digest = hashlib.blake2b(repr(key).encode(), digest_size=16, salt=self._salt).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    # ----------------------------
+    # Updates and reads
+    # ----------------------------
+    def add(self, key: Hashable, value: float = 1.0, indexes: Optional[List[int]] = None) -> None:
+        if value < 0:
+            raise ValueError("Count-Min counts must be non-negative")
+        for row, col in zip(self._rows, indexes or self.indexes(key)):
+            row[col] += value
+        self.total += value
+
+    def estimate(self, key: Hashable, indexes: Optional[List[int]] = None) -> float:
+        return min(row[col] for row, col in zip(self._rows, indexes or self.indexes(key)))
+
+    def clear(self) -> None:
+        self._rows = [array("d", bytes(8 * self.width)) for _ in range(self.depth)]
+        self.total = 0.0
+
+    # ----------------------------
+    # Combining sketches
+    # ----------------------------
+    def merge(self, other: "CountMinSketch") -> None:
+        """Adds another sketch's counts into this one."""
+        self._combine(other, 1.0)
+
+    def subtract(self, other: "CountMinSketch") -> None:
+        """Removes counts previously merged in from `other`."""
+        self._combine(other, -1.0)
+
+    def _combine(self, other: "CountMinSketch", sign: float) -> None:
+        if (other.width, other.depth, other.seed) != (self.width, self.depth, self.seed):
+            raise ValueError("sketches differ in width, depth or seed")
+        for mine, theirs in zip(self._rows, other._rows):
+            for col in range(self.width):
+                mine[col] = max(mine[col] + sign * theirs[col], 0.0)
+        self.total = max(self.total + sign * other.total, 0.0)
+
+    @property
+    def nbytes(self) -> int:
+        return self.width * self.depth * 8
+
+
+class SpaceSaving:
+    """
+    Space-Saving summary of the heaviest keys under non-negative weighted
+    increments, keeping at most `capacity` counters. Any key whose true
+    count exceeds total / capacity is tracked; a tracked key's count
+    overestimates its true count by at most its recorded error.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.counts: Dict[Hashable, float] = {}
+        self.errors: Dict[Hashable, float] = {}
+        # One (count, key) entry per key; counts only grow, so stale entries
+        # are refreshed lazily when they reach the top
+        self._heap: List[Tuple[float, Hashable]] = []
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def add(self, key: Hashable, value: float = 1.0) -> None:
+        if value < 0:
+            raise ValueError("Space-Saving counts must be non-negative")
+        if key in self.counts:
+            self.counts[key] += value
+            return
+        if len(self.counts) < self.capacity:
+            self.counts[key] = value
+            self.errors[key] = 0.0
+            heapq.heappush(self._heap, (value, key))
+            return
+
+        # Replace the smallest counter; the newcomer inherits its count as error
+        floor_key, floor = self._pop_min()
+        del self.counts[floor_key]
+        del self.errors[floor_key]
+        self.counts[key] = floor + value
+        self.errors[key] = floor
+        heapq.heappush(self._heap, (floor + value, key))
+
+    def _pop_min(self) -> Tuple[Hashable, float]:
+        while True:
+            count, key = heapq.heappop(self._heap)
+            current = self.counts[key]
+            if current == count:
+                return key, count
+            heapq.heappush(self._heap, (current, key))
+
+    def min_count(self) -> float:
+        """Largest count an untracked key could have."""
+        if len(self.counts) < self.capacity:
+            return 0.0
+        key, count = self._pop_min()
+        heapq.heappush(self._heap, (count, key))
+        return count
+
+    def discard(self, key: Hashable) -> None:
+        if self.counts.pop(key, None) is None:
+            return
+        del self.errors[key]
+        self._heap = [(count, k) for k, count in self.counts.items()]
+        heapq.heapify(self._heap)
+
+    def clear(self) -> None:
+        self.counts.clear()
+        self.errors.clear()
+        self._heap = []
+
+    def top(self, n: Optional[int] = None) -> List[Tuple[Hashable, float, float]]:
+        """(key, count, error) for the heaviest keys, heaviest first."""
+        items = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)
+        return [(key, count, self.errors[key]) for key, count in items[:n]]
+
+    @classmethod
+    def merged(cls, summaries: Iterable["SpaceSaving"], capacity: Optional[int] = None) -> "SpaceSaving":
+        """
+        Combines summaries of disjoint streams (other workers, other time
+        buckets). A key missing from a full summary is credited with that
+        summary's minimum count, keeping counts upper bounds.
+        """
+        summaries = [s for s in summaries if s is not None and s.counts]
+        result = cls(capacity or max((s.capacity for s in summaries), default=1))
+        if not summaries:
+            return result
+
+        floors = [s.min_count() for s in summaries]
+        keys = set().union(*(s.counts for s in summaries))
+        counts: Dict[Hashable, float] = {}
+        errors: Dict[Hashable, float] = {}
+        for key in keys:
+            count = error = 0.0
+            for summary, floor in zip(summaries, floors):
+                if key in summary.counts:
+                    count += summary.counts[key]
+                    error += summary.errors[key]
+                else:
+                    count += floor
+                    error += floor
+            counts[key] = count
+            errors[key] = error
+
+        for key in heapq.nlargest(result.capacity, counts, key=counts.__getitem__):
+            result.counts[key] = counts[key]
+            result.errors[key] = errors[key]
+        result._heap = [(count, key) for key, count in result.counts.items()]
+        heapq.heapify(result._heap)
+        return result
+
+
+class HeavyHitters:
+    """
+    Approximate top-k over signed weighted counts in bounded memory.
+    Positive and negative weight go to separate Count-Min sketches; a
+    Space-Saving summary per group (e.g. target type) picks candidates by
+    positive weight, which are then ranked by positive minus negative
+    estimate.
+    """
+
+    def __init__(self, capacity: int = 1000, epsilon: float = 0.001, delta: float = 0.01, seed: int = 0):
+        self.capacity = capacity
+        self.positive = CountMinSketch(epsilon, delta, seed)
+        self.negative = CountMinSketch(epsilon, delta, seed)
+        self.summaries: Dict[Hashable, SpaceSaving] = {}
+
+    def add(self, key: Hashable, value: float, group: Hashable = None, indexes: Optional[List[int]] = None) -> None:
+        if value > 0:
+            self.positive.add(key, value, indexes)
+            summary = self.summaries.get(group)
+            if summary is None:
+                summary = self.summaries[group] = SpaceSaving(self.capacity)
+            summary.add(key, value)
+        elif value < 0:
+            self.negative.add(key, -value, indexes)
+
+    def estimate(self, key: Hashable, indexes: Optional[List[int]] = None) -> float:
+        indexes = indexes or self.positive.indexes(key)
+        return self.positive.estimate(key, indexes) - self.negative.estimate(key, indexes)
+
+    def top(self, n: int, group: Hashable = None, exclude: Iterable[Hashable] = ()) -> List[Tuple[Hashable, float]]:
+        """(key, estimated net count) for the top n candidates of a group."""
+        summary = self.summaries.get(group)
+        if summary is None:
+            return []
+        excluded = set(exclude)
+        scored = [(key, self.estimate(key)) for key in summary.counts if key not in excluded]
+        return heapq.nlargest(n, scored, key=lambda item: item[1])
+
+    def discard(self, key: Hashable, group: Hashable = None) -> None:
+        summary = self.summaries.get(group)
+        if summary is not None:
+            summary.discard(key)
+
+    def clear(self) -> None:
+        self.positive.clear()
+        self.negative.clear()
+        self.summaries.clear()
+
+    def merge(self, other: "HeavyHitters") -> None:
+        self.positive.merge(other.positive)
+        self.negative.merge(other.negative)
+        for group in set(self.summaries) | set(other.summaries):
+            self.summaries[group] = SpaceSaving.merged(
+                [self.summaries.get(group), other.summaries.get(group)], self.capacity
+            )
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held, counting 100 bytes per tracked key."""
+        tracked = sum(len(s) for s in self.summaries.values())
+        return self.positive.nbytes + self.negative.nbytes + tracked * 100
+
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct counter with 2**precision one-byte registers;
+    relative standard error is about 1.04 / sqrt(2**precision) (1.6% at
+    the default precision 12). Items are hashed from repr(item), so sketches
+    built in different processes merge by register-wise max, and to_bytes()
+    gives a compressed form for storage (a few bytes while mostly empty).
+    """
+
+    def __init__(self, precision: int = 12, registers: Optional[bytes] = None):
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.precision = precision
+        self.m = 1 << precision
+        if registers is not None and len(registers) != self.m:
+            raise ValueError("register count doesn't match precision")
+        self.registers = bytearray(registers) if registers is not None else bytearray(self.m)
+
+    def add(self, item: Hashable) -> bool:
+        """Adds an item; returns True if the sketch changed."""
+        h = int.from_bytes(hashlib.blake2b(repr(item).encode(), digest_size=8).digest(), "little")
+        index = h >> (64 - self.precision)
+        rest = h & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            return True
+        return False
+
+    def count(self) -> int:
+        m = self.m
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        # tally register values first; there are at most 65 distinct ones
+        histogram = Counter(self.registers)
+        estimate = alpha * m * m / sum(n * 2.0 ** -r for r, n in histogram.items())
+        zeros = histogram.get(0, 0)
+        # small cardinalities: linear counting is more accurate
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("sketches differ in precision")
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+
+    # ----------------------------
+    # Storage
+    # ----------------------------
+    def to_bytes(self) -> bytes:
+        return bytes([self.precision]) + zlib.compress(bytes(self.registers))
+
+    @classmethod
+    def from_bytes(cls, data: Optional[bytes], precision: int = 12) -> "HyperLogLog":
+        """Loads a stored sketch; empty data gives an empty sketch."""
+        if not data:
+            return cls(precision)
+        return cls(data[0], zlib.decompress(data[1:]))
+
+
+class BloomFilter:
+    """
+    Bloom filter over `num_bits` bits with `num_hashes` probes per item:
+    no false negatives, and a false positive rate close to the one it was
+    sized for while it holds at most its capacity. Items are hashed from
+    repr(item); to_bytes() stores the sizing with the bits, so filters
+    written under older settings still load.
+    """
+
+    def __init__(self, num_bits: int, num_hashes: int, bits: Optional[bytes] = None, count: int = 0):
+        if num_bits < 8 or num_hashes < 1:
+            raise ValueError("need at least 8 bits and one hash")
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        size = (num_bits + 7) // 8
+        if bits is not None and len(bits) != size:
+            raise ValueError("bit array doesn't match num_bits")
+        self.bits = bytearray(bits) if bits is not None else bytearray(size)
+        # items added that set at least one new bit
+        self.count = count
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float = 0.01) -> "BloomFilter":
+        """Sized for `capacity` items at `error_rate` false positives."""
+        if capacity < 1 or not 0 < error_rate < 1:
+            raise ValueError("capacity must be positive and error_rate in (0, 1)")
+        num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+        return cls(num_bits, num_hashes)
+
+    def _positions(self, item: Hashable) -> List[int]:
+        digest = hashlib.blake2b(repr(item).encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, item: Hashable) -> bool:
+        """Adds an item; returns True if the filter changed."""
+        changed = False
+        for pos in self._positions(item):
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not self.bits[byte] & mask:
+                self.bits[byte] |= mask
+                changed = True
+        if changed:
+            self.count += 1
+        return changed
+
+    def __contains__(self, item: Hashable) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def merge(self, other: "BloomFilter") -> None:
+        if (other.num_bits, other.num_hashes) != (self.num_bits, self.num_hashes):
+            raise ValueError("filters differ in size or hash count")
+        self.bits = bytearray(a | b for a, b in zip(self.bits, other.bits))
+        self.count += other.count
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.bits)
+
+    # ----------------------------
+    # Storage
+    # ----------------------------
+    def to_bytes(self) -> bytes:
+        return struct.pack("<IBI", self.num_bits, self.num_hashes, self.count) + zlib.compress(bytes(self.bits))
+
+    @classmethod
+    def from_bytes(cls, data: Optional[bytes], capacity: int, error_rate: float = 0.01) -> "BloomFilter":
+        """Loads a stored filter; empty data gives an empty one sized for `capacity`."""
+        if not data:
+            return cls.for_capacity(capacity, error_rate)
+        num_bits, num_hashes, count = struct.unpack_from("<IBI", data)
+        return cls(num_bits, num_hashes, zlib.decompress(data[struct.calcsize("<IBI"):]), count)
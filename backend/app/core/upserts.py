@@ -0,0 +1,54 @@
+# app/core/upserts.py
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from sqlalchemy import Table
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+
+def dialect_insert(dialect_name: str) -> Optional[Callable]:
+    """
+    The dialect's insert() with ON CONFLICT support (PostgreSQL, SQLite), or
+    None where there is none and callers need a fallback.
+    """
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+
+def insert_ignore(
+    db: Session,
+    table: Table,
+    values: Union[Dict[str, Any], List[Dict[str, Any]]],
+    index_elements: List[str]
+) -> int:
+    """
+    Inserts one row or a list of rows, skipping any that collide with the
+    unique key on `index_elements`. Returns the number of rows inserted
+    (exact for a single row). Does not commit.
+    """
+    rows = [values] if isinstance(values, dict) else values
+    if not rows:
+        return 0
+
+    insert = dialect_insert(db.get_bind().dialect.name)
+    if insert is not None:
+        stmt = insert(table).on_conflict_do_nothing(index_elements=index_elements)
+        if isinstance(values, dict):
+            return db.execute(stmt.values(**values)).rowcount
+        return max(db.execute(stmt, rows).rowcount, 0)
+
+    # Generic fallback: one savepoint per row, relying on the unique key
+    inserted = 0
+    for row in rows:
+        try:
+            with db.begin_nested():
+                db.execute(table.insert().values(**row))
+            inserted += 1
+        except IntegrityError:
+            pass
+    return inserted
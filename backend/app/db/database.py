@@ -1,8 +1,26 @@
-from sqlalchemy import create_engine
+import math
+import sqlite3
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import settings
 
 engine = create_engine(settings.DATABASE_URL, connect_args={"check_same_thread": False})
+
+
+def _safe_power(base, exp):
+    try:
+        return math.pow(base, exp)
+    except (OverflowError, ValueError, TypeError):
+        return None
+
+
+@event.listens_for(Engine, "connect")
+def _register_sqlite_functions(dbapi_conn, _):
+    # SQLite builds without the math extension lack power(); the decay
+    # scoring queries in EventAggregator rely on it.
+    if isinstance(dbapi_conn, sqlite3.Connection):
+        dbapi_conn.create_function("power", 2, _safe_power, deterministic=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
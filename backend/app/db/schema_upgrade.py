@@ -0,0 +1,90 @@
+# app/db/schema_upgrade.py
+import importlib
+import logging
+import pkgutil
+from typing import Dict, List
+
+from sqlalchemy import Index, UniqueConstraint, inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateColumn, CreateIndex
+
+from app.core.database import Base as LegacyBase
+from app.db.database import Base
+
+# comment_likes, reports and shares still register on app.core.database's Base;
+# its foreign keys point at tables it doesn't hold, so it is never sorted
+METADATAS = (Base.metadata, LegacyBase.metadata)
+
+LOG = logging.getLogger("schema_upgrade")
+
+
+def _load_models() -> None:
+    """Imports every model module so all tables are registered."""
+    from app import models
+
+    for module in pkgutil.iter_modules(models.__path__):
+        importlib.import_module(f"{models.__name__}.{module.name}")
+
+
+def pending_ddl(engine: Engine) -> List[str]:
+    """
+    DDL that brings existing tables up to the models: ADD COLUMN for each
+    missing column, then CREATE INDEX for each missing index. Missing unique
+    constraints become unique indexes (SQLite can't add constraints to a
+    table, and ON CONFLICT infers either). Tables that don't exist yet are
+    left to create_all.
+    """
+    _load_models()
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    dialect = engine.dialect
+
+    columns: List[str] = []
+    indexes: List[str] = []
+    for table in [t for metadata in METADATAS for t in metadata.tables.values()]:
+        if table.name not in existing_tables:
+            continue
+
+        have_columns = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in have_columns:
+                ddl = CreateColumn(column).compile(dialect=dialect)
+                columns.append(f"ALTER TABLE {dialect.identifier_preparer.format_table(table)} ADD COLUMN {ddl}")
+
+        have_indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+        have_indexes |= {u["name"] for u in inspector.get_unique_constraints(table.name)}
+        wanted = list(table.indexes) + [
+            Index(c.name, *c.columns, unique=True)
+            for c in table.constraints
+            if isinstance(c, UniqueConstraint) and c.name
+        ]
+        for index in wanted:
+            if index.name not in have_indexes:
+                indexes.append(str(CreateIndex(index).compile(dialect=dialect)))
+    return columns + indexes
+
+
+def upgrade_schema(engine: Engine, dry_run: bool = False) -> Dict[str, List[str]]:
+    """
+    Creates missing tables and applies pending_ddl, one statement per
+    transaction. Safe to re-run: only what is missing is added. Returns
+    {"applied": [...], "failed": [...]}; a unique index fails while its
+    table still holds duplicate rows.
+    """
+    statements = pending_ddl(engine)
+    result: Dict[str, List[str]] = {"applied": [], "failed": []}
+    if dry_run:
+        result["applied"] = statements
+        return result
+
+    for statement in statements:
+        try:
+            with engine.begin() as conn:
+                conn.exec_driver_sql(statement)
+        except Exception:
+            LOG.exception("schema upgrade statement failed: %s", statement)
+            result["failed"].append(statement)
+        else:
+            result["applied"].append(statement)
+    Base.metadata.create_all(bind=engine)
+    return result
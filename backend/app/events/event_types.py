@@ -29,6 +29,15 @@ class EventTypes:
     ANSWER_DISLIKED = "answer_disliked"
     COMMENT_DISLIKED = "comment_disliked"
 
+    # A like or dislike taken back (toggled off, or replaced by its opposite)
+    QUESTION_UNLIKED = "question_unliked"
+    ANSWER_UNLIKED = "answer_unliked"
+    COMMENT_UNLIKED = "comment_unliked"
+
+    QUESTION_UNDISLIKED = "question_undisliked"
+    ANSWER_UNDISLIKED = "answer_undisliked"
+    COMMENT_UNDISLIKED = "comment_undisliked"
+
     QUESTION_REPORTED = "question_reported"
     ANSWER_REPORTED = "answer_reported"
     COMMENT_REPORTED = "comment_reported"
@@ -4,6 +4,18 @@ from fastapi.middleware.cors import CORSMiddleware
 import logging
 
 from app.core.database import init_db
+from app.db.database import SessionLocal
+from app.services.events.event_pipeline import event_pipeline
+from app.services.events.rollup_service import RollupService, apply_rollups
+from app.services.events.unique_counter import apply_unique_counts
+from app.services.events.view_coalescer import view_coalescer
+from app.services.feeds.hot_score import apply_hot_scores
+from app.services.feeds.fanout_worker import apply_feed_fanout, fanout_worker
+from app.services.content.question_card_cache import apply_card_invalidation
+from app.services.content.counter_buffer import counter_buffer
+from app.services.feeds.trending_engine import trending_engine
+from app.services.feeds.recent_index import recent_index
+from app.core.config import settings
 from app.routers import question_router,answer_router,comment_router
 
 LOG = logging.getLogger("uvicorn.error")
@@ -22,6 +34,43 @@ def startup():
     init_db()
     LOG.info("DB initialized")
 
+    db = SessionLocal()
+    try:
+        RollupService(db).ensure_state()
+    finally:
+        db.close()
+    event_pipeline.add_sink(apply_rollups)
+    event_pipeline.add_sink(apply_hot_scores)
+    event_pipeline.add_sink(apply_unique_counts)
+    event_pipeline.add_sink(apply_card_invalidation)
+    if settings.FEED_FANOUT_ENABLED:
+        # queues new questions; fan-out itself runs on its own worker
+        fanout_worker.start()
+        event_pipeline.add_sink(apply_feed_fanout)
+    event_pipeline.start()
+    if settings.VIEW_COALESCING_ENABLED:
+        # coalesced views and impressions reach these as per-window counts
+        view_coalescer.add_sink(apply_rollups)
+        view_coalescer.add_sink(apply_unique_counts)
+        view_coalescer.start()
+    if settings.COUNTER_WRITE_BEHIND:
+        counter_buffer.start()
+    if settings.TRENDING_ENGINE_ENABLED:
+        trending_engine.start()
+    if settings.RECENT_INDEX_ENABLED:
+        recent_index.start()
+
+@app.on_event("shutdown")
+def shutdown():
+    # drain queued events and counter deltas before the worker exits;
+    # coalesced views first, their sampled rows go through the pipeline
+    view_coalescer.stop()
+    event_pipeline.stop()
+    fanout_worker.stop()
+    counter_buffer.stop()
+    trending_engine.stop()
+    recent_index.stop()
+
 # include routers
 app.include_router(question_router)
 app.include_router(answer_router)
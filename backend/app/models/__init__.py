@@ -18,3 +18,12 @@ from .answer_like import AnswerLike  # noqa
 from .comment_like import CommentLike  # noqa
 from .report import Report  # noqa
 from .share import Share  # noqa
+from .event import Event  # noqa
+from .engagement_rollup import EngagementRollup  # noqa
+from .engagement_rollup_state import EngagementRollupState  # noqa
+from .reaction import Reaction  # noqa
+from .unique_sketch import UniqueSketch  # noqa
+from .user_follow import UserFollow  # noqa
+from .feed_inbox import FeedInboxEntry  # noqa
+from .feed_snapshot import FeedSnapshot  # noqa
+from .seen_filter import SeenFilter  # noqa
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Float, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.database import Base
@@ -6,6 +6,10 @@ from app.db.database import Base
 
 class Answer(Base):
     __tablename__ = "answers"
+    __table_args__ = (
+        # Keyset pagination of a question's answers by (created_at, id)
+        Index("ix_answers_question_created", "question_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     content = Column(String)
@@ -23,6 +27,11 @@ class Answer(Base):
     comments_count = Column(Integer, default=0)
     share_count = Column(Integer, default=0)
 
+    # Decayed hot score in log2 space (see services/feeds/hot_score.py)
+    hot_pos_log = Column(Float, nullable=True)
+    hot_neg_log = Column(Float, nullable=True)
+    hot_score = Column(Float, nullable=True, index=True)
+
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, onupdate=func.now())
 
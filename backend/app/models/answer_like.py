@@ -1,10 +1,11 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, UniqueConstraint
 from sqlalchemy.sql import func
 from app.db.database import Base
 
 
 class AnswerLike(Base):
     __tablename__ = "answer_likes"
+    __table_args__ = (UniqueConstraint("answer_id", "user_id", name="uq_answer_likes_user"),)
 
     id = Column(Integer, primary_key=True)
     answer_id = Column(Integer, ForeignKey("answers.id"))
@@ -1,11 +1,26 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Float, Index, event, select
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
+from sqlalchemy.orm.attributes import set_committed_value
 from app.db.database import Base
 
+# Materialized path: one fixed-width, zero-padded id per level, root first.
+# Digits only, so lexicographic order is thread (pre-)order under any collation.
+PATH_SEGMENT_WIDTH = 10
+
+
+def path_segment(comment_id: int) -> str:
+    return str(comment_id).zfill(PATH_SEGMENT_WIDTH)
+
 
 class Comment(Base):
     __tablename__ = "comments"
+    __table_args__ = (
+        Index("ix_comments_root_path", "root_type", "root_id", "path"),
+        Index("ix_comments_path", "path"),
+        # Keyset pagination of top-level comments by (created_at, id)
+        Index("ix_comments_target_created", "target_type", "target_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True)
     content = Column(String)
@@ -17,6 +32,12 @@ class Comment(Base):
     target_type = Column(String)    # "question" | "answer" | "comment"
     target_id = Column(Integer)     # dynamic foreign reference
 
+    # hierarchy index, maintained on insert (see _assign_hierarchy)
+    root_type = Column(String, nullable=True)     # "question" | "answer"
+    root_id = Column(Integer, nullable=True)
+    depth = Column(Integer, nullable=True)        # 0 for top-level comments
+    path = Column(String, nullable=True)
+
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, onupdate=func.now())
 
@@ -27,6 +48,11 @@ class Comment(Base):
     dislikes_count = Column(Integer, default=0)
     replies_count = Column(Integer, default=0)
 
+    # Decayed hot score in log2 space (see services/feeds/hot_score.py)
+    hot_pos_log = Column(Float, nullable=True)
+    hot_neg_log = Column(Float, nullable=True)
+    hot_score = Column(Float, nullable=True, index=True)
+
     # Relationships
     user = relationship("User", back_populates="comments")
 
@@ -44,3 +70,37 @@ class Comment(Base):
         cascade="all, delete-orphan",
         primaryjoin="and_(Comment.target_id==Comment.id, Comment.target_type=='comment')"
     )
+
+
+@event.listens_for(Comment, "after_insert")
+def _assign_hierarchy(mapper, connection, target):
+    """
+    Fills root/depth/path for a new comment from its parent, in the same
+    transaction. The path needs the new id, hence after_insert.
+    """
+    table = Comment.__table__
+    if target.target_type == "comment":
+        parent = connection.execute(
+            select(table.c.root_type, table.c.root_id, table.c.depth, table.c.path)
+            .where(table.c.id == target.target_id)
+        ).first()
+        if parent is None or parent.path is None:
+            return
+        values = {
+            "root_type": parent.root_type,
+            "root_id": parent.root_id,
+            "depth": parent.depth + 1,
+            "path": parent.path + path_segment(target.id),
+        }
+    else:
+        values = {
+            "root_type": target.target_type,
+            "root_id": target.target_id,
+            "depth": 0,
+            "path": path_segment(target.id),
+        }
+
+    # filling in the hierarchy is not an edit: keep updated_at unset
+    connection.execute(table.update().where(table.c.id == target.id).values(updated_at=table.c.updated_at, **values))
+    for key, value in values.items():
+        set_committed_value(target, key, value)
@@ -1,9 +1,10 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, UniqueConstraint
 from sqlalchemy.sql import func
 from app.db.database import Base
 
 class CommentDislike(Base):
     __tablename__ = "comment_dislikes"
+    __table_args__ = (UniqueConstraint("comment_id", "user_id", name="uq_comment_dislikes_user"),)
 
     id = Column(Integer, primary_key=True)
     comment_id = Column(Integer, ForeignKey("comments.id"))
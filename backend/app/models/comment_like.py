@@ -1,10 +1,11 @@
 # app/models/comment_like.py
-from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, UniqueConstraint
 from sqlalchemy.sql import func
 from app.core.database import Base
 
 class CommentLike(Base):
     __tablename__ = "comment_likes"
+    __table_args__ = (UniqueConstraint("comment_id", "user_id", name="uq_comment_likes_user"),)
     id = Column(Integer, primary_key=True)
     comment_id = Column(Integer, ForeignKey("comments.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
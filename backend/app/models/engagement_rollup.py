@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint, Index
+from app.db.database import Base
+
+
+class EngagementRollup(Base):
+    __tablename__ = "engagement_rollups"
+
+    id = Column(Integer, primary_key=True)
+
+    granularity = Column(String, nullable=False)  # hour | day
+    bucket_start = Column(DateTime, nullable=False)  # UTC, aligned to granularity
+
+    target_type = Column(String, nullable=False)  # question | answer | comment | actor
+    target_id = Column(Integer, nullable=False)
+    event_type = Column(String, nullable=False)
+
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "granularity", "target_type", "target_id", "event_type", "bucket_start",
+            name="uq_engagement_rollups_key"
+        ),
+        Index("ix_engagement_rollups_window", "granularity", "target_type", "bucket_start"),
+    )
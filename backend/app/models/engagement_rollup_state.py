@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class EngagementRollupState(Base):
+    __tablename__ = "engagement_rollup_state"
+
+    name = Column(String, primary_key=True)  # "events"
+
+    # rollups are complete for every bucket starting at or after this time
+    covered_since = Column(DateTime, nullable=False)
+
+    rebuilt_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
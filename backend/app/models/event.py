@@ -6,7 +6,8 @@ from sqlalchemy import (
     ForeignKey,
     JSON,
     Boolean,
-    Float
+    Float,
+    Index
 )
 from sqlalchemy.sql import func
 from app.db.database import Base
@@ -14,6 +15,10 @@ from app.db.database import Base
 
 class Event(Base):
     __tablename__ = "events"
+    __table_args__ = (
+        # Keyset pagination of a target's events by (created_at, id)
+        Index("ix_events_target_created", "target_type", "target_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -68,4 +73,7 @@ class Event(Base):
     # =========================
     metadata = Column(JSON, default=dict)
     is_visible = Column(Boolean, default=True)
+    # Events this row stands for: 1, or a sampled coalesced view window's
+    # count over the sampling rate (services/events/view_coalescer.py)
+    sample_weight = Column(Integer, nullable=False, default=1, server_default="1")
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
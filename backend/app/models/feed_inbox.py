@@ -0,0 +1,26 @@
+# app/models/feed_inbox.py
+from sqlalchemy import Column, Integer, DateTime, Index, UniqueConstraint
+from app.db.database import Base
+
+
+class FeedInboxEntry(Base):
+    """
+    A question pushed into a follower's feed inbox when its author posted
+    it. Inboxes are capped per user (FEED_INBOX_CAP, newest kept).
+    """
+    __tablename__ = "feed_inbox"
+
+    id = Column(Integer, primary_key=True)
+
+    user_id = Column(Integer, nullable=False)  # inbox owner
+    question_id = Column(Integer, nullable=False)
+    author_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False)  # question created_at
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "question_id", name="uq_feed_inbox_entry"),
+        # Newest entries of one inbox, and trimming past the cap
+        Index("ix_feed_inbox_user_created", "user_id", "created_at", "id"),
+        # Unfollow: drop one author's entries from an inbox
+        Index("ix_feed_inbox_user_author", "user_id", "author_id"),
+    )
@@ -0,0 +1,27 @@
+# app/models/feed_snapshot.py
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Index
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class FeedSnapshot(Base):
+    """
+    Ranked question ids of one built feed, paged by cursor until it expires
+    (see services/feeds/feed_snapshot.py). Its id is the feed_id recorded on
+    events from that feed.
+    """
+    __tablename__ = "feed_snapshots"
+
+    id = Column(String(32), primary_key=True)  # uuid4 hex
+
+    user_id = Column(Integer, nullable=False)
+    ranking = Column(String(16), nullable=False)
+    item_ids = Column(JSON, nullable=False)
+
+    created_at = Column(DateTime, server_default=func.now())
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        # Purging a user's expired snapshots
+        Index("ix_feed_snapshots_user_expires", "user_id", "expires_at"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Float
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.database import Base
@@ -28,6 +28,15 @@ class Question(Base):
     comments_count = Column(Integer, default=0)
     answers_count = Column(Integer, default=0)
 
+    # Bumped by any answer/comment/reaction/edit under this question; part of
+    # the question card cache key (services/content/question_card_cache.py)
+    content_version = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Decayed hot score in log2 space (see services/feeds/hot_score.py)
+    hot_pos_log = Column(Float, nullable=True)
+    hot_neg_log = Column(Float, nullable=True)
+    hot_score = Column(Float, nullable=True, index=True)
+
     # Relationships
     user = relationship("User", back_populates="questions")
 
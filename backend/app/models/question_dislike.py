@@ -1,9 +1,10 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, UniqueConstraint
 from sqlalchemy.sql import func
 from app.db.database import Base
 
 class QuestionDislike(Base):
     __tablename__ = "question_dislikes"
+    __table_args__ = (UniqueConstraint("question_id", "user_id", name="uq_question_dislikes_user"),)
 
     id = Column(Integer, primary_key=True)
     question_id = Column(Integer, ForeignKey("questions.id"))
@@ -0,0 +1,30 @@
+# app/models/reaction.py
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, UniqueConstraint, Index
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class Reaction(Base):
+    """
+    One row per (target, user, kind) for likes, dislikes, reports and shares
+    on questions, answers and comments.
+    """
+    __tablename__ = "reactions"
+
+    id = Column(Integer, primary_key=True)
+
+    target_type = Column(String(16), nullable=False)  # question | answer | comment
+    target_id = Column(Integer, nullable=False)
+    kind = Column(String(16), nullable=False)  # like | dislike | report | share
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    detail = Column(String, nullable=True)  # report reason / share platform
+
+    created_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        # Also covers "counts per kind for these targets" as an index-only scan
+        UniqueConstraint("target_type", "target_id", "kind", "user_id", name="uq_reactions_target_kind_user"),
+        # A user's reactions on a set of targets
+        Index("ix_reactions_user_target", "user_id", "target_type", "target_id", "kind"),
+    )
@@ -0,0 +1,27 @@
+# app/models/seen_filter.py
+from sqlalchemy import Column, Integer, DateTime, LargeBinary, UniqueConstraint
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class SeenFilter(Base):
+    """
+    Bloom filter of the feed items shown to a user during one time bucket
+    (see services/feeds/seen_items.py). A user keeps FEED_SEEN_BUCKETS of
+    them; older buckets are deleted as new ones start.
+    """
+    __tablename__ = "feed_seen_filters"
+
+    id = Column(Integer, primary_key=True)
+
+    user_id = Column(Integer, nullable=False)
+    bucket_start = Column(DateTime, nullable=False)
+
+    bits = Column(LargeBinary, nullable=False)  # BloomFilter.to_bytes()
+
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # Also serves "a user's live buckets"
+        UniqueConstraint("user_id", "bucket_start", name="uq_feed_seen_filters_key"),
+    )
@@ -0,0 +1,30 @@
+# app/models/unique_sketch.py
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary, UniqueConstraint
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class UniqueSketch(Base):
+    """
+    HyperLogLog sketch of the distinct users/sessions that viewed or engaged
+    with a target, per UTC day plus one all-time row (see
+    services/events/unique_counter.py).
+    """
+    __tablename__ = "unique_sketches"
+
+    id = Column(Integer, primary_key=True)
+
+    target_type = Column(String(16), nullable=False)  # question | answer
+    target_id = Column(Integer, nullable=False)
+    kind = Column(String(16), nullable=False)  # viewers | engagers
+    bucket_start = Column(DateTime, nullable=False)  # UTC day; 1970-01-01 for all time
+
+    registers = Column(LargeBinary, nullable=False)  # HyperLogLog.to_bytes()
+    estimate = Column(Integer, nullable=False, default=0)  # count() at last write
+
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # Also serves "these targets over a range of days"
+        UniqueConstraint("target_type", "target_id", "kind", "bucket_start", name="uq_unique_sketches_key"),
+    )
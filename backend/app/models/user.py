@@ -14,6 +14,9 @@ class User(Base):
 
     profile_image = Column(String, nullable=True)
 
+    # Denormalized follower count; decides fan-out vs pull for feeds
+    followers_count = Column(Integer, nullable=False, default=0, server_default="0")
+
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, onupdate=func.now())
 
@@ -0,0 +1,26 @@
+# app/models/user_follow.py
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class UserFollow(Base):
+    """
+    follower_id follows followee_id; drives feed fan-out
+    (see services/feeds/feed_inbox.py).
+    """
+    __tablename__ = "user_follows"
+
+    id = Column(Integer, primary_key=True)
+
+    follower_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    followee_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    created_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        # Also serves "who does this user follow"
+        UniqueConstraint("follower_id", "followee_id", name="uq_user_follows_pair"),
+        # Fan-out: all followers of an author
+        Index("ix_user_follows_followee", "followee_id", "follower_id"),
+    )
@@ -1,76 +1,23 @@
 # app/routers/answers.py
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from typing import Optional
-from datetime import datetime
 
 from app.db.database import get_db
+from app.core.pagination import InvalidCursor, paginate
+from app.models.question import Question
 from app.models.answer import Answer
-from app.models.answer_like import AnswerLike
-from app.models.answer_dislike import AnswerDislike
-from app.models.answer_report import AnswerReport
-from app.models.answer_share import AnswerShare
 from app.models.comment import Comment
-from app.models.comment_like import CommentLike
-from app.models.comment_dislike import CommentDislike
-from app.models.comment_report import CommentReport
-from app.models.comment_share import CommentShare
-from app.models.event import Event
 from app.events.event_types import EventTypes
+from app.services.events.event_logger import log_event
+from app.services.content.reaction_service import ReactionService, toggle_event_types, reaction_counts, LIKE
+from app.services.content.counter_buffer import bump_comment_count, bump_counters, counter_buffer
+from app.services.content.question_card_cache import invalidate_cards
+from app.services.content.comment_tree import CommentTreeLoader
+from app.services.content.viewer_state import comment_ids, comments_with_viewer, viewer_states
 
 router = APIRouter(prefix="/answers", tags=["Answers"])
 
-# ----------------------------
-# EVENT LOGGER
-# ----------------------------
-def log_event(
-    db: Session,
-    actor_id: Optional[int],
-    actor_role: Optional[str],
-    event_type: str,
-    target_type: str,
-    target_id: int,
-    owner_id: Optional[int] = None,
-    owner_type: str = "user",
-    is_anonymous: bool = False,
-    metadata: Optional[dict] = None,
-    session_id: Optional[str] = None,
-    request_id: Optional[str] = None,
-    feed_id: Optional[str] = None,
-    position: Optional[int] = None,
-    source: Optional[str] = None,
-    referrer: Optional[str] = None,
-    app_version: Optional[str] = None,
-    ip_address: Optional[str] = None,
-    user_agent: Optional[str] = None,
-    user_geo: Optional[str] = None,
-    latency_ms: Optional[float] = None,
-):
-    evt = Event(
-        actor_id=actor_id,
-        actor_role=actor_role,
-        event_type=event_type,
-        target_type=target_type,
-        target_id=target_id,
-        owner_id=owner_id,
-        owner_type=owner_type,
-        is_anonymous=is_anonymous,
-        metadata=metadata or {},
-        session_id=session_id,
-        request_id=request_id,
-        feed_id=feed_id,
-        position=position,
-        source=source,
-        referrer=referrer,
-        app_version=app_version,
-        ip_address=ip_address,
-        user_agent=user_agent,
-        user_geo=user_geo,
-        latency_ms=latency_ms
-    )
-    db.add(evt)
-
 # ----------------------------
 # CREATE ANSWER
 # ----------------------------
@@ -91,12 +38,10 @@ def create_answer(
         user_id=None if anonymous else user_id
     )
     db.add(ans)
-    from app.models.question import Question
-    db.query(Question).filter(Question.id == ans.question_id).update({
-        "answers_count": Question.answers_count + 1
-    })
+    invalidate_cards(db, [("question", ans.question_id)])
     db.commit()
     db.refresh(ans)
+    bump_counters(db, "question", ans.question_id, answers_count=1)
 
     log_event(
         db,
@@ -113,7 +58,6 @@ def create_answer(
         feed_id=feed_id,
         position=position
     )
-    db.commit()
     return ans
 
 # ----------------------------
@@ -130,7 +74,7 @@ def edit_answer(
     feed_id: Optional[str] = None,
     position: Optional[int] = None
 ):
-    ans = db.query(Answer).filter(Answer.id == answer_id, Answer.deleted_at == None).first()
+    ans = db.query(Answer).filter(Answer.id == answer_id, Answer.is_deleted.isnot(True)).first()
     if not ans:
         raise HTTPException(status_code=404, detail="Answer not found")
     if ans.user_id and ans.user_id != user_id:
@@ -146,6 +90,8 @@ def edit_answer(
         ans.user_id = None if payload["anonymous"] else (ans.user_id or user_id)
         changes["anonymous"] = {"old": old_user is None, "new": payload["anonymous"]}
 
+    if changes:
+        invalidate_cards(db, [("question", ans.question_id)])
     db.commit()
     db.refresh(ans)
 
@@ -165,7 +111,6 @@ def edit_answer(
             feed_id=feed_id,
             position=position
         )
-        db.commit()
     return ans
 
 # ----------------------------
@@ -181,18 +126,16 @@ def delete_answer(
     feed_id: Optional[str] = None,
     position: Optional[int] = None
 ):
-    ans = db.query(Answer).filter(Answer.id == answer_id, Answer.deleted_at == None).first()
+    ans = db.query(Answer).filter(Answer.id == answer_id, Answer.is_deleted.isnot(True)).first()
     if not ans:
         raise HTTPException(status_code=404, detail="Answer not found")
     if ans.user_id and ans.user_id != user_id:
         raise HTTPException(status_code=403, detail="You can only delete your own answers")
 
-    from app.models.question import Question
-    db.query(Question).filter(Question.id == ans.question_id).update({
-        "answers_count": func.greatest(Question.answers_count - 1, 0)
-    })
-    ans.deleted_at = datetime.utcnow()
+    ans.is_deleted = True
+    invalidate_cards(db, [("question", ans.question_id)])
     db.commit()
+    bump_counters(db, "question", ans.question_id, answers_count=-1)
 
     log_event(
         db,
@@ -209,7 +152,6 @@ def delete_answer(
         feed_id=feed_id,
         position=position
     )
-    db.commit()
     return {"message": "Answer deleted"}
 
 # ----------------------------
@@ -228,66 +170,26 @@ def toggle_like(
     feed_id: Optional[str] = None,
     position: Optional[int] = None
 ):
-    ans = db.query(Answer).filter(Answer.id == answer_id, Answer.deleted_at == None).first()
-    if not ans:
-        raise HTTPException(status_code=404, detail="Answer not found")
-
-    existing_dislike = db.query(AnswerDislike).filter_by(answer_id=answer_id, user_id=user_id).first()
-    if existing_dislike:
-        db.delete(existing_dislike)
-        db.query(Answer).filter(Answer.id == answer_id).update({
-            "dislikes_count": func.greatest(Answer.dislikes_count - 1, 0)
-        })
+    result = ReactionService(db).toggle("answer", answer_id, user_id, LIKE)
+    if result is None:
+        raise HTTPException(404, "Answer not found")
 
-    existing_like = db.query(AnswerLike).filter_by(answer_id=answer_id, user_id=user_id).first()
-    if existing_like:
-        db.delete(existing_like)
-        db.query(Answer).filter(Answer.id == answer_id).update({
-            "likes_count": func.greatest(Answer.likes_count - 1, 0)
-        })
-        db.commit()
-        a = db.query(Answer).filter(Answer.id == answer_id).first()
+    for event_type in toggle_event_types("answer", LIKE, result):
         log_event(
             db,
             actor_id=user_id,
             actor_role="user",
-            event_type=EventTypes.ANSWER_LIKED,
+            event_type=event_type,
             target_type="answer",
             target_id=answer_id,
-            owner_id=a.user_id,
+            owner_id=result["owner_id"],
             is_anonymous=False,
-            metadata={"removed": True},
             session_id=session_id,
             request_id=request_id,
             feed_id=feed_id,
             position=position
         )
-        db.commit()
-        return {"liked": False, "likes": a.likes_count, "dislikes": a.dislikes_count}
-
-    new_like = AnswerLike(answer_id=answer_id, user_id=user_id)
-    db.add(new_like)
-    db.query(Answer).filter(Answer.id == answer_id).update({
-        "likes_count": Answer.likes_count + 1
-    })
-    db.commit()
-    a = db.query(Answer).filter(Answer.id == answer_id).first()
-    log_event(
-        db,
-        actor_id=user_id,
-        actor_role="user",
-        event_type=EventTypes.ANSWER_LIKED,
-        target_type="answer",
-        target_id=answer_id,
-        owner_id=a.user_id,
-        is_anonymous=False,
-        session_id=session_id,
-        request_id=request_id,
-        feed_id=feed_id,
-        position=position
-    )
-    db.commit()
-    return {"liked": True, "likes": a.likes_count, "dislikes": a.dislikes_count}
+    return {"liked": result["active"], "likes": result["likes"], "dislikes": result["dislikes"]}
 
 # ----------------------------
 # COMMENT LOGIC
@@ -307,17 +209,16 @@ def add_comment(
 ):
     anonymous = payload.get("anonymous", False)
     comment = Comment(
-        body=payload["content"],
+        content=payload["content"],
         user_id=None if anonymous else user_id,
         target_type="answer",
         target_id=answer_id
     )
     db.add(comment)
-    db.query(Answer).filter(Answer.id == answer_id).update({
-        "comments_count": Answer.comments_count + 1
-    })
+    invalidate_cards(db, [("answer", answer_id)])
     db.commit()
     db.refresh(comment)
+    bump_comment_count(db, "answer", answer_id, 1)
 
     log_event(
         db,
@@ -334,36 +235,18 @@ def add_comment(
         feed_id=feed_id,
         position=position
     )
-    db.commit()
     return comment
 
 # ----------------------------
 # LIST COMMENTS WITH NESTED REPLIES
 # ----------------------------
-def _get_comment_recursive(db: Session, comment: Comment) -> dict:
-    likes = db.query(func.count(CommentLike.id)).filter(CommentLike.comment_id == comment.id).scalar()
-    dislikes = db.query(func.count(CommentDislike.id)).filter(CommentDislike.comment_id == comment.id).scalar()
-    reports = db.query(func.count(CommentReport.id)).filter(CommentReport.comment_id == comment.id).scalar()
-    shares = db.query(func.count(CommentShare.id)).filter(CommentShare.comment_id == comment.id).scalar()
-    children = db.query(Comment).filter(Comment.target_type == "comment", Comment.target_id == comment.id).all()
-    return {
-        "id": comment.id,
-        "body": comment.body,
-        "user_id": None if comment.user_id is None else comment.user_id,
-        "is_anonymous": comment.is_anonymous,
-        "created_at": comment.created_at,
-        "likes": likes,
-        "dislikes": dislikes,
-        "reports": reports,
-        "shares": shares,
-        "comments": [_get_comment_recursive(db, ch) for ch in children]
-    }
-
 @router.get("/{answer_id}/comments")
 def list_comments(
     answer_id: int,
     page: int = 1,
     page_size: int = 10,
+    cursor: Optional[str] = None,
+    exact_total: bool = False,
     db: Session = Depends(get_db),
     user_id: Optional[int] = 1,
     session_id: Optional[str] = None,
@@ -371,9 +254,18 @@ def list_comments(
     feed_id: Optional[str] = None,
     position: Optional[int] = None
 ):
-    q = db.query(Comment).filter(Comment.target_type == "answer", Comment.target_id == answer_id)
-    total = q.count()
-    comments = q.order_by(Comment.created_at.asc()).offset((page-1)*page_size).limit(page_size).all()
+    q = db.query(Comment).filter(
+        Comment.target_type == "answer", Comment.target_id == answer_id, Comment.is_deleted.isnot(True)
+    )
+    try:
+        comments, next_cursor = paginate(q, Comment.created_at, Comment.id, page_size, cursor=cursor, page=page, descending=False)
+    except InvalidCursor:
+        raise HTTPException(400, "Invalid cursor")
+    if exact_total:
+        total = q.count()
+    else:
+        stored = db.query(Answer.comments_count).filter(Answer.id == answer_id).scalar()
+        total = counter_buffer.merge("answer", answer_id, {"comments_count": stored or 0})["comments_count"]
 
     log_event(
         db,
@@ -388,13 +280,15 @@ def list_comments(
         feed_id=feed_id,
         position=position
     )
-    db.commit()
 
+    nested = CommentTreeLoader(db, with_reactions=True).for_roots(comments)
+    states = viewer_states(db, user_id, [("comment", cid) for cid in comment_ids(nested)])
     return {
         "total": total,
         "page": page,
         "page_size": page_size,
-        "comments": [_get_comment_recursive(db, c) for c in comments]
+        "next_cursor": next_cursor,
+        "comments": comments_with_viewer(nested, states)
     }
 
 # ----------------------------
@@ -406,25 +300,38 @@ def get_answers_with_details(
     db: Session = Depends(get_db),
     page: int = 1,
     page_size: int = 10,
+    cursor: Optional[str] = None,
+    exact_total: bool = False,
     user_id: Optional[int] = 1,
     session_id: Optional[str] = None,
     request_id: Optional[str] = None,
     feed_id: Optional[str] = None
 ):
-    ans_q = db.query(Answer).filter(Answer.question_id == question_id, Answer.deleted_at == None)
-    total = ans_q.count()
-    answers = ans_q.order_by(Answer.created_at.desc()).offset((page-1)*page_size).limit(page_size).all()
+    ans_q = db.query(Answer).filter(Answer.question_id == question_id, Answer.is_deleted.isnot(True))
+    try:
+        answers, next_cursor = paginate(ans_q, Answer.created_at, Answer.id, page_size, cursor=cursor, page=page)
+    except InvalidCursor:
+        raise HTTPException(400, "Invalid cursor")
+    if exact_total:
+        total = ans_q.count()
+    else:
+        stored = db.query(Question.answers_count).filter(Question.id == question_id).scalar()
+        total = counter_buffer.merge("question", question_id, {"answers_count": stored or 0})["answers_count"]
 
     answer_ids = [a.id for a in answers]
-    likes_map = dict(db.query(AnswerLike.answer_id, func.count()).filter(AnswerLike.answer_id.in_(answer_ids)).group_by(AnswerLike.answer_id).all())
-    dislikes_map = dict(db.query(AnswerDislike.answer_id, func.count()).filter(AnswerDislike.answer_id.in_(answer_ids)).group_by(AnswerDislike.answer_id).all())
-    reports_map = dict(db.query(AnswerReport.answer_id, func.count()).filter(AnswerReport.answer_id.in_(answer_ids)).group_by(AnswerReport.answer_id).all())
-    shares_map = dict(db.query(AnswerShare.answer_id, func.count()).filter(AnswerShare.answer_id.in_(answer_ids)).group_by(AnswerShare.answer_id).all())
+    reactions_map = reaction_counts(db, "answer", answer_ids)
+
+    comments_map = CommentTreeLoader(db, with_reactions=True).for_targets("answer", answer_ids)
+    states = viewer_states(
+        db,
+        user_id,
+        [("answer", aid) for aid in answer_ids]
+        + [("comment", cid) for aid in answer_ids for cid in comment_ids(comments_map[aid])]
+    )
 
     results = []
     for idx, a in enumerate(answers, start=1):
-        comment_objs = db.query(Comment).filter(Comment.target_type=="answer", Comment.target_id==a.id).all()
-        nested = [_get_comment_recursive(db, c) for c in comment_objs]
+        nested = comments_map[a.id]
 
         log_event(
             db,
@@ -448,18 +355,19 @@ def get_answers_with_details(
             "user_id": None if a.user_id is None else a.user_id,
             "is_anonymous": a.is_anonymous,
             "created_at": a.created_at,
-            "likes": likes_map.get(a.id, 0),
-            "dislikes": dislikes_map.get(a.id, 0),
-            "reports": reports_map.get(a.id, 0),
-            "shares": shares_map.get(a.id, 0),
+            "likes": reactions_map[a.id]["likes"],
+            "dislikes": reactions_map[a.id]["dislikes"],
+            "reports": reactions_map[a.id]["reports"],
+            "shares": reactions_map[a.id]["shares"],
             "comments_count": len(nested),
-            "comments": nested
+            "comments": comments_with_viewer(nested, states),
+            "viewer": states[("answer", a.id)]
         })
 
-    db.commit()
     return {
         "total": total,
         "page": page,
         "page_size": page_size,
+        "next_cursor": next_cursor,
         "answers": results
     }
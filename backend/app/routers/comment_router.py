@@ -2,69 +2,19 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import Optional
-from datetime import datetime
 
 from app.db.database import get_db
 from app.models.comment import Comment
-from app.models.comment_like import CommentLike
-from app.models.comment_dislike import CommentDislike
-from app.models.comment_report import CommentReport
-from app.models.comment_share import CommentShare
-from app.models.event import Event
 from app.events.event_types import EventTypes
+from app.services.events.event_logger import log_event
+from app.services.content.reaction_service import ReactionService, toggle_event_types, LIKE, DISLIKE, REPORT, SHARE
+from app.services.content.comment_tree import CommentTreeLoader
+from app.services.content.counter_buffer import bump_comment_count
+from app.services.content.question_card_cache import invalidate_cards
+from app.services.content.viewer_state import comment_ids, comments_with_viewer, viewer_states
 
 router = APIRouter(prefix="/comments", tags=["Comments"])
 
-# ----------------------------
-# EVENT LOGGER
-# ----------------------------
-def log_event(
-    db: Session,
-    actor_id: Optional[int],
-    actor_role: Optional[str],
-    event_type: str,
-    target_type: str,
-    target_id: int,
-    owner_id: Optional[int] = None,
-    owner_type: str = "user",
-    is_anonymous: bool = False,
-    metadata: Optional[dict] = None,
-    session_id: Optional[str] = None,
-    request_id: Optional[str] = None,
-    feed_id: Optional[str] = None,
-    position: Optional[int] = None,
-    source: Optional[str] = None,
-    referrer: Optional[str] = None,
-    app_version: Optional[str] = None,
-    ip_address: Optional[str] = None,
-    user_agent: Optional[str] = None,
-    user_geo: Optional[str] = None,
-    latency_ms: Optional[float] = None,
-):
-    evt = Event(
-        actor_id=actor_id,
-        actor_role=actor_role,
-        event_type=event_type,
-        target_type=target_type,
-        target_id=target_id,
-        owner_id=owner_id,
-        owner_type=owner_type,
-        is_anonymous=is_anonymous,
-        metadata=metadata or {},
-        session_id=session_id,
-        request_id=request_id,
-        feed_id=feed_id,
-        position=position,
-        source=source,
-        referrer=referrer,
-        app_version=app_version,
-        ip_address=ip_address,
-        user_agent=user_agent,
-        user_geo=user_geo,
-        latency_ms=latency_ms
-    )
-    db.add(evt)
-
 # ----------------------------
 # CREATE COMMENT
 # ----------------------------
@@ -80,14 +30,16 @@ def create_comment(
 ):
     anonymous = payload.get("anonymous", False)
     c = Comment(
-        body=payload["content"],
+        content=payload["content"],
         user_id=None if anonymous else user_id,
         target_type=payload["target_type"],
         target_id=payload["target_id"]
     )
     db.add(c)
+    invalidate_cards(db, [(c.target_type, c.target_id)])
     db.commit()
     db.refresh(c)
+    bump_comment_count(db, c.target_type, c.target_id, 1)
 
     log_event(
         db,
@@ -104,7 +56,6 @@ def create_comment(
         feed_id=feed_id,
         position=position
     )
-    db.commit()
     return c
 
 # ----------------------------
@@ -121,7 +72,7 @@ def edit_comment(
     feed_id: Optional[str] = None,
     position: Optional[int] = None
 ):
-    c = db.query(Comment).filter(Comment.id == comment_id, Comment.deleted_at == None).first()
+    c = db.query(Comment).filter(Comment.id == comment_id, Comment.is_deleted.isnot(True)).first()
     if not c:
         raise HTTPException(404, "Comment not found")
     if c.user_id and c.user_id != user_id:
@@ -137,6 +88,8 @@ def edit_comment(
         c.user_id = None if payload["anonymous"] else user_id
         changes["anonymous"] = {"old": old, "new": payload["anonymous"]}
 
+    if changes:
+        invalidate_cards(db, [(c.target_type, c.target_id)])
     db.commit()
     db.refresh(c)
 
@@ -156,7 +109,6 @@ def edit_comment(
             feed_id=feed_id,
             position=position
         )
-        db.commit()
     return c
 
 # ----------------------------
@@ -172,14 +124,16 @@ def delete_comment(
     feed_id: Optional[str] = None,
     position: Optional[int] = None
 ):
-    c = db.query(Comment).filter(Comment.id == comment_id, Comment.deleted_at == None).first()
+    c = db.query(Comment).filter(Comment.id == comment_id, Comment.is_deleted.isnot(True)).first()
     if not c:
         raise HTTPException(404, "Comment not found")
     if c.user_id and c.user_id != user_id:
         raise HTTPException(403, "Not allowed")
 
-    c.deleted_at = datetime.utcnow()
+    c.is_deleted = True
+    invalidate_cards(db, [(c.target_type, c.target_id)])
     db.commit()
+    bump_comment_count(db, c.target_type, c.target_id, -1)
 
     log_event(
         db,
@@ -196,7 +150,6 @@ def delete_comment(
         feed_id=feed_id,
         position=position
     )
-    db.commit()
     return {"message": "deleted"}
 
 # ----------------------------
@@ -212,32 +165,26 @@ def like_comment(
     feed_id: Optional[str] = None,
     position: Optional[int] = None
 ):
-    c = db.query(Comment).filter(Comment.id == comment_id, Comment.deleted_at == None).first()
-    if not c:
+    result = ReactionService(db).toggle("comment", comment_id, user_id, LIKE)
+    if result is None:
         raise HTTPException(404, "Comment not found")
 
-    if db.query(CommentLike).filter_by(comment_id=comment_id, user_id=user_id).first():
-        raise HTTPException(400, "Already liked")
-
-    db.add(CommentLike(comment_id=comment_id, user_id=user_id))
-    db.commit()
-
-    log_event(
-        db,
-        actor_id=user_id,
-        actor_role="user",
-        event_type=EventTypes.COMMENT_LIKED,
-        target_type="comment",
-        target_id=comment_id,
-        owner_id=c.user_id,
-        is_anonymous=False,
-        session_id=session_id,
-        request_id=request_id,
-        feed_id=feed_id,
-        position=position
-    )
-    db.commit()
-    return {"liked": True}
+    for event_type in toggle_event_types("comment", LIKE, result):
+        log_event(
+            db,
+            actor_id=user_id,
+            actor_role="user",
+            event_type=event_type,
+            target_type="comment",
+            target_id=comment_id,
+            owner_id=result["owner_id"],
+            is_anonymous=False,
+            session_id=session_id,
+            request_id=request_id,
+            feed_id=feed_id,
+            position=position
+        )
+    return {"liked": result["active"], "likes": result["likes"], "dislikes": result["dislikes"]}
 
 # ----------------------------
 # DISLIKE COMMENT
@@ -252,32 +199,26 @@ def dislike_comment(
     feed_id: Optional[str] = None,
     position: Optional[int] = None
 ):
-    c = db.query(Comment).filter(Comment.id == comment_id, Comment.deleted_at == None).first()
-    if not c:
+    result = ReactionService(db).toggle("comment", comment_id, user_id, DISLIKE)
+    if result is None:
         raise HTTPException(404, "Comment not found")
 
-    if db.query(CommentDislike).filter_by(comment_id=comment_id, user_id=user_id).first():
-        raise HTTPException(400, "Already disliked")
-
-    db.add(CommentDislike(comment_id=comment_id, user_id=user_id))
-    db.commit()
-
-    log_event(
-        db,
-        actor_id=user_id,
-        actor_role="user",
-        event_type=EventTypes.COMMENT_DISLIKED,
-        target_type="comment",
-        target_id=comment_id,
-        owner_id=c.user_id,
-        is_anonymous=False,
-        session_id=session_id,
-        request_id=request_id,
-        feed_id=feed_id,
-        position=position
-    )
-    db.commit()
-    return {"disliked": True}
+    for event_type in toggle_event_types("comment", DISLIKE, result):
+        log_event(
+            db,
+            actor_id=user_id,
+            actor_role="user",
+            event_type=event_type,
+            target_type="comment",
+            target_id=comment_id,
+            owner_id=result["owner_id"],
+            is_anonymous=False,
+            session_id=session_id,
+            request_id=request_id,
+            feed_id=feed_id,
+            position=position
+        )
+    return {"disliked": result["active"], "likes": result["likes"], "dislikes": result["dislikes"]}
 
 # ----------------------------
 # REPORT COMMENT
@@ -293,12 +234,11 @@ def report_comment(
     feed_id: Optional[str] = None,
     position: Optional[int] = None
 ):
-    c = db.query(Comment).filter(Comment.id == comment_id, Comment.deleted_at == None).first()
+    c = db.query(Comment).filter(Comment.id == comment_id, Comment.is_deleted.isnot(True)).first()
     if not c:
         raise HTTPException(404, "Comment not found")
 
-    db.add(CommentReport(comment_id=comment_id, user_id=user_id, reason=reason))
-    db.commit()
+    ReactionService(db).record("comment", comment_id, user_id, REPORT, detail=reason)
 
     log_event(
         db,
@@ -315,7 +255,6 @@ def report_comment(
         feed_id=feed_id,
         position=position
     )
-    db.commit()
     return {"message": "reported"}
 
 # ----------------------------
@@ -332,12 +271,11 @@ def share_comment(
     feed_id: Optional[str] = None,
     position: Optional[int] = None
 ):
-    c = db.query(Comment).filter(Comment.id == comment_id, Comment.deleted_at == None).first()
+    c = db.query(Comment).filter(Comment.id == comment_id, Comment.is_deleted.isnot(True)).first()
     if not c:
         raise HTTPException(404, "Comment not found")
 
-    db.add(CommentShare(comment_id=comment_id, user_id=user_id, platform=platform))
-    db.commit()
+    ReactionService(db).record("comment", comment_id, user_id, SHARE, detail=platform)
 
     log_event(
         db,
@@ -354,7 +292,6 @@ def share_comment(
         feed_id=feed_id,
         position=position
     )
-    db.commit()
     return {"message": "shared"}
 
 # ----------------------------
@@ -370,7 +307,7 @@ def get_comment_thread(
     feed_id: Optional[str] = None,
     position: Optional[int] = None
 ):
-    root = db.query(Comment).filter(Comment.id == comment_id, Comment.deleted_at == None).first()
+    root = db.query(Comment).filter(Comment.id == comment_id, Comment.is_deleted.isnot(True)).first()
     if not root:
         raise HTTPException(404, "Comment not found")
 
@@ -388,21 +325,9 @@ def get_comment_thread(
         feed_id=feed_id,
         position=position
     )
-    db.commit()
 
-    def build(c: Comment) -> dict:
-        children = db.query(Comment).filter(
-            Comment.target_type == "comment",
-            Comment.target_id == c.id,
-            Comment.deleted_at == None
-        ).all()
-        return {
-            "id": c.id,
-            "body": c.body,
-            "user_id": c.user_id,
-            "is_anonymous": c.is_anonymous,
-            "created_at": c.created_at,
-            "comments": [build(ch) for ch in children]
-        }
-
-    return build(root)
+    thread = CommentTreeLoader(db).for_roots([root])
+    if not thread:
+        raise HTTPException(404, "Comment not found")
+    states = viewer_states(db, user_id, [("comment", cid) for cid in comment_ids(thread)])
+    return comments_with_viewer(thread, states)[0]
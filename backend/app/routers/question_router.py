@@ -1,73 +1,25 @@
 # app/routers/questions.py
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from typing import Optional
-from datetime import datetime
 
 from app.db.database import get_db
+from app.core.pagination import InvalidCursor, decode_cursor, paginate
 from app.models.question import Question
-from app.models.question_like import QuestionLike
-from app.models.question_dislike import QuestionDislike
-from app.models.question_report import QuestionReport
-from app.models.question_share import QuestionShare
 from app.models.answer import Answer
 from app.models.comment import Comment
-from app.models.event import Event
 from app.events.event_types import EventTypes
+from app.services.events.event_logger import log_event
+from app.services.content.reaction_service import ReactionService, toggle_event_types, reaction_counts, LIKE, DISLIKE, REPORT, SHARE
+from app.services.events.event_aggregator import EventAggregator
+from app.services.events.unique_counter import UniqueCounterService
+from app.services.content.comment_tree import CommentTreeLoader
+from app.services.content.counter_buffer import counter_buffer
+from app.services.content.question_card_cache import card_cache_key, invalidate_cards, question_card_cache
+from app.services.content.viewer_state import comment_ids, comments_with_viewer, viewer_states, with_viewer
 
 router = APIRouter(prefix="/questions", tags=["Questions"])
 
-# ----------------------------
-# Generic Event Logger
-# ----------------------------
-def log_event(
-    db: Session,
-    actor_id: Optional[int],
-    actor_role: Optional[str],
-    event_type: str,
-    target_type: str,
-    target_id: int,
-    owner_id: Optional[int] = None,
-    owner_type: str = "user",
-    is_anonymous: bool = False,
-    metadata: Optional[dict] = None,
-    session_id: Optional[str] = None,
-    request_id: Optional[str] = None,
-    feed_id: Optional[str] = None,
-    position: Optional[int] = None,
-    source: Optional[str] = None,
-    referrer: Optional[str] = None,
-    app_version: Optional[str] = None,
-    ip_address: Optional[str] = None,
-    user_agent: Optional[str] = None,
-    user_geo: Optional[str] = None,
-    latency_ms: Optional[float] = None,
-):
-    evt = Event(
-        actor_id=actor_id,
-        actor_role=actor_role,
-        event_type=event_type,
-        target_type=target_type,
-        target_id=target_id,
-        owner_id=owner_id,
-        owner_type=owner_type,
-        is_anonymous=is_anonymous,
-        metadata=metadata or {},
-        session_id=session_id,
-        request_id=request_id,
-        feed_id=feed_id,
-        position=position,
-        source=source,
-        referrer=referrer,
-        app_version=app_version,
-        ip_address=ip_address,
-        user_agent=user_agent,
-        user_geo=user_geo,
-        latency_ms=latency_ms
-    )
-    db.add(evt)
-
 # ----------------------------
 # CREATE QUESTION
 # ----------------------------
@@ -106,7 +58,6 @@ def create_question(
         feed_id=feed_id,
         position=position
     )
-    db.commit()
     return {"id": q.id, "created_at": q.created_at}
 
 # ----------------------------
@@ -123,7 +74,7 @@ def update_question(
     feed_id: Optional[str] = None,
     position: Optional[int] = None
 ):
-    q = db.query(Question).filter(Question.id == question_id, Question.deleted_at == None).first()
+    q = db.query(Question).filter(Question.id == question_id, Question.is_deleted.isnot(True)).first()
     if not q:
         raise HTTPException(404, "Question not found")
     if q.user_id and q.user_id != user_id:
@@ -141,6 +92,8 @@ def update_question(
         q.user_id = None if payload["anonymous"] else user_id
         changes["anonymous"] = {"old": old, "new": payload["anonymous"]}
 
+    if changes:
+        invalidate_cards(db, [("question", q.id)])
     db.commit()
     db.refresh(q)
 
@@ -160,7 +113,6 @@ def update_question(
             feed_id=feed_id,
             position=position
         )
-        db.commit()
 
     return {"message": "updated", "updated_at": q.updated_at}
 
@@ -177,13 +129,13 @@ def delete_question(
     feed_id: Optional[str] = None,
     position: Optional[int] = None
 ):
-    q = db.query(Question).filter(Question.id == question_id, Question.deleted_at == None).first()
+    q = db.query(Question).filter(Question.id == question_id, Question.is_deleted.isnot(True)).first()
     if not q:
         raise HTTPException(404, "Question not found")
     if q.user_id and q.user_id != user_id:
         raise HTTPException(403, "Not allowed")
 
-    q.deleted_at = datetime.utcnow()
+    q.is_deleted = True
     db.commit()
 
     log_event(
@@ -201,7 +153,6 @@ def delete_question(
         feed_id=feed_id,
         position=position
     )
-    db.commit()
     return {"message": "deleted"}
 
 # ----------------------------
@@ -217,31 +168,26 @@ def like_question(
     feed_id: Optional[str] = None,
     position: Optional[int] = None
 ):
-    q = db.query(Question).filter(Question.id == question_id, Question.deleted_at == None).first()
-    if not q:
+    result = ReactionService(db).toggle("question", question_id, user_id, LIKE)
+    if result is None:
         raise HTTPException(404, "Question not found")
-    if db.query(QuestionLike).filter_by(question_id=question_id, user_id=user_id).first():
-        raise HTTPException(400, "Already liked")
 
-    db.add(QuestionLike(question_id=question_id, user_id=user_id))
-    db.commit()
-
-    log_event(
-        db,
-        actor_id=user_id,
-        actor_role="user",
-        event_type=EventTypes.QUESTION_LIKED,
-        target_type="question",
-        target_id=question_id,
-        owner_id=q.user_id,
-        is_anonymous=False,
-        session_id=session_id,
-        request_id=request_id,
-        feed_id=feed_id,
-        position=position
-    )
-    db.commit()
-    return {"liked": True}
+    for event_type in toggle_event_types("question", LIKE, result):
+        log_event(
+            db,
+            actor_id=user_id,
+            actor_role="user",
+            event_type=event_type,
+            target_type="question",
+            target_id=question_id,
+            owner_id=result["owner_id"],
+            is_anonymous=False,
+            session_id=session_id,
+            request_id=request_id,
+            feed_id=feed_id,
+            position=position
+        )
+    return {"liked": result["active"], "likes": result["likes"], "dislikes": result["dislikes"]}
 
 # ----------------------------
 # DISLIKE QUESTION
@@ -256,31 +202,26 @@ def dislike_question(
     feed_id: Optional[str] = None,
     position: Optional[int] = None
 ):
-    q = db.query(Question).filter(Question.id == question_id, Question.deleted_at == None).first()
-    if not q:
+    result = ReactionService(db).toggle("question", question_id, user_id, DISLIKE)
+    if result is None:
         raise HTTPException(404, "Question not found")
-    if db.query(QuestionDislike).filter_by(question_id=question_id, user_id=user_id).first():
-        raise HTTPException(400, "Already disliked")
-
-    db.add(QuestionDislike(question_id=question_id, user_id=user_id))
-    db.commit()
 
-    log_event(
-        db,
-        actor_id=user_id,
-        actor_role="user",
-        event_type=EventTypes.QUESTION_DISLIKED,
-        target_type="question",
-        target_id=question_id,
-        owner_id=q.user_id,
-        is_anonymous=False,
-        session_id=session_id,
-        request_id=request_id,
-        feed_id=feed_id,
-        position=position
-    )
-    db.commit()
-    return {"disliked": True}
+    for event_type in toggle_event_types("question", DISLIKE, result):
+        log_event(
+            db,
+            actor_id=user_id,
+            actor_role="user",
+            event_type=event_type,
+            target_type="question",
+            target_id=question_id,
+            owner_id=result["owner_id"],
+            is_anonymous=False,
+            session_id=session_id,
+            request_id=request_id,
+            feed_id=feed_id,
+            position=position
+        )
+    return {"disliked": result["active"], "likes": result["likes"], "dislikes": result["dislikes"]}
 
 # ----------------------------
 # REPORT QUESTION
@@ -296,12 +237,11 @@ def report_question(
     feed_id: Optional[str] = None,
     position: Optional[int] = None
 ):
-    q = db.query(Question).filter(Question.id == question_id, Question.deleted_at == None).first()
+    q = db.query(Question).filter(Question.id == question_id, Question.is_deleted.isnot(True)).first()
     if not q:
         raise HTTPException(404, "Question not found")
 
-    db.add(QuestionReport(question_id=question_id, user_id=user_id, reason=reason))
-    db.commit()
+    ReactionService(db).record("question", question_id, user_id, REPORT, detail=reason)
 
     log_event(
         db,
@@ -318,7 +258,6 @@ def report_question(
         feed_id=feed_id,
         position=position
     )
-    db.commit()
     return {"message": "reported"}
 
 # ----------------------------
@@ -335,12 +274,11 @@ def share_question(
     feed_id: Optional[str] = None,
     position: Optional[int] = None
 ):
-    q = db.query(Question).filter(Question.id == question_id, Question.deleted_at == None).first()
+    q = db.query(Question).filter(Question.id == question_id, Question.is_deleted.isnot(True)).first()
     if not q:
         raise HTTPException(404, "Question not found")
 
-    db.add(QuestionShare(question_id=question_id, user_id=user_id, platform=platform))
-    db.commit()
+    ReactionService(db).record("question", question_id, user_id, SHARE, detail=platform)
 
     log_event(
         db,
@@ -357,39 +295,8 @@ def share_question(
         feed_id=feed_id,
         position=position
     )
-    db.commit()
     return {"message": "shared"}
 
-# ----------------------------
-# Recursive comments helper with engagement metrics
-# ----------------------------
-def _get_comment_recursive(db: Session, comment: Comment) -> dict:
-    children = db.query(Comment).filter(
-        Comment.target_type == "comment",
-        Comment.target_id == comment.id,
-        Comment.deleted_at == None
-    ).all()
-
-    # Engagement metrics per comment
-    comment_events = db.query(Event).filter(Event.target_type == "comment", Event.target_id == comment.id).all()
-    comment_engagement_metrics = {
-        "total_events": len(comment_events),
-        "likes_events": len([e for e in comment_events if e.event_type == EventTypes.COMMENT_LIKED]),
-        "dislikes_events": len([e for e in comment_events if e.event_type == EventTypes.COMMENT_DISLIKED]),
-        "reports_events": len([e for e in comment_events if e.event_type == EventTypes.COMMENT_REPORTED]),
-        "shares_events": len([e for e in comment_events if e.event_type == EventTypes.COMMENT_SHARED])
-    }
-
-    return {
-        "id": comment.id,
-        "body": comment.body,
-        "user_id": comment.user_id,
-        "is_anonymous": comment.user_id is None,
-        "created_at": comment.created_at,
-        "engagement_metrics": comment_engagement_metrics,
-        "comments": [_get_comment_recursive(db, ch) for ch in children]
-    }
-
 # ----------------------------
 # GET QUESTION CARD (full view)
 # ----------------------------
@@ -401,6 +308,9 @@ def get_question_card(
     answers_page_size: int = 10,
     comments_page: int = 1,
     comments_page_size: int = 10,
+    answers_cursor: Optional[str] = None,
+    comments_cursor: Optional[str] = None,
+    exact_totals: bool = False,
     include_ai_summary: bool = False,
     user_id: Optional[int] = None,
     session_id: Optional[str] = None,
@@ -408,8 +318,15 @@ def get_question_card(
     feed_id: Optional[str] = None,
     position: Optional[int] = None
 ):
+    for cursor in (answers_cursor, comments_cursor):
+        if cursor:
+            try:
+                decode_cursor(cursor)
+            except InvalidCursor:
+                raise HTTPException(400, "Invalid cursor")
+
     # Fetch question
-    q = db.query(Question).filter(Question.id == question_id, Question.deleted_at == None).first()
+    q = db.query(Question).filter(Question.id == question_id, Question.is_deleted.isnot(True)).first()
     if not q:
         raise HTTPException(404, "Question not found")
 
@@ -431,56 +348,104 @@ def get_question_card(
         feed_id=feed_id,
         position=position
     )
-    db.commit()
+
+    # Served from cache until something under the question changes
+    key = card_cache_key(
+        q,
+        answers_page=answers_page,
+        answers_page_size=answers_page_size,
+        comments_page=comments_page,
+        comments_page_size=comments_page_size,
+        answers_cursor=answers_cursor,
+        comments_cursor=comments_cursor,
+        exact_totals=exact_totals
+    )
+    card = question_card_cache.get_or_build(
+        key,
+        lambda: _build_question_card(
+            db, q, answers_page, answers_page_size, comments_page, comments_page_size,
+            answers_cursor, comments_cursor, exact_totals
+        )
+    )
+    return _with_viewer_state(db, card, user_id)
+
+
+def _with_viewer_state(db: Session, card: dict, user_id: Optional[int]) -> dict:
+    """
+    Overlays the viewer's liked/disliked/reported flags on a (shared, cached)
+    card with one batched lookup; returns copies.
+    """
+    question_id = card["question"]["id"]
+    targets = [("question", question_id)]
+    targets += [("answer", a["id"]) for a in card["answers"]]
+    targets += [("comment", cid) for a in card["answers"] for cid in comment_ids(a["comments"])]
+    targets += [("comment", cid) for cid in comment_ids(card["comments"])]
+    states = viewer_states(db, user_id, targets)
+
+    return {
+        **card,
+        "question": with_viewer(card["question"], states[("question", question_id)]),
+        "answers": [
+            {**with_viewer(a, states[("answer", a["id"])]), "comments": comments_with_viewer(a["comments"], states)}
+            for a in card["answers"]
+        ],
+        "comments": comments_with_viewer(card["comments"], states)
+    }
+
+
+def _build_question_card(
+    db: Session,
+    q: Question,
+    answers_page: int,
+    answers_page_size: int,
+    comments_page: int,
+    comments_page_size: int,
+    answers_cursor: Optional[str] = None,
+    comments_cursor: Optional[str] = None,
+    exact_totals: bool = False
+) -> dict:
+    question_id = q.id
+    counters = counter_buffer.merge(
+        "question", q.id, {"answers_count": q.answers_count or 0, "comments_count": q.comments_count or 0}
+    )
 
     # ----------------------------
     # Question engagement metrics
     # ----------------------------
-    question_events = db.query(Event).filter(Event.target_type == "question", Event.target_id == question_id).all()
-    question_engagement_metrics = {
-        "total_events": len(question_events),
-        "likes_events": len([e for e in question_events if e.event_type == EventTypes.QUESTION_LIKED]),
-        "dislikes_events": len([e for e in question_events if e.event_type == EventTypes.QUESTION_DISLIKED]),
-        "reports_events": len([e for e in question_events if e.event_type == EventTypes.QUESTION_REPORTED]),
-        "shares_events": len([e for e in question_events if e.event_type == EventTypes.QUESTION_SHARED]),
-        "answers_events": len([e for e in question_events if e.event_type == EventTypes.ANSWER_CREATED]),
-        "comments_events": len([e for e in question_events if e.event_type.startswith("comment_")])
-    }
+    # Rollup-backed counts, as for the answers below; no raw event scan
+    aggregator = EventAggregator(db)
+    question_metrics = aggregator.get_batch_metrics("question", [question_id])[question_id]
+    question_engagement_metrics = {k: v for k, v in question_metrics.items() if k != "weighted_score"}
+    # answer_created events target the answer, so the counter stands in
+    question_engagement_metrics["answers_events"] = counters["answers_count"]
 
     # ----------------------------
     # Paginated answers
     # ----------------------------
-    ans_q = db.query(Answer).filter(Answer.question_id == question_id, Answer.deleted_at == None)
-    total_answers = ans_q.count()
-    answers = ans_q.order_by(Answer.created_at.desc()).offset((answers_page-1)*answers_page_size).limit(answers_page_size).all()
+    ans_q = db.query(Answer).filter(Answer.question_id == question_id, Answer.is_deleted.isnot(True))
+    total_answers = ans_q.count() if exact_totals else counters["answers_count"]
+    answers, next_answers_cursor = paginate(
+        ans_q, Answer.created_at, Answer.id, answers_page_size, cursor=answers_cursor, page=answers_page
+    )
     answer_ids = [a.id for a in answers]
 
     # Engagement metrics for answers
-    from app.models.answer_like import AnswerLike
-    from app.models.answer_dislike import AnswerDislike
-    from app.models.answer_report import AnswerReport
-    from app.models.answer_share import AnswerShare
+    reactions_map = reaction_counts(db, "answer", answer_ids)
+    unique_counter = UniqueCounterService(db)
+    answer_uniques = unique_counter.unique_metrics("answer", answer_ids)
 
-    likes_map = dict(db.query(AnswerLike.answer_id, func.count()).filter(AnswerLike.answer_id.in_(answer_ids)).group_by(AnswerLike.answer_id).all())
-    dislikes_map = dict(db.query(AnswerDislike.answer_id, func.count()).filter(AnswerDislike.answer_id.in_(answer_ids)).group_by(AnswerDislike.answer_id).all())
-    reports_map = dict(db.query(AnswerReport.answer_id, func.count()).filter(AnswerReport.answer_id.in_(answer_ids)).group_by(AnswerReport.answer_id).all())
-    shares_map = dict(db.query(AnswerShare.answer_id, func.count()).filter(AnswerShare.answer_id.in_(answer_ids)).group_by(AnswerShare.answer_id).all())
+    answer_metrics_map = aggregator.get_batch_metrics("answer", answer_ids)
+
+    # Comment trees for every answer on the page in one pass
+    comment_loader = CommentTreeLoader(db, with_engagement=True)
+    answer_comments_map = comment_loader.for_targets("answer", answer_ids)
 
     answers_data = []
     for a in answers:
-        answer_comments = db.query(Comment).filter(Comment.target_type == "answer", Comment.target_id == a.id, Comment.deleted_at == None).all()
-        nested_comments = [_get_comment_recursive(db, c) for c in answer_comments]
-
-        # Answer events
-        answer_events = db.query(Event).filter(Event.target_type == "answer", Event.target_id == a.id).all()
-        answer_engagement_metrics = {
-            "total_events": len(answer_events),
-            "likes_events": len([e for e in answer_events if e.event_type == EventTypes.ANSWER_LIKED]),
-            "dislikes_events": len([e for e in answer_events if e.event_type == EventTypes.ANSWER_DISLIKED]),
-            "reports_events": len([e for e in answer_events if e.event_type == EventTypes.ANSWER_REPORTED]),
-            "shares_events": len([e for e in answer_events if e.event_type == EventTypes.ANSWER_SHARED]),
-            "comments_events": len([e for e in answer_events if e.event_type.startswith("comment_")])
-        }
+        nested_comments = answer_comments_map[a.id]
+
+        # Answer events (batched above)
+        answer_engagement_metrics = {k: v for k, v in answer_metrics_map[a.id].items() if k != "weighted_score"}
 
         answers_data.append({
             "id": a.id,
@@ -488,22 +453,26 @@ def get_question_card(
             "user_id": None if a.user_id is None else a.user_id,
             "is_anonymous": a.user_id is None,
             "created_at": a.created_at,
-            "likes": likes_map.get(a.id, 0),
-            "dislikes": dislikes_map.get(a.id, 0),
-            "reports": reports_map.get(a.id, 0),
-            "shares": shares_map.get(a.id, 0),
+            "likes": reactions_map[a.id]["likes"],
+            "dislikes": reactions_map[a.id]["dislikes"],
+            "reports": reactions_map[a.id]["reports"],
+            "shares": reactions_map[a.id]["shares"],
             "comments_count": len(nested_comments),
             "comments": nested_comments,
-            "engagement_metrics": answer_engagement_metrics
+            "engagement_metrics": answer_engagement_metrics,
+            **answer_uniques[a.id]
         })
 
     # ----------------------------
     # Paginated question comments
     # ----------------------------
-    question_comments_q = db.query(Comment).filter(Comment.target_type == "question", Comment.target_id == question_id, Comment.deleted_at == None)
-    total_q_comments = question_comments_q.count()
-    q_comments = question_comments_q.order_by(Comment.created_at.asc()).offset((comments_page-1)*comments_page_size).limit(comments_page_size).all()
-    comments_data = [_get_comment_recursive(db, c) for c in q_comments]
+    question_comments_q = db.query(Comment).filter(Comment.target_type == "question", Comment.target_id == question_id, Comment.is_deleted.isnot(True))
+    total_q_comments = question_comments_q.count() if exact_totals else counters["comments_count"]
+    q_comments, next_comments_cursor = paginate(
+        question_comments_q, Comment.created_at, Comment.id, comments_page_size,
+        cursor=comments_cursor, page=comments_page, descending=False
+    )
+    comments_data = comment_loader.for_roots(q_comments)
 
     return {
         "question": {
@@ -513,15 +482,19 @@ def get_question_card(
             "user_id": None if q.user_id is None else q.user_id,
             "is_anonymous": q.user_id is None,
             "created_at": q.created_at,
-            "engagement_metrics": question_engagement_metrics
+            "engagement_metrics": question_engagement_metrics,
+            # distinct users/sessions (HyperLogLog estimates; cached with the card)
+            **unique_counter.unique_metrics("question", [q.id])[q.id]
         },
         "answers": answers_data,
         "comments": comments_data,
         "total_answers": total_answers,
         "answers_page": answers_page,
         "answers_page_size": answers_page_size,
+        "next_answers_cursor": next_answers_cursor,
         "total_comments": total_q_comments,
         "comments_page": comments_page,
-        "comments_page_size": comments_page_size
+        "comments_page_size": comments_page_size,
+        "next_comments_cursor": next_comments_cursor
     }
 
@@ -1,10 +1,10 @@
 # app/services/content/answer_service.py
 from typing import Optional, Dict
-from datetime import datetime
 from sqlalchemy.orm import Session
 from app.models.answer import Answer
 from app.services.events.event_aggregator import EventAggregator
 from app.events.event_types import EventTypes
+from app.services.content.question_card_cache import invalidate_cards
 
 class AnswerService:
     """
@@ -30,6 +30,7 @@ class AnswerService:
             user_id=None if anonymous else user_id
         )
         self.db.add(ans)
+        invalidate_cards(self.db, [("question", question_id)])
         self.db.commit()
         self.db.refresh(ans)
 
@@ -44,7 +45,6 @@ class AnswerService:
             is_anonymous=anonymous,
             metadata={"question_id": question_id}
         )
-        self.db.commit()
         return ans
 
     def update_answer(self, answer: Answer, content: Optional[str] = None, anonymous: Optional[bool] = None) -> Answer:
@@ -58,6 +58,8 @@ class AnswerService:
             answer.user_id = None if anonymous else answer.user_id
             changes["anonymous"] = {"old": old, "new": anonymous}
 
+        if changes:
+            invalidate_cards(self.db, [("question", answer.question_id)])
         self.db.commit()
         self.db.refresh(answer)
 
@@ -73,12 +75,12 @@ class AnswerService:
                 is_anonymous=answer.user_id is None,
                 metadata=changes
             )
-            self.db.commit()
         return answer
 
     def delete_answer(self, answer: Answer) -> None:
         from app.services.events.event_logger import log_event
-        answer.deleted_at = datetime.utcnow()
+        answer.is_deleted = True
+        invalidate_cards(self.db, [("question", answer.question_id)])
         self.db.commit()
 
         log_event(
@@ -92,7 +94,6 @@ class AnswerService:
             is_anonymous=answer.user_id is None,
             metadata={"question_id": answer.question_id}
         )
-        self.db.commit()
 
     # ----------------------------
     # Engagement & scoring
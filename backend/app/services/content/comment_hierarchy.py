@@ -0,0 +1,127 @@
+# app/services/content/comment_hierarchy.py
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, bindparam, func, or_
+from sqlalchemy.orm import Session
+
+from app.models.comment import Comment, PATH_SEGMENT_WIDTH, path_segment
+
+LOG = logging.getLogger("comment_hierarchy")
+
+ROOT_TYPES = ("question", "answer")
+
+
+# ----------------------------
+# Query helpers
+# ----------------------------
+def subtree_bounds(path: str) -> Tuple[str, str]:
+    """
+    [lo, hi) range of paths covering a comment and all of its replies: every
+    descendant path starts with `path`, and the next sibling's prefix sorts
+    after all of them.
+    """
+    last = int(path[-PATH_SEGMENT_WIDTH:])
+    return path, path[:-PATH_SEGMENT_WIDTH] + path_segment(last + 1)
+
+
+def in_subtree(path: str, max_depth: Optional[int] = None, depth: int = 0):
+    """
+    Filter for a subtree as an indexed range on Comment.path, optionally
+    limited to `max_depth` levels below the comment at `depth`.
+    """
+    lo, hi = subtree_bounds(path)
+    condition = and_(Comment.path >= lo, Comment.path < hi)
+    if max_depth is not None:
+        condition = and_(condition, Comment.depth <= depth + max_depth)
+    return condition
+
+
+def in_subtrees(comments: List[Comment], max_depth: Optional[int] = None):
+    return or_(*[in_subtree(c.path, max_depth, c.depth) for c in comments])
+
+
+def in_threads(root_type: str, root_ids: List[int]):
+    """
+    Filter for every comment under the given questions/answers; ordered by
+    (root_id, path) this is one range scan of ix_comments_root_path.
+    """
+    return and_(Comment.root_type == root_type, Comment.root_id.in_(root_ids))
+
+
+def thread_query(db: Session, root_type: str, root_id: int, max_depth: Optional[int] = None):
+    """
+    All comments for a question/answer, in thread order.
+    """
+    query = db.query(Comment).filter(in_threads(root_type, [root_id]), Comment.is_deleted.isnot(True))
+    if max_depth is not None:
+        query = query.filter(Comment.depth <= max_depth)
+    return query.order_by(Comment.path)
+
+
+def subtree_query(db: Session, comment: Comment, max_depth: Optional[int] = None):
+    """
+    A comment and its replies up to `max_depth` levels down, in thread order.
+    """
+    return db.query(Comment)\
+        .filter(in_subtree(comment.path, max_depth, comment.depth), Comment.is_deleted.isnot(True))\
+        .order_by(Comment.path)
+
+
+# ----------------------------
+# Backfill
+# ----------------------------
+def backfill_hierarchy(db: Session, batch_size: int = 1000) -> Dict[str, int]:
+    """
+    Fills root/depth/path on comments created before the hierarchy index
+    existed, one level at a time starting from top-level comments. Each batch
+    commits on its own, so the command can be interrupted and rerun.
+    Comments whose parent chain is broken are left unindexed and counted.
+    """
+    table = Comment.__table__
+    stmt = table.update()\
+        .where(table.c.id == bindparam("_id"))\
+        .values(root_type=bindparam("_root_type"), root_id=bindparam("_root_id"),
+                depth=bindparam("_depth"), path=bindparam("_path"), updated_at=table.c.updated_at)
+
+    updated = 0
+    depth = 0
+    while True:
+        if depth == 0:
+            pending = db.query(Comment.id, Comment.target_type, Comment.target_id)\
+                .filter(Comment.path.is_(None), Comment.target_type.in_(ROOT_TYPES))
+        else:
+            Parent = table.alias("parent")
+            pending = db.query(Comment.id, Parent.c.root_type, Parent.c.root_id, Parent.c.path)\
+                .join(Parent, Parent.c.id == Comment.target_id)\
+                .filter(Comment.path.is_(None), Comment.target_type == "comment", Parent.c.depth == depth - 1)
+
+        level = 0
+        while True:
+            rows = pending.order_by(Comment.id).limit(batch_size).all()
+            if not rows:
+                break
+            if depth == 0:
+                params = [
+                    {"_id": cid, "_root_type": t, "_root_id": tid, "_depth": 0, "_path": path_segment(cid)}
+                    for cid, t, tid in rows
+                ]
+            else:
+                params = [
+                    {"_id": cid, "_root_type": rt, "_root_id": rid, "_depth": depth, "_path": ppath + path_segment(cid)}
+                    for cid, rt, rid, ppath in rows
+                ]
+            db.execute(stmt, params)
+            db.commit()
+            level += len(rows)
+
+        LOG.info("indexed %s comments at depth %s", level, depth)
+        updated += level
+
+        # Rows indexed by an earlier, interrupted run still count as parents
+        if db.query(Comment.id).filter(Comment.depth == depth).first() is None:
+            break
+        depth += 1
+
+    orphaned = db.query(func.count(Comment.id)).filter(Comment.path.is_(None)).scalar() or 0
+    return {"updated": updated, "levels": depth, "orphaned": orphaned}
@@ -1,10 +1,11 @@
 # app/services/content/comment_service.py
 from typing import Optional, Dict
-from datetime import datetime
 from sqlalchemy.orm import Session
 from app.models.comment import Comment
 from app.services.events.event_aggregator import EventAggregator
 from app.events.event_types import EventTypes
+from app.services.content.counter_buffer import bump_comment_count
+from app.services.content.question_card_cache import invalidate_cards
 
 class CommentService:
     """
@@ -25,14 +26,16 @@ class CommentService:
         from app.services.events.event_logger import log_event
 
         c = Comment(
-            body=content,
+            content=content,
             target_type=target_type,
             target_id=target_id,
             user_id=None if anonymous else user_id
         )
         self.db.add(c)
+        invalidate_cards(self.db, [(target_type, target_id)])
         self.db.commit()
         self.db.refresh(c)
+        bump_comment_count(self.db, target_type, target_id, 1)
 
         log_event(
             self.db,
@@ -45,7 +48,6 @@ class CommentService:
             is_anonymous=anonymous,
             metadata={"target_type": target_type, "target_id": target_id}
         )
-        self.db.commit()
         return c
 
     def update_comment(self, comment: Comment, content: Optional[str] = None, anonymous: Optional[bool] = None) -> Comment:
@@ -59,6 +61,8 @@ class CommentService:
             comment.user_id = None if anonymous else comment.user_id
             changes["anonymous"] = {"old": old, "new": anonymous}
 
+        if changes:
+            invalidate_cards(self.db, [(comment.target_type, comment.target_id)])
         self.db.commit()
         self.db.refresh(comment)
 
@@ -74,13 +78,16 @@ class CommentService:
                 is_anonymous=comment.user_id is None,
                 metadata=changes
             )
-            self.db.commit()
         return comment
 
     def delete_comment(self, comment: Comment) -> None:
         from app.services.events.event_logger import log_event
-        comment.deleted_at = datetime.utcnow()
+        if comment.is_deleted:
+            return
+        comment.is_deleted = True
+        invalidate_cards(self.db, [(comment.target_type, comment.target_id)])
         self.db.commit()
+        bump_comment_count(self.db, comment.target_type, comment.target_id, -1)
 
         log_event(
             self.db,
@@ -93,7 +100,6 @@ class CommentService:
             is_anonymous=comment.user_id is None,
             metadata={"target_type": comment.target_type, "target_id": comment.target_id}
         )
-        self.db.commit()
 
     # ----------------------------
     # Engagement & nested comments
@@ -0,0 +1,121 @@
+# app/services/content/comment_tree.py
+from typing import Any, Dict, Iterable, List, Set
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from app.models.comment import Comment
+from app.services.content.comment_hierarchy import in_subtree, in_threads
+from app.services.content.reaction_service import reaction_counts
+
+
+class CommentTreeLoader:
+    """
+    Loads nested comment threads in a constant number of queries.
+    Whole threads are fetched in thread order with one range scan of the
+    comment hierarchy index (root id / materialized path); reaction counts and
+    event metrics are attached in bulk and the nested dicts are assembled in
+    memory.
+    """
+
+    def __init__(self, db: Session, with_reactions: bool = False, with_engagement: bool = False):
+        self.db = db
+        self.with_reactions = with_reactions
+        self.with_engagement = with_engagement
+
+    # ----------------------------
+    # Public entry points
+    # ----------------------------
+    def for_targets(self, target_type: str, target_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Full comment trees attached to each question/answer, keyed by target id.
+        """
+        trees: Dict[int, List[Dict[str, Any]]] = {tid: [] for tid in target_ids}
+        if not target_ids:
+            return trees
+
+        nodes = self._load(in_threads(target_type, list(dict.fromkeys(target_ids))), set())
+        roots = [n for n in nodes.values() if n["_row"].depth == 0]
+        for node in roots:
+            trees[node["_row"].target_id].append(node)
+        for node in roots:
+            self._strip(node)
+        return trees
+
+    def for_roots(self, roots: Iterable[Comment]) -> List[Dict[str, Any]]:
+        """
+        Each given comment with all of its replies, in the given order.
+        """
+        roots = list(roots)
+        root_ids = [c.id for c in roots]
+        if not root_ids:
+            return []
+
+        # Rows not yet backfilled have no path; they come back without replies
+        condition = or_(*[in_subtree(c.path, depth=c.depth) if c.path else Comment.id == c.id for c in roots])
+        nodes = self._load(condition, set(root_ids))
+        return [self._strip(nodes[cid]) for cid in root_ids if cid in nodes]
+
+    # ----------------------------
+    # Loading
+    # ----------------------------
+    def _load(self, condition, root_ids: Set[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Loads the matching comments as nodes keyed by id, with replies
+        attached to their parents (requested roots are never attached).
+        """
+        query = select(
+            Comment.id,
+            Comment.content,
+            Comment.user_id,
+            Comment.anonymous,
+            Comment.target_type,
+            Comment.target_id,
+            Comment.depth,
+            Comment.created_at,
+        ).where(condition, Comment.is_deleted.isnot(True)).order_by(Comment.path, Comment.id)
+
+        # Path order lists parents before replies and siblings oldest first, so
+        # one pass attaches everything; replies under a deleted comment drop out
+        nodes: Dict[int, Dict[str, Any]] = {}
+        for row in self.db.execute(query).all():
+            is_reply = row.target_type == "comment" and row.id not in root_ids
+            if is_reply and row.target_id not in nodes:
+                continue
+            node = {
+                "id": row.id,
+                "body": row.content,
+                "user_id": row.user_id,
+                "is_anonymous": bool(row.anonymous) or row.user_id is None,
+                "created_at": row.created_at,
+                "comments": [],
+                "_row": row,
+            }
+            nodes[row.id] = node
+            if is_reply:
+                nodes[row.target_id]["comments"].append(node)
+
+        ids = list(nodes)
+        if self.with_reactions:
+            reactions = reaction_counts(self.db, "comment", ids)
+            for cid, node in nodes.items():
+                node.update(reactions[cid])
+        if self.with_engagement:
+            from app.services.events.event_aggregator import EventAggregator
+
+            metrics = EventAggregator(self.db).get_batch_metrics("comment", ids)
+            for cid, node in nodes.items():
+                node["engagement_metrics"] = {k: v for k, v in metrics[cid].items() if k != "weighted_score"}
+
+        return nodes
+
+    # ----------------------------
+    # Assembly helpers
+    # ----------------------------
+    @classmethod
+    def _strip(cls, node: Dict[str, Any]) -> Dict[str, Any]:
+        node.pop("_row", None)
+        for child in node["comments"]:
+            cls._strip(child)
+        return node
+
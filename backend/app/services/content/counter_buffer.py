@@ -0,0 +1,272 @@
+# app/services/content/counter_buffer.py
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import bindparam, case, func
+
+from app.core.config import settings
+
+LOG = logging.getLogger("counter_buffer")
+
+# Denormalized counters that may be written behind, per target type
+COUNTER_COLUMNS = {
+    "question": ("likes_count", "dislikes_count", "answers_count", "comments_count", "share_count"),
+    "answer": ("likes_count", "dislikes_count", "comments_count", "share_count"),
+    "comment": ("likes_count", "dislikes_count", "replies_count"),
+}
+
+
+def _model_for(target_type: str):
+    from app.models.question import Question
+    from app.models.answer import Answer
+    from app.models.comment import Comment
+    return {"question": Question, "answer": Answer, "comment": Comment}[target_type]
+
+
+class CounterBuffer:
+    """
+    Write-behind buffer for the denormalized counters on questions, answers
+    and comments.
+    Instead of every like/answer/comment running its own UPDATE against the
+    same hot row, requests add deltas to an in-process map and a background
+    thread folds them into one UPDATE per touched row every flush interval.
+    Deltas are additive, so each worker process can flush independently.
+    Deltas not yet flushed are lost if the process dies; the counter
+    reconciliation command repairs that drift.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable] = None,
+        flush_interval: float = settings.COUNTER_FLUSH_INTERVAL_SECONDS,
+    ):
+        self._session_factory = session_factory
+        self.flush_interval = flush_interval
+
+        # (target_type, target_id) -> {column: delta}
+        self._pending: Dict[Tuple[str, int], Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        # Deltas taken by the flusher but not committed yet; still visible to reads
+        self._inflight: Dict[Tuple[str, int], Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+        self._thread: Optional[threading.Thread] = None
+        self._wakeup = threading.Event()
+        self._running = False
+
+        self._counters = {
+            "added": 0,
+            "flushes": 0,
+            "rows_flushed": 0,
+            "failed_flushes": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+        }
+
+    # ----------------------------
+    # Lifecycle
+    # ----------------------------
+    def start(self) -> None:
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            self._wakeup.clear()
+            self._thread = threading.Thread(target=self._run, name="counter-flusher", daemon=True)
+            self._thread.start()
+        LOG.info("counter buffer started (interval=%ss)", self.flush_interval)
+
+    def stop(self, timeout: float = settings.EVENT_SHUTDOWN_TIMEOUT_SECONDS) -> None:
+        """
+        Stop the flusher and write out everything still pending.
+        """
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+            thread = self._thread
+            self._thread = None
+
+        self._wakeup.set()
+        thread.join(timeout)
+        self.flush()
+        LOG.info("counter buffer stopped")
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    # ----------------------------
+    # Producer side
+    # ----------------------------
+    def add(self, target_type: str, target_id: int, **deltas: int) -> None:
+        """
+        Records counter deltas, e.g. add("answer", 7, likes_count=1).
+        Call after the write that justifies them has committed.
+        """
+        allowed = COUNTER_COLUMNS[target_type]
+        with self._lock:
+            slot = self._pending[(target_type, target_id)]
+            for column, delta in deltas.items():
+                if column not in allowed:
+                    raise ValueError(f"{column} is not a buffered counter on {target_type}")
+                if delta:
+                    slot[column] += delta
+            self._counters["added"] += 1
+
+    # ----------------------------
+    # Read side
+    # ----------------------------
+    def pending(self, target_type: str, target_id: int) -> Dict[str, int]:
+        """
+        Unflushed deltas for one target (including a flush in progress).
+        """
+        key = (target_type, target_id)
+        merged: Dict[str, int] = defaultdict(int)
+        with self._lock:
+            for source in (self._inflight.get(key), self._pending.get(key)):
+                for column, delta in (source or {}).items():
+                    merged[column] += delta
+        return dict(merged)
+
+    def merge(self, target_type: str, target_id: int, counts: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Returns `counts` (column -> stored value) with this worker's pending
+        deltas applied, for read-your-writes on freshly loaded rows.
+        """
+        merged = dict(counts)
+        for column, delta in self.pending(target_type, target_id).items():
+            if column in merged:
+                merged[column] = max((merged[column] or 0) + delta, 0)
+        return merged
+
+    # ----------------------------
+    # Flusher side
+    # ----------------------------
+    def _run(self) -> None:
+        while not self._wakeup.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Writes all pending deltas, one UPDATE per row, rows in id order per
+        table. On failure the deltas go back into the buffer for the next
+        attempt. Returns the number of rows updated.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch = {key: dict(cols) for key, cols in self._pending.items() if any(cols.values())}
+                self._pending.clear()
+                self._inflight = batch
+            if not batch:
+                return 0
+
+            started = time.perf_counter()
+            try:
+                self._write(batch)
+            except Exception:
+                LOG.exception("counter flush failed; keeping %s rows for retry", len(batch))
+                with self._lock:
+                    for key, cols in batch.items():
+                        for column, delta in cols.items():
+                            self._pending[key][column] += delta
+                    self._inflight = {}
+                    self._counters["failed_flushes"] += 1
+                return 0
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self._inflight = {}
+                self._counters["flushes"] += 1
+                self._counters["rows_flushed"] += len(batch)
+                self._counters["last_flush_ms"] = elapsed_ms
+                self._counters["max_flush_ms"] = max(self._counters["max_flush_ms"], elapsed_ms)
+            return len(batch)
+
+    def _write(self, batch: Dict[Tuple[str, int], Dict[str, int]]) -> None:
+        by_type: Dict[str, Dict[int, Dict[str, int]]] = defaultdict(dict)
+        for (target_type, target_id), cols in batch.items():
+            by_type[target_type][target_id] = cols
+
+        db = self._new_session()
+        try:
+            for target_type in sorted(by_type):
+                rows = by_type[target_type]
+                columns = sorted({c for cols in rows.values() for c in cols})
+                table = _model_for(target_type).__table__
+
+                def shifted(column):
+                    value = func.coalesce(table.c[column], 0) + bindparam(f"d_{column}")
+                    return case((value < 0, 0), else_=value)
+
+                # counters are not edits: updated_at keeps its value
+                stmt = table.update()\
+                    .where(table.c.id == bindparam("_id"))\
+                    .values({**{column: shifted(column) for column in columns}, "updated_at": table.c.updated_at})
+                params = [
+                    {"_id": target_id, **{f"d_{c}": rows[target_id].get(c, 0) for c in columns}}
+                    for target_id in sorted(rows)
+                ]
+                db.execute(stmt, params)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _new_session(self):
+        if self._session_factory is None:
+            from app.db.database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    # ----------------------------
+    # Metrics
+    # ----------------------------
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            c = dict(self._counters)
+            c["pending_rows"] = len(self._pending)
+        c["running"] = self._running
+        return c
+
+
+# Shared per-process buffer, started/stopped by app.main
+counter_buffer = CounterBuffer()
+
+
+def bump_counters(db, target_type: str, target_id: int, **deltas: int) -> None:
+    """
+    Applies counter deltas after a committed write: buffered when write-behind
+    is running, otherwise as an immediate UPDATE committed on `db`.
+    """
+    if counter_buffer.running:
+        counter_buffer.add(target_type, target_id, **deltas)
+        return
+
+    table = _model_for(target_type).__table__
+    values = {}
+    for column, delta in deltas.items():
+        if column not in COUNTER_COLUMNS[target_type]:
+            raise ValueError(f"{column} is not a buffered counter on {target_type}")
+        value = func.coalesce(table.c[column], 0) + delta
+        values[column] = case((value < 0, 0), else_=value)
+    if values:
+        values["updated_at"] = table.c.updated_at
+        db.execute(table.update().where(table.c.id == target_id).values(values))
+        db.commit()
+
+
+def bump_comment_count(db, target_type: str, target_id: int, delta: int) -> None:
+    """
+    Counts a comment created (+1) or deleted (-1) under its direct parent:
+    comments_count on a question or answer, replies_count on a comment.
+    """
+    if target_type not in COUNTER_COLUMNS:
+        return
+    column = "replies_count" if target_type == "comment" else "comments_count"
+    bump_counters(db, target_type, target_id, **{column: delta})
@@ -0,0 +1,247 @@
+# app/services/content/counter_reconciler.py
+import logging
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, func, select
+
+from app.core.config import settings
+
+LOG = logging.getLogger("counter_reconciler")
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def _sources() -> Dict[str, List[Tuple[str, Any, Any, Any]]]:
+    """
+    target_type -> [(counter column, source table, FK column, extra filter)].
+    Each counter is the number of matching source rows per target.
+    """
+    from app.models.answer import Answer
+    from app.models.comment import Comment
+    from app.models.reaction import Reaction
+
+    answers, comments, reactions = Answer.__table__, Comment.__table__, Reaction.__table__
+    live_answer = answers.c.is_deleted.isnot(True)
+    live_comment = comments.c.is_deleted.isnot(True)
+
+    def reacted(target_type, kind):
+        return reactions, reactions.c.target_id, and_(reactions.c.target_type == target_type, reactions.c.kind == kind)
+
+    def commented(target_type):
+        return comments, comments.c.target_id, and_(comments.c.target_type == target_type, live_comment)
+
+    return {
+        "question": [
+            ("likes_count", *reacted("question", "like")),
+            ("dislikes_count", *reacted("question", "dislike")),
+            ("share_count", *reacted("question", "share")),
+            ("answers_count", answers, answers.c.question_id, live_answer),
+            ("comments_count", *commented("question")),
+        ],
+        "answer": [
+            ("likes_count", *reacted("answer", "like")),
+            ("dislikes_count", *reacted("answer", "dislike")),
+            ("share_count", *reacted("answer", "share")),
+            ("comments_count", *commented("answer")),
+        ],
+        "comment": [
+            ("likes_count", *reacted("comment", "like")),
+            ("dislikes_count", *reacted("comment", "dislike")),
+            ("replies_count", *commented("comment")),
+        ],
+    }
+
+
+def _target_table(target_type: str):
+    from app.services.content.counter_buffer import _model_for
+    return _model_for(target_type).__table__
+
+
+# ----------------------------
+# Per-chunk work (runs in pool workers)
+# ----------------------------
+def _snapshot(db, target_type: str, lo: int, hi: int, ids: Optional[List[int]] = None) -> Dict[int, Tuple[tuple, tuple]]:
+    """
+    {id: (stored counters, recounted values)} for targets with lo <= id < hi
+    (optionally only `ids`). One range query per source table.
+    """
+    sources = _sources()[target_type]
+    target = _target_table(target_type)
+    columns = [column for column, *_ in sources]
+
+    query = select(target.c.id, *[target.c[c] for c in columns]).where(target.c.id >= lo, target.c.id < hi)
+    if ids is not None:
+        query = query.where(target.c.id.in_(ids))
+    stored = {row[0]: tuple(v or 0 for v in row[1:]) for row in db.execute(query)}
+
+    recounted: Dict[int, List[int]] = {tid: [0] * len(columns) for tid in stored}
+    for i, (_, table, fk, extra) in enumerate(sources):
+        query = select(fk, func.count()).select_from(table).where(fk >= lo, fk < hi)
+        if extra is not None:
+            query = query.where(extra)
+        if ids is not None:
+            query = query.where(fk.in_(ids))
+        for target_id, n in db.execute(query.group_by(fk)):
+            if target_id in recounted:
+                recounted[target_id][i] = int(n)
+
+    return {tid: (stored[tid], tuple(recounted[tid])) for tid in stored}
+
+
+def reconcile_chunk(target_type: str, lo: int, hi: int, settle_seconds: float, dry_run: bool) -> Dict[str, Any]:
+    """
+    Recounts one id range and repairs drifted rows.
+    Safe to run against live traffic: a row is only rewritten if both its
+    stored counters and its recount are unchanged across `settle_seconds`
+    (longer than the counter flush interval, so pending write-behind deltas
+    have landed), and the UPDATE is a compare-and-set on the stored values.
+    Rows that moved are reported as skipped and picked up by the next run.
+    """
+    from app.db.database import SessionLocal
+
+    columns = [column for column, *_ in _sources()[target_type]]
+    stats: Dict[str, Any] = {
+        "target_type": target_type,
+        "checked": 0,
+        "drifted": 0,
+        "fixed": 0,
+        "skipped_unstable": 0,
+        "skipped_concurrent": 0,
+        "columns": {c: {"drifted": 0, "abs_drift": 0, "max_abs_drift": 0} for c in columns},
+    }
+
+    db = SessionLocal()
+    try:
+        first = _snapshot(db, target_type, lo, hi)
+        db.rollback()
+        stats["checked"] = len(first)
+        drifted = [tid for tid, (stored, expected) in first.items() if stored != expected]
+        if not drifted:
+            return stats
+
+        if settle_seconds > 0:
+            time.sleep(settle_seconds)
+        second = _snapshot(db, target_type, lo, hi, ids=drifted)
+        db.rollback()
+
+        target = _target_table(target_type)
+        for tid in drifted:
+            stored, expected = first[tid]
+            stats["drifted"] += 1
+            for column, have, want in zip(columns, stored, expected):
+                if have != want:
+                    col = stats["columns"][column]
+                    col["drifted"] += 1
+                    col["abs_drift"] += abs(have - want)
+                    col["max_abs_drift"] = max(col["max_abs_drift"], abs(have - want))
+
+            if second.get(tid) != (stored, expected):
+                stats["skipped_unstable"] += 1
+                continue
+            if dry_run:
+                continue
+
+            result = db.execute(
+                target.update()
+                .where(target.c.id == tid, *[func.coalesce(target.c[c], 0) == v for c, v in zip(columns, stored)])
+                .values({**dict(zip(columns, expected)), "updated_at": target.c.updated_at})
+            )
+            if result.rowcount:
+                stats["fixed"] += 1
+            else:
+                stats["skipped_concurrent"] += 1
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    return stats
+
+
+def _init_worker() -> None:
+    # Connections inherited from the parent process must not be shared
+    from app.db.database import engine
+    engine.dispose(close=False)
+
+
+# ----------------------------
+# Orchestration
+# ----------------------------
+class CounterReconciler:
+    """
+    Recounts likes/dislikes/shares/answers/comments/replies counters on
+    questions, answers and comments from their source tables, in id-range
+    chunks spread over a process pool, and writes back only rows that differ.
+    """
+
+    def __init__(
+        self,
+        target_types: Optional[List[str]] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        workers: int = 4,
+        settle_seconds: float = 2 * settings.COUNTER_FLUSH_INTERVAL_SECONDS + 1,
+        dry_run: bool = False,
+    ):
+        self.target_types = target_types or ["question", "answer", "comment"]
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.settle_seconds = settle_seconds
+        self.dry_run = dry_run
+
+    def chunks(self, db) -> List[Tuple[str, int, int]]:
+        tasks = []
+        for target_type in self.target_types:
+            target = _target_table(target_type)
+            lo, hi = db.execute(select(func.min(target.c.id), func.max(target.c.id))).first()
+            if lo is None:
+                continue
+            for start in range(lo, hi + 1, self.chunk_size):
+                tasks.append((target_type, start, start + self.chunk_size))
+        return tasks
+
+    def run(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns drift statistics per target type.
+        """
+        from app.db.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            tasks = self.chunks(db)
+        finally:
+            db.close()
+
+        totals: Dict[str, Dict[str, Any]] = {}
+        args = [(t, lo, hi, self.settle_seconds, self.dry_run) for t, lo, hi in tasks]
+
+        if self.workers <= 1:
+            results = (reconcile_chunk(*a) for a in args)
+            for result in results:
+                self._merge(totals, result)
+            return totals
+
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker) as pool:
+            futures = [pool.submit(reconcile_chunk, *a) for a in args]
+            for done, future in enumerate(as_completed(futures), start=1):
+                self._merge(totals, future.result())
+                if done % 50 == 0:
+                    LOG.info("reconciled %s/%s chunks", done, len(futures))
+        return totals
+
+    @staticmethod
+    def _merge(totals: Dict[str, Dict[str, Any]], result: Dict[str, Any]) -> None:
+        total = totals.setdefault(result["target_type"], {
+            "checked": 0, "drifted": 0, "fixed": 0, "skipped_unstable": 0, "skipped_concurrent": 0,
+            "columns": defaultdict(lambda: {"drifted": 0, "abs_drift": 0, "max_abs_drift": 0}),
+        })
+        for key in ("checked", "drifted", "fixed", "skipped_unstable", "skipped_concurrent"):
+            total[key] += result[key]
+        for column, col in result["columns"].items():
+            agg = total["columns"][column]
+            agg["drifted"] += col["drifted"]
+            agg["abs_drift"] += col["abs_drift"]
+            agg["max_abs_drift"] = max(agg["max_abs_drift"], col["max_abs_drift"])
@@ -0,0 +1,101 @@
+# app/services/content/question_card_cache.py
+from collections import defaultdict
+from typing import Any, Dict, Hashable, Iterable, List, Set
+
+from sqlalchemy.orm import Session
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.models.answer import Answer
+from app.models.comment import Comment
+from app.models.question import Question
+from app.services.events.view_coalescer import COALESCED_EVENT_TYPES, is_view_sample
+
+question_card_cache = LRUCache(
+    max_entries=settings.QUESTION_CARD_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.QUESTION_CARD_CACHE_TTL_SECONDS,
+    name="question_card",
+)
+
+
+def card_cache_key(question: Question, **params: Any) -> Hashable:
+    """
+    Cache key for an assembled card: question id, its content version and the
+    request's pagination/render params. Bumping the version makes every
+    cached page of the question unreachable; old entries age out of the LRU.
+    """
+    return ("question_card", question.id, question.content_version or 0, tuple(sorted(params.items())))
+
+
+# ----------------------------
+# Invalidation
+# ----------------------------
+def questions_for_targets(db: Session, targets: Iterable[tuple]) -> Set[int]:
+    """
+    Maps (target_type, target_id) pairs to the questions whose card shows
+    them: answers via question_id, comments via their hierarchy root.
+    """
+    by_type: Dict[str, Set[int]] = defaultdict(set)
+    for target_type, target_id in targets:
+        by_type[target_type].add(target_id)
+
+    question_ids = set(by_type.get("question", ()))
+    answer_ids = set(by_type.get("answer", ()))
+
+    if by_type.get("comment"):
+        rows = db.query(Comment.root_type, Comment.root_id, Comment.target_type, Comment.target_id)\
+            .filter(Comment.id.in_(by_type["comment"])).all()
+        for root_type, root_id, target_type, target_id in rows:
+            # Comments not yet backfilled still know their direct parent
+            if root_type is None and target_type != "comment":
+                root_type, root_id = target_type, target_id
+            if root_type == "question":
+                question_ids.add(root_id)
+            elif root_type == "answer":
+                answer_ids.add(root_id)
+
+    if answer_ids:
+        rows = db.query(Answer.question_id).filter(Answer.id.in_(answer_ids)).all()
+        question_ids.update(qid for (qid,) in rows if qid is not None)
+    return question_ids
+
+
+def invalidate_cards(db: Session, targets: Iterable[tuple]) -> None:
+    """
+    Bumps the content version of the questions whose card shows any of
+    (target_type, target_id), in the caller's transaction, so the writer's
+    next read already misses the old card. Does not commit.
+    """
+    bump_content_versions(db, questions_for_targets(db, targets))
+
+
+def bump_content_versions(db: Session, question_ids: Iterable[int]) -> None:
+    """
+    Increments content_version for the given questions. Does not commit.
+    """
+    ids = sorted(set(question_ids))
+    if ids:
+        # a card refresh is not an edit of the question: keep updated_at
+        db.query(Question).filter(Question.id.in_(ids)).update(
+            {Question.content_version: Question.content_version + 1, Question.updated_at: Question.updated_at},
+            synchronize_session=False
+        )
+
+
+def apply_card_invalidation(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """
+    Event pipeline sink: bumps the content version of every question touched
+    by a write in the flushed batch, once the events have committed. A
+    backstop for writes that don't call invalidate_cards themselves.
+    """
+    targets = {
+        (row["target_type"], row["target_id"])
+        for row in rows
+        if row["target_type"] in ("question", "answer", "comment")
+        # views and impressions don't change what the card shows (beyond
+        # view counts, which the TTL bounds), coalesced or sampled
+        and row["event_type"] not in COALESCED_EVENT_TYPES
+        and not is_view_sample(row)
+    }
+    if targets:
+        bump_content_versions(db, questions_for_targets(db, targets))
@@ -1,10 +1,10 @@
 # app/services/content/question_service.py
 from typing import Optional, List, Dict
-from datetime import datetime
 from sqlalchemy.orm import Session
 from app.models.question import Question
 from app.services.events.event_aggregator import EventAggregator
 from app.events.event_types import EventTypes
+from app.services.content.question_card_cache import invalidate_cards
 
 class QuestionService:
     """
@@ -43,7 +43,6 @@ class QuestionService:
             is_anonymous=anonymous,
             metadata={"title": title}
         )
-        self.db.commit()
         return q
 
     def update_question(self, question: Question, title: Optional[str] = None, content: Optional[str] = None, anonymous: Optional[bool] = None) -> Question:
@@ -60,6 +59,8 @@ class QuestionService:
             question.user_id = None if anonymous else question.user_id
             changes["anonymous"] = {"old": old, "new": anonymous}
 
+        if changes:
+            invalidate_cards(self.db, [("question", question.id)])
         self.db.commit()
         self.db.refresh(question)
 
@@ -75,12 +76,11 @@ class QuestionService:
                 is_anonymous=question.user_id is None,
                 metadata=changes
             )
-            self.db.commit()
         return question
 
     def delete_question(self, question: Question) -> None:
         from app.services.events.event_logger import log_event
-        question.deleted_at = datetime.utcnow()
+        question.is_deleted = True
         self.db.commit()
 
         log_event(
@@ -94,7 +94,6 @@ class QuestionService:
             is_anonymous=question.user_id is None,
             metadata={"title": question.title}
         )
-        self.db.commit()
 
     # ----------------------------
     # Engagement & scoring
@@ -0,0 +1,118 @@
+# app/services/content/reaction_backfill.py
+import logging
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import Column, String, func, literal, select
+from sqlalchemy.orm import Session
+
+from app.core.upserts import dialect_insert
+from app.models.reaction import Reaction
+from app.services.content.reaction_service import LIKE, DISLIKE, REPORT, SHARE, REACTION_KEY
+
+LOG = logging.getLogger("reaction_backfill")
+
+TARGET_TYPES = ("question", "answer", "comment")
+
+
+def legacy_sources() -> List[Tuple[str, Any, Any, Any, Any]]:
+    """
+    Per-type reaction tables and how their rows map onto reactions:
+    (kind, table, target_type expression, target_id column, detail column).
+    """
+    from app.models.question_like import QuestionLike
+    from app.models.question_dislike import QuestionDislike
+    from app.models.question_report import QuestionReport
+    from app.models.question_share import QuestionShare
+    from app.models.answer_like import AnswerLike
+    from app.models.answer_dislike import AnswerDislike
+    from app.models.answer_report import AnswerReport
+    from app.models.answer_share import AnswerShare
+    from app.models.comment_like import CommentLike
+    from app.models.comment_dislike import CommentDislike
+    from app.models.comment_report import CommentReport
+    from app.models.comment_share import CommentShare
+    from app.models.report import Report
+
+    sources = []
+    for target_type, fk, models in (
+        ("question", "question_id", ((LIKE, QuestionLike), (DISLIKE, QuestionDislike),
+                                     (REPORT, QuestionReport), (SHARE, QuestionShare))),
+        ("answer", "answer_id", ((LIKE, AnswerLike), (DISLIKE, AnswerDislike),
+                                 (REPORT, AnswerReport), (SHARE, AnswerShare))),
+        ("comment", "comment_id", ((LIKE, CommentLike), (DISLIKE, CommentDislike),
+                                   (REPORT, CommentReport), (SHARE, CommentShare))),
+    ):
+        for kind, Model in models:
+            table = Model.__table__
+            detail = table.c.reason if kind == REPORT else (table.c.platform if kind == SHARE else None)
+            sources.append((kind, table, literal(target_type), table.c[fk], detail))
+
+    # Generic reports table (content_type/content_id)
+    reports = Report.__table__
+    sources.append((REPORT, reports, reports.c.content_type, reports.c.content_id, reports.c.reason))
+    return sources
+
+
+def backfill_reactions(db: Session, batch_size: int = 10000) -> Dict[str, Any]:
+    """
+    Copies rows from the per-type like/dislike/report/share tables into
+    reactions with INSERT ... SELECT over legacy id ranges, one commit per
+    batch. Duplicates collapse to one row per (target, kind, user) and
+    existing reactions are never overwritten, so it can be interrupted and
+    rerun. Rows without a user can't be keyed and are only counted.
+    """
+    reactions = Reaction.__table__
+    dialect = db.get_bind().dialect.name
+    columns = ["target_type", "target_id", "kind", "user_id", "detail", "created_at"]
+
+    stats: Dict[str, Any] = {"inserted": 0, "skipped_anonymous": 0, "tables": {}}
+    for kind, table, target_type, target_id, detail in legacy_sources():
+        lo, hi = db.execute(select(func.min(table.c.id), func.max(table.c.id))).first()
+        inserted = 0
+        if lo is not None:
+            for start in range(lo, hi + 1, batch_size):
+                exists = select(reactions.c.id).where(
+                    reactions.c.target_type == target_type,
+                    reactions.c.target_id == target_id,
+                    reactions.c.kind == kind,
+                    reactions.c.user_id == table.c.user_id,
+                ).exists()
+                rows = select(
+                    target_type,
+                    target_id,
+                    literal(kind),
+                    table.c.user_id,
+                    func.min(detail) if detail is not None else literal(None, String),
+                    func.min(table.c.created_at),
+                ).where(
+                    table.c.id >= start,
+                    table.c.id < start + batch_size,
+                    table.c.user_id.isnot(None),
+                    target_id.isnot(None),
+                    ~exists,
+                )
+                if isinstance(target_type, Column):
+                    rows = rows.where(target_type.in_(TARGET_TYPES)).group_by(target_type)
+                rows = rows.group_by(target_id, table.c.user_id)
+                inserted += db.execute(_insert_from_select(dialect, reactions, columns, rows)).rowcount or 0
+                db.commit()
+
+            stats["skipped_anonymous"] += db.execute(
+                select(func.count()).select_from(table).where(table.c.user_id.is_(None))
+            ).scalar() or 0
+
+        LOG.info("copied %s %s rows from %s", inserted, kind, table.name)
+        stats["tables"][table.name] = inserted
+        stats["inserted"] += inserted
+    return stats
+
+
+def _insert_from_select(dialect: str, table, names: List[str], rows):
+    """
+    INSERT ... SELECT that skips rows a live request inserted meanwhile (where
+    the dialect has ON CONFLICT); elsewhere the NOT EXISTS filter has to do.
+    """
+    insert = dialect_insert(dialect)
+    if insert is None:
+        return table.insert().from_select(names, rows)
+    return insert(table).from_select(names, rows).on_conflict_do_nothing(index_elements=REACTION_KEY)
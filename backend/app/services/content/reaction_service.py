@@ -0,0 +1,250 @@
+# app/services/content/reaction_service.py
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from app.core.upserts import insert_ignore
+from app.models.question import Question
+from app.models.answer import Answer
+from app.models.comment import Comment
+from app.models.reaction import Reaction
+from app.services.content.counter_buffer import COUNTER_COLUMNS, CounterBuffer, counter_buffer
+from app.services.content.question_card_cache import invalidate_cards
+
+LIKE = "like"
+DISLIKE = "dislike"
+REPORT = "report"
+SHARE = "share"
+
+# A user reacts at most once per kind and target
+REACTION_KEY = ["target_type", "target_id", "kind", "user_id"]
+
+# kind -> key used for its count in API payloads
+KIND_LABELS = {LIKE: "likes", DISLIKE: "dislikes", REPORT: "reports", SHARE: "shares"}
+
+# kind -> event suffix when a toggle adds / takes back the reaction
+ADDED_EVENTS = {LIKE: "liked", DISLIKE: "disliked"}
+REMOVED_EVENTS = {LIKE: "unliked", DISLIKE: "undisliked"}
+
+# target_type -> model carrying the denormalized counters
+REACTION_TARGETS = {
+    "question": Question,
+    "answer": Answer,
+    "comment": Comment,
+}
+
+COUNT_CHUNK_SIZE = 500
+
+
+def toggle_event_types(target_type: str, kind: str, result: Dict[str, Any]) -> List[str]:
+    """
+    Event types to log for a toggle result: the reaction added or taken
+    back, plus the opposite reaction it replaced. Removals are their own
+    event types, so scores and counts built from events subtract them.
+    """
+    opposite = DISLIKE if kind == LIKE else LIKE
+    suffix = ADDED_EVENTS[kind] if result["active"] else REMOVED_EVENTS[kind]
+    event_types = [f"{target_type}_{suffix}"]
+    if result["replaced"]:
+        event_types.append(f"{target_type}_{REMOVED_EVENTS[opposite]}")
+    return event_types
+
+
+def reaction_counts(db: Session, target_type: str, target_ids: Iterable[int]) -> Dict[int, Dict[str, int]]:
+    """
+    {target_id: {"likes", "dislikes", "reports", "shares"}} for many targets,
+    one grouped query per chunk of ids (served from the reactions unique index).
+    """
+    ids = list(dict.fromkeys(target_ids))
+    counts = {tid: {label: 0 for label in KIND_LABELS.values()} for tid in ids}
+    table = Reaction.__table__
+    for offset in range(0, len(ids), COUNT_CHUNK_SIZE):
+        chunk = ids[offset:offset + COUNT_CHUNK_SIZE]
+        rows = db.execute(
+            select(table.c.target_id, table.c.kind, func.count())
+            .where(table.c.target_type == target_type, table.c.target_id.in_(chunk))
+            .group_by(table.c.target_id, table.c.kind)
+        )
+        for target_id, kind, n in rows:
+            if kind in KIND_LABELS:
+                counts[target_id][KIND_LABELS[kind]] = int(n)
+    return counts
+
+
+class ReactionService:
+    """
+    Like/dislike toggles and reports/shares for questions, answers and comments,
+    all stored in the reactions table.
+    A toggle is one short transaction: drop the opposite reaction, insert
+    the reaction with ON CONFLICT DO NOTHING (a conflict means it existed,
+    so it is deleted instead), then adjust the denormalized counters with a
+    single UPDATE that returns the new counts. Uniqueness of
+    (target, kind, user) is enforced by the reactions unique constraint.
+    When the counter buffer is running, counters are written behind instead
+    and the returned counts merge in this worker's pending deltas.
+    """
+
+    def __init__(self, db: Session, counters: Optional[CounterBuffer] = None):
+        self.db = db
+        self.dialect = db.get_bind().dialect
+        self.counters = counters or counter_buffer
+
+    def toggle(self, target_type: str, target_id: int, user_id: int, kind: str = LIKE) -> Optional[Dict[str, Any]]:
+        """
+        Toggles `kind` ("like" | "dislike") for the user and commits.
+        Returns {"active", "replaced", "likes", "dislikes", "owner_id"}
+        ("replaced": the opposite reaction was removed) or None if the
+        target doesn't exist (nothing is written then).
+        """
+        if kind not in (LIKE, DISLIKE):
+            raise ValueError(f"unknown reaction kind: {kind}")
+        Model = REACTION_TARGETS[target_type]
+        opposite = DISLIKE if kind == LIKE else LIKE
+
+        try:
+            removed_opposite = self._delete(target_type, target_id, user_id, opposite)
+            added = self._insert(target_type, target_id, user_id, kind)
+            removed = False if added else self._delete(target_type, target_id, user_id, kind)
+
+            same_delta = 1 if added else (-1 if removed else 0)
+            opposite_delta = -1 if removed_opposite else 0
+            if kind == LIKE:
+                likes_delta, dislikes_delta = same_delta, opposite_delta
+            else:
+                likes_delta, dislikes_delta = opposite_delta, same_delta
+
+            buffered = self.counters.running
+            if buffered:
+                row = self._read_counts(Model, target_id)
+            else:
+                row = self._update_counts(Model, target_id, likes_delta, dislikes_delta)
+
+            if row is None:
+                self.db.rollback()
+                return None
+            if added or removed or removed_opposite:
+                invalidate_cards(self.db, [(target_type, target_id)])
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        self._forget_viewer_state(target_type, target_id, user_id)
+        likes, dislikes, owner_id = row
+        if buffered:
+            self.counters.add(target_type, target_id, likes_count=likes_delta, dislikes_count=dislikes_delta)
+            merged = self.counters.merge(target_type, target_id, {"likes_count": likes, "dislikes_count": dislikes})
+            likes, dislikes = merged["likes_count"], merged["dislikes_count"]
+        return {
+            "active": added, "replaced": removed_opposite,
+            "likes": likes, "dislikes": dislikes, "owner_id": owner_id
+        }
+
+    def record(self, target_type: str, target_id: int, user_id: int, kind: str, detail: Optional[str] = None) -> bool:
+        """
+        Records a report or share (at most one per user and target) and
+        commits. The caller checks the target exists. True if it was new.
+        """
+        if kind not in (REPORT, SHARE):
+            raise ValueError(f"unknown reaction kind: {kind}")
+        counted = kind == SHARE and "share_count" in COUNTER_COLUMNS[target_type]
+
+        try:
+            added = self._insert(target_type, target_id, user_id, kind, detail)
+            if added and counted and not self.counters.running:
+                table = REACTION_TARGETS[target_type].__table__
+                self.db.execute(
+                    table.update().where(table.c.id == target_id)
+                    .values(share_count=func.coalesce(table.c.share_count, 0) + 1, updated_at=table.c.updated_at)
+                )
+            if added:
+                invalidate_cards(self.db, [(target_type, target_id)])
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        if added and counted and self.counters.running:
+            self.counters.add(target_type, target_id, share_count=1)
+        if added:
+            self._forget_viewer_state(target_type, target_id, user_id)
+        return added
+
+    @staticmethod
+    def _forget_viewer_state(target_type: str, target_id: int, user_id: int) -> None:
+        from app.services.content.viewer_state import forget_viewer_state
+        forget_viewer_state(user_id, target_type, target_id)
+
+    # ----------------------------
+    # Statements
+    # ----------------------------
+    def _delete(self, target_type: str, target_id: int, user_id: int, kind: str) -> bool:
+        table = Reaction.__table__
+        result = self.db.execute(
+            table.delete().where(
+                table.c.target_type == target_type,
+                table.c.target_id == target_id,
+                table.c.kind == kind,
+                table.c.user_id == user_id,
+            )
+        )
+        return result.rowcount > 0
+
+    def _insert(self, target_type: str, target_id: int, user_id: int, kind: str, detail: Optional[str] = None) -> bool:
+        """
+        Inserts the reaction unless it exists; True if a row was inserted.
+        """
+        values = {"target_type": target_type, "target_id": target_id, "kind": kind, "user_id": user_id, "detail": detail}
+        return insert_ignore(self.db, Reaction.__table__, values, REACTION_KEY) > 0
+
+    def _update_counts(self, Model, target_id: int, likes_delta: int, dislikes_delta: int):
+        """
+        Applies the counter deltas (clamped at 0) to a live target and returns
+        (likes_count, dislikes_count, user_id), or None if it doesn't exist.
+        """
+        table = Model.__table__
+
+        def shifted(column, delta):
+            if delta == 0:
+                return column
+            value = func.coalesce(column, 0) + delta
+            return case((value < 0, 0), else_=value)
+
+        stmt = table.update()\
+            .where(table.c.id == target_id, table.c.is_deleted.isnot(True))\
+            .values(
+                likes_count=shifted(table.c.likes_count, likes_delta),
+                dislikes_count=shifted(table.c.dislikes_count, dislikes_delta),
+                # a reaction is not an edit of the target
+                updated_at=table.c.updated_at
+            )
+        columns = (table.c.likes_count, table.c.dislikes_count, table.c.user_id)
+
+        if self._update_returning():
+            row = self.db.execute(stmt.returning(*columns)).first()
+            return tuple(row) if row is not None else None
+
+        # No UPDATE ... RETURNING (e.g. SQLite on SQLAlchemy 1.4): read back
+        # inside the same transaction
+        if self.db.execute(stmt).rowcount == 0:
+            return None
+        return tuple(self.db.execute(select(*columns).where(table.c.id == target_id)).first())
+
+    def _read_counts(self, Model, target_id: int):
+        """
+        Stored (likes_count, dislikes_count, user_id) of a live target, or
+        None; a plain read, so it never waits on the hot row's lock.
+        """
+        table = Model.__table__
+        row = self.db.execute(
+            select(table.c.likes_count, table.c.dislikes_count, table.c.user_id)
+            .where(table.c.id == target_id, table.c.is_deleted.isnot(True))
+        ).first()
+        return tuple(row) if row is not None else None
+
+    def _update_returning(self) -> bool:
+        supported = getattr(self.dialect, "update_returning", None)
+        if supported is None:  # SQLAlchemy 1.4
+            supported = getattr(self.dialect, "full_returning", False)
+        return bool(supported)
@@ -0,0 +1,112 @@
+# app/services/content/viewer_state.py
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.models.reaction import Reaction
+from app.services.content.reaction_service import LIKE, DISLIKE, REPORT
+
+# kind -> flag returned to the viewer
+VIEWER_FLAGS = {LIKE: "liked", DISLIKE: "disliked", REPORT: "reported"}
+
+LOOKUP_CHUNK_SIZE = 500
+
+_MISSING = object()
+
+# (user_id, target_type, target_id) -> frozenset of the user's reaction kinds.
+# Empty sets are cached too: most items on a page carry no reaction.
+viewer_reactions_cache = LRUCache(
+    max_entries=settings.VIEWER_REACTIONS_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.VIEWER_REACTIONS_CACHE_TTL_SECONDS,
+    name="viewer_reactions",
+)
+
+
+def viewer_states(
+    db: Session, user_id: Optional[int], targets: Iterable[Tuple[str, int]]
+) -> Dict[Tuple[str, int], Dict[str, bool]]:
+    """
+    {(target_type, target_id): {"liked", "disliked", "reported"}} for the
+    viewer. Cached targets are answered from memory; the rest come from one
+    query on the reactions user index, whatever their types.
+    """
+    keys = list(dict.fromkeys(targets))
+    kinds: Dict[Tuple[str, int], frozenset] = {}
+
+    if user_id is not None:
+        missing: Dict[str, List[int]] = defaultdict(list)
+        for target_type, target_id in keys:
+            cached = viewer_reactions_cache.get((user_id, target_type, target_id), _MISSING)
+            if cached is _MISSING:
+                missing[target_type].append(target_id)
+            else:
+                kinds[(target_type, target_id)] = cached
+        if missing:
+            kinds.update(_load(db, user_id, missing))
+
+    empty = frozenset()
+    return {key: {flag: kind in kinds.get(key, empty) for kind, flag in VIEWER_FLAGS.items()} for key in keys}
+
+
+def _load(db: Session, user_id: int, missing: Dict[str, List[int]]) -> Dict[Tuple[str, int], frozenset]:
+    table = Reaction.__table__
+    conditions = [
+        and_(table.c.target_type == target_type, table.c.target_id.in_(ids[offset:offset + LOOKUP_CHUNK_SIZE]))
+        for target_type, ids in missing.items()
+        for offset in range(0, len(ids), LOOKUP_CHUNK_SIZE)
+    ]
+    found: Dict[Tuple[str, int], Set[str]] = defaultdict(set)
+    rows = db.execute(
+        select(table.c.target_type, table.c.target_id, table.c.kind)
+        .where(table.c.user_id == user_id, table.c.kind.in_(list(VIEWER_FLAGS)), or_(*conditions))
+    )
+    for target_type, target_id, kind in rows:
+        found[(target_type, target_id)].add(kind)
+
+    loaded = {}
+    for target_type, ids in missing.items():
+        for target_id in ids:
+            key = (target_type, target_id)
+            loaded[key] = frozenset(found.get(key, ()))
+            viewer_reactions_cache.set((user_id, target_type, target_id), loaded[key])
+    return loaded
+
+
+def forget_viewer_state(user_id: int, target_type: str, target_id: int) -> None:
+    """
+    Drops this process's cached flags after the user reacted to the target.
+    """
+    viewer_reactions_cache.delete((user_id, target_type, target_id))
+
+
+# ----------------------------
+# Payload helpers
+# ----------------------------
+def comment_ids(nodes: Iterable[Dict[str, Any]]) -> List[int]:
+    """
+    Ids of the comments in nested comment nodes, replies included.
+    """
+    ids, stack = [], list(nodes)
+    while stack:
+        node = stack.pop()
+        ids.append(node["id"])
+        stack.extend(node.get("comments", ()))
+    return ids
+
+
+def with_viewer(item: Dict[str, Any], state: Dict[str, bool]) -> Dict[str, Any]:
+    """
+    Copy of `item` with the viewer's flags; cached payloads are never mutated.
+    """
+    return {**item, "viewer": state}
+
+
+def comments_with_viewer(nodes: Iterable[Dict[str, Any]], states: Dict[Tuple[str, int], Dict[str, bool]]) -> List[Dict[str, Any]]:
+    return [
+        {**with_viewer(node, states[("comment", node["id"])]), "comments": comments_with_viewer(node["comments"], states)}
+        for node in nodes
+    ]
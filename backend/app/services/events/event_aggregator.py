@@ -2,9 +2,13 @@
 from typing import Optional, List, Dict, Union
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, case, and_, literal
 from app.models.event import Event
 from app.services.events.event_reader import EventReader
+from app.services.events.rollup_service import RollupService
+from app.services.feeds import hot_score
+from app.core.config import settings
+from app.core.sketches import HeavyHitters
 from app.events.event_types import EventTypes
 
 class EventAggregator:
@@ -17,6 +21,7 @@ class EventAggregator:
     def __init__(self, db: Session):
         self.db = db
         self.reader = EventReader(db)
+        self.rollups = RollupService(db)
 
     # ----------------------------
     # Basic engagement metrics for a single target
@@ -32,17 +37,30 @@ class EventAggregator:
         """
         Returns total counts of likes, dislikes, reports, shares, comments for a single target.
         Can filter by time and apply exponential decay weight for scoring.
+        Counting and decay are done in the database; no Event rows are loaded.
         """
-        events = self.reader.get_events(
-            target_type=target_type,
-            target_id=target_id,
-            start_date=start_date,
-            end_date=end_date,
-            limit=None
-        )
+        rows = self._grouped_metrics(target_type, [target_id], start_date, end_date, weight_decay)
+        return rows.get(target_id) or self._empty_metrics()
 
-        metrics = {
-            "total_events": len(events),
+    # ----------------------------
+    # SQL-side conditional aggregation
+    # ----------------------------
+    # Keeps IN (...) lists well under driver/bind parameter limits
+    BATCH_CHUNK_SIZE = 500
+
+    LIKE_TYPES = [EventTypes.QUESTION_LIKED, EventTypes.ANSWER_LIKED, EventTypes.COMMENT_LIKED]
+    DISLIKE_TYPES = [EventTypes.QUESTION_DISLIKED, EventTypes.ANSWER_DISLIKED, EventTypes.COMMENT_DISLIKED]
+    REPORT_TYPES = [EventTypes.QUESTION_REPORTED, EventTypes.ANSWER_REPORTED, EventTypes.COMMENT_REPORTED]
+    SHARE_TYPES = [EventTypes.QUESTION_SHARED, EventTypes.ANSWER_SHARED, EventTypes.COMMENT_SHARED]
+    # Removals cancel the like/dislike they take back, in every count
+    UNLIKE_TYPES = [EventTypes.QUESTION_UNLIKED, EventTypes.ANSWER_UNLIKED, EventTypes.COMMENT_UNLIKED]
+    UNDISLIKE_TYPES = [EventTypes.QUESTION_UNDISLIKED, EventTypes.ANSWER_UNDISLIKED, EventTypes.COMMENT_UNDISLIKED]
+    REMOVAL_TYPES = UNLIKE_TYPES + UNDISLIKE_TYPES
+
+    @staticmethod
+    def _empty_metrics() -> Dict[str, Union[int, float]]:
+        return {
+            "total_events": 0,
             "likes_events": 0,
             "dislikes_events": 0,
             "reports_events": 0,
@@ -51,28 +69,135 @@ class EventAggregator:
             "weighted_score": 0.0
         }
 
-        for e in events:
-            # Count event types
-            if e.event_type in [EventTypes.QUESTION_LIKED, EventTypes.ANSWER_LIKED, EventTypes.COMMENT_LIKED]:
-                metrics["likes_events"] += 1
-            elif e.event_type in [EventTypes.QUESTION_DISLIKED, EventTypes.ANSWER_DISLIKED, EventTypes.COMMENT_DISLIKED]:
-                metrics["dislikes_events"] += 1
-            elif e.event_type in [EventTypes.QUESTION_REPORTED, EventTypes.ANSWER_REPORTED, EventTypes.COMMENT_REPORTED]:
-                metrics["reports_events"] += 1
-            elif e.event_type in [EventTypes.QUESTION_SHARED, EventTypes.ANSWER_SHARED, EventTypes.COMMENT_SHARED]:
-                metrics["shares_events"] += 1
-            elif e.event_type.startswith("comment_"):
-                metrics["comments_events"] += 1
-
-            # Weighted score: e.g., decay recent events less
+    def _age_hours(self, now: datetime):
+        """
+        SQL expression for the age of an event in hours, relative to `now`.
+        """
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "sqlite":
+            return (func.julianday(now) - func.julianday(Event.created_at)) * 24.0
+        return (func.extract("epoch", literal(now)) - func.extract("epoch", Event.created_at)) / 3600.0
+
+    def _metric_columns(self, weight_decay: Optional[float], now: datetime):
+        # Counts sum sample_weight, so a sampled view row counts for the
+        # views it stands in for
+        def count_if(condition):
+            return func.coalesce(func.sum(case((condition, Event.sample_weight), else_=0)), 0)
+
+        categorized = self.LIKE_TYPES + self.DISLIKE_TYPES + self.REPORT_TYPES + self.SHARE_TYPES + self.REMOVAL_TYPES
+        signed = case((Event.event_type.in_(self.REMOVAL_TYPES), -Event.sample_weight), else_=Event.sample_weight)
+        is_comment = and_(
+            Event.event_type.startswith("comment_", autoescape=True),
+            Event.event_type.notin_(categorized)
+        )
+
+        if weight_decay is not None:
+            # 1 / (1 + decay) ** age  ==  (1 + decay) ** -age
+            decayed = func.power(1.0 + weight_decay, -self._age_hours(now)) * signed
+            weighted = func.coalesce(func.sum(decayed), 0.0)
+        else:
+            weighted = func.sum(signed)
+
+        return [
+            func.sum(signed).label("total_events"),
+            (count_if(Event.event_type.in_(self.LIKE_TYPES))
+             - count_if(Event.event_type.in_(self.UNLIKE_TYPES))).label("likes_events"),
+            (count_if(Event.event_type.in_(self.DISLIKE_TYPES))
+             - count_if(Event.event_type.in_(self.UNDISLIKE_TYPES))).label("dislikes_events"),
+            count_if(Event.event_type.in_(self.REPORT_TYPES)).label("reports_events"),
+            count_if(Event.event_type.in_(self.SHARE_TYPES)).label("shares_events"),
+            count_if(is_comment).label("comments_events"),
+            weighted.label("weighted_score"),
+        ]
+
+    def _grouped_metrics(
+        self,
+        target_type: str,
+        target_ids: List[int],
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+        weight_decay: Optional[float]
+    ) -> Dict[int, Dict[str, Union[int, float]]]:
+        """
+        Runs one GROUP BY target_id query and returns a metrics dict per target
+        that has at least one matching event. Served from the rollups when
+        they cover the window.
+        """
+        rolled = self._rollup_metrics(target_type, target_ids, start_date, end_date, weight_decay)
+        if rolled is not None:
+            return rolled
+
+        now = datetime.utcnow()
+        query = self.db.query(Event.target_id, *self._metric_columns(weight_decay, now)).filter(
+            Event.target_type == target_type,
+            Event.target_id.in_(target_ids)
+        )
+        if start_date:
+            query = query.filter(Event.created_at >= start_date)
+        if end_date:
+            query = query.filter(Event.created_at <= end_date)
+
+        results = {}
+        for row in query.group_by(Event.target_id).all():
+            results[row.target_id] = {
+                "total_events": int(row.total_events),
+                "likes_events": int(row.likes_events),
+                "dislikes_events": int(row.dislikes_events),
+                "reports_events": int(row.reports_events),
+                "shares_events": int(row.shares_events),
+                "comments_events": int(row.comments_events),
+                "weighted_score": float(row.weighted_score or 0.0)
+            }
+        return results
+
+    def _category(self, event_type: str) -> Optional[str]:
+        if event_type in self.LIKE_TYPES or event_type in self.UNLIKE_TYPES:
+            return "likes_events"
+        if event_type in self.DISLIKE_TYPES or event_type in self.UNDISLIKE_TYPES:
+            return "dislikes_events"
+        if event_type in self.REPORT_TYPES:
+            return "reports_events"
+        if event_type in self.SHARE_TYPES:
+            return "shares_events"
+        if event_type.startswith("comment_"):
+            return "comments_events"
+        return None
+
+    def _rollup_metrics(
+        self,
+        target_type: str,
+        target_ids: List[int],
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+        weight_decay: Optional[float]
+    ) -> Optional[Dict[int, Dict[str, Union[int, float]]]]:
+        """
+        Same output as the raw GROUP BY, built from rollup counts. Decay uses
+        hourly bucket midpoints, so weighted_score is approximate to within
+        half an hour of event age. Returns None if rollups don't cover the window.
+        """
+        rows = self.rollups.fetch_counts(
+            target_type, target_ids, start_date, end_date, by_time=weight_decay is not None
+        )
+        if rows is None:
+            return None
+
+        now = datetime.utcnow()
+        results: Dict[int, Dict[str, Union[int, float]]] = {}
+        for target_id, event_type, ts, count in rows:
+            metrics = results.setdefault(target_id, self._empty_metrics())
+            if event_type in self.REMOVAL_TYPES:
+                count = -count
+            metrics["total_events"] += count
+            category = self._category(event_type)
+            if category:
+                metrics[category] += count
             if weight_decay is not None:
-                age_hours = (datetime.utcnow() - e.created_at).total_seconds() / 3600
-                decay_score = 1.0 / ((1.0 + weight_decay) ** age_hours)
-                metrics["weighted_score"] += decay_score
+                age_hours = (now - ts.replace(tzinfo=None)).total_seconds() / 3600
+                metrics["weighted_score"] += count / ((1.0 + weight_decay) ** age_hours)
             else:
-                metrics["weighted_score"] += 1.0
-
-        return metrics
+                metrics["weighted_score"] += float(count)
+        return results
 
     # ----------------------------
     # Batch metrics for multiple targets
@@ -87,11 +212,16 @@ class EventAggregator:
     ) -> Dict[int, Dict[str, Union[int, float]]]:
         """
         Returns engagement metrics for multiple targets at once.
+        Runs one grouped query per chunk of BATCH_CHUNK_SIZE ids, so the cost
+        doesn't grow with the number of targets on a page.
         """
-        metrics_dict = {}
-        for tid in target_ids:
-            metrics_dict[tid] = self.get_engagement_metrics(target_type, tid, start_date, end_date, weight_decay)
-        return metrics_dict
+        unique_ids = list(dict.fromkeys(target_ids))
+        found: Dict[int, Dict[str, Union[int, float]]] = {}
+        for offset in range(0, len(unique_ids), self.BATCH_CHUNK_SIZE):
+            chunk = unique_ids[offset:offset + self.BATCH_CHUNK_SIZE]
+            found.update(self._grouped_metrics(target_type, chunk, start_date, end_date, weight_decay))
+
+        return {tid: found.get(tid) or self._empty_metrics() for tid in target_ids}
 
     # ----------------------------
     # Aggregation by event type or grouping
@@ -140,16 +270,22 @@ class EventAggregator:
     DEFAULT_WEIGHTS = {
         "question_liked": 1.0,
         "question_disliked": -1.0,
+        "question_unliked": -1.0,
+        "question_undisliked": 1.0,
         "question_reported": -2.0,
         "question_shared": 2.0,
         "answer_created": 2.0,
         "answer_liked": 1.0,
         "answer_disliked": -1.0,
+        "answer_unliked": -1.0,
+        "answer_undisliked": 1.0,
         "answer_reported": -2.0,
         "answer_shared": 2.0,
         "comment_created": 1.0,
         "comment_liked": 1.0,
         "comment_disliked": -1.0,
+        "comment_unliked": -1.0,
+        "comment_undisliked": 1.0,
         "comment_reported": -2.0,
         "comment_shared": 2.0
     }
@@ -184,32 +320,68 @@ class EventAggregator:
     ) -> Dict[int, float]:
         """
         Returns weighted, time-decayed scores per target_id.
+        Unfiltered requests at the configured half-life read the persisted
+        hot score instead of decaying individual events.
         """
         weights = weights or self.DEFAULT_WEIGHTS
 
-        # Fetch events from EventReader
-        events = self.reader.get_events(
+        if self._uses_hot_score(target_type, weights, decay_hours, user_id, feed_id, session_id, start_date, end_date):
+            return self._hot_scores(target_type, target_ids)
+
+        scores: Dict[int, float] = {}
+        rows = self._counted_events(target_type, target_ids, user_id, feed_id, session_id, start_date, end_date)
+        for target_id, event_type, ts, count in rows:
+            w = weights.get(event_type, 0.0)
+            scores[target_id] = scores.get(target_id, 0.0) + self.decay_score(w * count, ts, decay_hours)
+        return scores
+
+    def _counted_events(self, target_type, target_ids, user_id, feed_id, session_id, start_date, end_date):
+        """
+        (target_id, event_type, time, count) tuples for the window: from the
+        hourly rollups when they cover it, otherwise streamed from raw events
+        so memory stays bounded.
+        """
+        # Rollups carry no user/feed/session dimension
+        if user_id is None and feed_id is None and session_id is None:
+            rows = self.rollups.fetch_counts(target_type, target_ids or None, start_date, end_date, by_time=True)
+            if rows is not None:
+                return iter(rows)
+
+        events = self.reader.iter_events(
             target_type=target_type,
-            target_id=None,  # fetch all or filtered below
+            target_ids=target_ids,
             actor_id=user_id,
             feed_id=feed_id,
             session_id=session_id,
             start_date=start_date,
             end_date=end_date,
-            limit=None
+            columns=("target_id", "event_type", "created_at", "sample_weight")
         )
+        return iter(events)
 
-        if target_ids:
-            events = [e for e in events if e.target_id in target_ids]
+    def _uses_hot_score(self, target_type, weights, decay_hours, user_id, feed_id, session_id, start_date, end_date) -> bool:
+        return (
+            target_type in hot_score.HOT_TARGET_TYPES
+            and weights == self.DEFAULT_WEIGHTS
+            and decay_hours == settings.HOT_SCORE_HALF_LIFE_HOURS
+            and user_id is None and feed_id is None and session_id is None
+            and start_date is None and end_date is None
+        )
 
-        scores: Dict[int, float] = {}
+    def _hot_scores(self, target_type: str, target_ids: Optional[List[int]]) -> Dict[int, float]:
+        Model = hot_score.model_for(target_type)
+        query = self.db.query(Model.id, Model.hot_pos_log, Model.hot_neg_log).filter(Model.hot_score.isnot(None))
 
-        for e in events:
-            w = weights.get(e.event_type, 0.0)
-            decayed_score = self.decay_score(w, e.created_at, decay_hours)
-            scores[e.target_id] = scores.get(e.target_id, 0.0) + decayed_score
+        if not target_ids:
+            rows = query.all()
+        else:
+            rows = []
+            for offset in range(0, len(target_ids), self.BATCH_CHUNK_SIZE):
+                chunk = target_ids[offset:offset + self.BATCH_CHUNK_SIZE]
+                rows.extend(query.filter(Model.id.in_(chunk)).all())
 
-        return scores
+        now = datetime.utcnow()
+        return {tid: hot_score.current_score(pos, neg, now) for tid, pos, neg in rows}
 
     # ----------------------------
     # Top N scoring targets
@@ -218,11 +390,61 @@ class EventAggregator:
         self,
         target_type: str,
         n: int = 10,
+        approximate: Optional[bool] = None,
         **kwargs
     ) -> List[Dict[str, float]]:
         """
         Returns top N targets by aggregated score.
+        With `approximate` (default: TRENDING_BACKEND == "sketch") targets are
+        ranked through a Count-Min/Space-Saving sketch instead of a score for
+        every target, so memory doesn't grow with the number of targets.
         """
+        if not kwargs.get("target_ids") and self._uses_hot_score(
+            target_type,
+            kwargs.get("weights") or self.DEFAULT_WEIGHTS,
+            kwargs.get("decay_hours", 72),
+            kwargs.get("user_id"),
+            kwargs.get("feed_id"),
+            kwargs.get("session_id"),
+            kwargs.get("start_date"),
+            kwargs.get("end_date")
+        ):
+            Model = hot_score.model_for(target_type)
+            query = self.db.query(Model.id, Model.hot_pos_log, Model.hot_neg_log).filter(Model.hot_score.isnot(None))
+            rows = hot_score.order_by_hot(query, Model).limit(n).all()
+            return [{"target_id": tid, "score": hot_score.current_score(pos, neg)} for tid, pos, neg in rows]
+
+        if approximate is None:
+            approximate = settings.TRENDING_BACKEND == "sketch"
+        if approximate:
+            return self._approximate_top_n(target_type, n, **kwargs)
+
         scores = self.aggregate_scores(target_type, **kwargs)
         top_items = sorted(scores.items(), key=lambda x: x[1], reverse=True)[:n]
         return [{"target_id": tid, "score": score} for tid, score in top_items]
+
+    def _approximate_top_n(
+        self,
+        target_type: str,
+        n: int,
+        target_ids: Optional[List[int]] = None,
+        user_id: Optional[int] = None,
+        feed_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        weights: Optional[Dict[str, float]] = None,
+        decay_hours: int = 72
+    ) -> List[Dict[str, float]]:
+        weights = weights or self.DEFAULT_WEIGHTS
+        sketch = HeavyHitters(
+            max(n, settings.TRENDING_SKETCH_CAPACITY),
+            settings.TRENDING_SKETCH_EPSILON,
+            settings.TRENDING_SKETCH_DELTA
+        )
+        rows = self._counted_events(target_type, target_ids, user_id, feed_id, session_id, start_date, end_date)
+        for target_id, event_type, ts, count in rows:
+            w = weights.get(event_type, 0.0)
+            if w:
+                sketch.add(target_id, self.decay_score(w * count, ts, decay_hours))
+        return [{"target_id": tid, "score": score} for tid, score in sketch.top(n)]
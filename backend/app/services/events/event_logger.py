@@ -2,6 +2,67 @@
 from typing import Optional
 from sqlalchemy.orm import Session
 from app.models.event import Event
+from app.services.events.event_pipeline import event_pipeline, build_event_row
+from app.services.events.view_coalescer import view_coalescer
+
+
+def log_event(
+    db: Optional[Session],
+    actor_id: Optional[int],
+    actor_role: Optional[str],
+    event_type: str,
+    target_type: str,
+    target_id: int,
+    owner_id: Optional[int] = None,
+    owner_type: str = "user",
+    is_anonymous: bool = False,
+    metadata: Optional[dict] = None,
+    session_id: Optional[str] = None,
+    request_id: Optional[str] = None,
+    feed_id: Optional[str] = None,
+    position: Optional[int] = None,
+    source: Optional[str] = None,
+    referrer: Optional[str] = None,
+    app_version: Optional[str] = None,
+    ip_address: Optional[str] = None,
+    user_agent: Optional[str] = None,
+    user_geo: Optional[str] = None,
+    latency_ms: Optional[float] = None,
+) -> None:
+    """
+    Queue an event on the shared ingestion pipeline.
+    The event is written by the background flusher, outside the caller's
+    transaction, so callers must not commit on its behalf. `db` is accepted
+    for call-site compatibility only. View and impression events go to the
+    view coalescer instead, which writes them as per-window counts.
+    """
+    row = build_event_row(
+        actor_id=actor_id,
+        actor_role=actor_role,
+        event_type=event_type,
+        target_type=target_type,
+        target_id=target_id,
+        owner_id=owner_id,
+        owner_type=owner_type,
+        is_anonymous=is_anonymous,
+        metadata=metadata,
+        session_id=session_id,
+        request_id=request_id,
+        feed_id=feed_id,
+        position=position,
+        source=source,
+        referrer=referrer,
+        app_version=app_version,
+        ip_address=ip_address,
+        user_agent=user_agent,
+        user_geo=user_geo,
+        latency_ms=latency_ms
+    )
+    if view_coalescer.accepts(row):
+        view_coalescer.record(row)
+        return
+    event_pipeline.submit(row)
+
 
 class EventLogger:
     def __init__(self, db: Session):
@@ -31,7 +92,8 @@ class EventLogger:
         latency_ms: Optional[float] = None,
     ) -> Event:
         """
-        Create and persist an Event in the database.
+        Create and persist an Event in the database synchronously.
+        Prefer the module-level log_event for request paths.
         """
         evt = Event(
             actor_id=actor_id,
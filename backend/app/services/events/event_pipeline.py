@@ -0,0 +1,335 @@
+# app/services/events/event_pipeline.py
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.models.event import Event
+
+LOG = logging.getLogger("event_pipeline")
+
+_STOP = object()
+
+
+class EventPipeline:
+    """
+    Buffered, batched event ingestion.
+    Request handlers enqueue event rows into a bounded in-process queue and a
+    background flusher bulk-inserts them into the `events` table, either when
+    a batch fills up or when the flush interval elapses. Sinks run after the
+    batch has committed, each in its own transaction, so a failing sink never
+    costs the events or the other sinks' updates.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable] = None,
+        max_size: int = settings.EVENT_QUEUE_MAX_SIZE,
+        batch_size: int = settings.EVENT_BATCH_SIZE,
+        flush_interval: float = settings.EVENT_FLUSH_INTERVAL_SECONDS,
+        enqueue_timeout: float = settings.EVENT_ENQUEUE_TIMEOUT_SECONDS,
+    ):
+        self._session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+
+        self._sinks: List[Callable] = []
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._running = False
+
+        self._stats_lock = threading.Lock()
+        self._counters = {
+            "enqueued": 0,
+            "flushed": 0,
+            "batches": 0,
+            "inline_writes": 0,
+            "failed": 0,
+            "sink_failures": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "total_flush_ms": 0.0,
+        }
+
+    # ----------------------------
+    # Lifecycle
+    # ----------------------------
+    def start(self) -> None:
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="event-flusher", daemon=True)
+            self._thread.start()
+        LOG.info("event pipeline started (batch=%s, interval=%ss)", self.batch_size, self.flush_interval)
+
+    def stop(self, timeout: float = settings.EVENT_SHUTDOWN_TIMEOUT_SECONDS) -> None:
+        """
+        Stop accepting new events and drain everything already queued.
+        """
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+            thread = self._thread
+            self._thread = None
+
+        self._queue.put(_STOP)
+        thread.join(timeout)
+        if thread.is_alive():
+            LOG.warning("event flusher did not stop within %ss; %s events left", timeout, self._queue.qsize())
+            return
+
+        # Anything that raced in after the stop marker
+        leftover = self._drain_nowait()
+        if leftover:
+            self._flush(leftover)
+        LOG.info("event pipeline stopped")
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def add_sink(self, sink: Callable) -> None:
+        """
+        Register `sink(db, rows)` to run after every flushed batch has
+        committed (e.g. rollup maintenance). Each sink gets its own
+        transaction, committed after it returns; a failing sink is retried
+        once, then skips that batch.
+        """
+        if sink not in self._sinks:
+            self._sinks.append(sink)
+
+    # ----------------------------
+    # Producer side
+    # ----------------------------
+    def submit(self, row: Dict[str, Any]) -> None:
+        """
+        Queue a single event row. Blocks for at most `enqueue_timeout` when the
+        queue is full (backpressure); if it is still full the row is written
+        inline so events are never dropped.
+        """
+        if not self._running:
+            self._flush([row])
+            return
+
+        try:
+            self._queue.put(row, timeout=self.enqueue_timeout)
+        except queue.Full:
+            self._incr("inline_writes")
+            self._flush([row])
+            return
+        self._incr("enqueued")
+
+    # ----------------------------
+    # Flusher side
+    # ----------------------------
+    def _run(self) -> None:
+        while True:
+            batch, stopping = self._next_batch()
+            if batch:
+                self._flush(batch)
+            if stopping:
+                return
+
+    def _next_batch(self):
+        batch: List[Dict[str, Any]] = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                batch.extend(self._drain_nowait())
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _drain_nowait(self) -> List[Dict[str, Any]]:
+        rows = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return rows
+            if item is not _STOP:
+                rows.append(item)
+
+    def _flush(self, rows: List[Dict[str, Any]]) -> None:
+        for offset in range(0, len(rows), self.batch_size):
+            chunk = rows[offset:offset + self.batch_size]
+            started = time.perf_counter()
+            try:
+                self._insert(chunk)
+            except Exception:
+                LOG.exception("event insert failed, retrying once (%s events)", len(chunk))
+                try:
+                    self._insert(chunk)
+                except Exception:
+                    LOG.exception("event insert failed again, isolating the failing rows (%s events)", len(chunk))
+                    chunk = self._salvage(chunk)
+                    if not chunk:
+                        continue
+            self._run_sinks(chunk)
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with self._stats_lock:
+                self._counters["flushed"] += len(chunk)
+                self._counters["batches"] += 1
+                self._counters["last_flush_ms"] = elapsed_ms
+                self._counters["total_flush_ms"] += elapsed_ms
+                self._counters["max_flush_ms"] = max(self._counters["max_flush_ms"], elapsed_ms)
+
+    def _insert(self, rows: List[Dict[str, Any]]) -> None:
+        db = self._new_session()
+        try:
+            db.execute(Event.__table__.insert(), rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _salvage(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Inserts a chunk whose batch insert failed twice by halves, splitting
+        further only where an insert fails, so only the rows that can't be
+        written are dropped. Returns the rows written.
+        """
+        written: List[Dict[str, Any]] = []
+        mid = len(rows) // 2
+        for half in (rows[:mid], rows[mid:]):
+            if not half:
+                continue
+            try:
+                self._insert(half)
+                written += half
+            except Exception as exc:
+                if len(half) > 1:
+                    written += self._salvage(half)
+                    continue
+                row = half[0]
+                LOG.warning("dropping %s event on %s %s: %s",
+                            row.get("event_type"), row.get("target_type"), row.get("target_id"), exc)
+                self._incr("failed")
+        return written
+
+    def _run_sinks(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Runs each sink over a committed batch in its own transaction. A sink
+        that fails twice misses this batch; rollups and counters it feeds
+        are repaired by their rebuild/reconcile commands.
+        """
+        for sink in self._sinks:
+            for attempt in (1, 2):
+                db = self._new_session()
+                try:
+                    sink(db, rows)
+                    db.commit()
+                    break
+                except Exception:
+                    db.rollback()
+                    if attempt == 1:
+                        LOG.exception("event sink %s failed, retrying once", getattr(sink, "__name__", sink))
+                    else:
+                        LOG.exception("event sink %s skipped %s events after failed retry",
+                                      getattr(sink, "__name__", sink), len(rows))
+                        self._incr("sink_failures")
+                finally:
+                    db.close()
+
+    def _new_session(self):
+        if self._session_factory is None:
+            from app.db.database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    # ----------------------------
+    # Metrics
+    # ----------------------------
+    def _incr(self, key: str, n: int = 1) -> None:
+        with self._stats_lock:
+            self._counters[key] += n
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns queue depth and flush counters/latency for monitoring.
+        """
+        with self._stats_lock:
+            c = dict(self._counters)
+        batches = c["batches"]
+        c["queue_depth"] = self._queue.qsize()
+        c["queue_capacity"] = self._queue.maxsize
+        c["avg_flush_ms"] = c["total_flush_ms"] / batches if batches else 0.0
+        c["running"] = self._running
+        return c
+
+
+def build_event_row(
+    actor_id: Optional[int],
+    actor_role: Optional[str],
+    event_type: str,
+    target_type: str,
+    target_id: int,
+    owner_id: Optional[int] = None,
+    owner_type: str = "user",
+    is_anonymous: bool = False,
+    metadata: Optional[dict] = None,
+    session_id: Optional[str] = None,
+    request_id: Optional[str] = None,
+    feed_id: Optional[str] = None,
+    position: Optional[int] = None,
+    source: Optional[str] = None,
+    referrer: Optional[str] = None,
+    app_version: Optional[str] = None,
+    ip_address: Optional[str] = None,
+    user_agent: Optional[str] = None,
+    user_geo: Optional[str] = None,
+    latency_ms: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Build a column-keyed row for the `events` table.
+    created_at is stamped here so queueing delay doesn't shift event time.
+    """
+    return {
+        "actor_id": actor_id,
+        "actor_role": actor_role,
+        "event_type": event_type,
+        "target_type": target_type,
+        "target_id": target_id,
+        "owner_id": owner_id,
+        "owner_type": owner_type,
+        "is_anonymous": is_anonymous,
+        "metadata": metadata or {},
+        "session_id": session_id,
+        "request_id": request_id,
+        "feed_id": feed_id,
+        "position": position,
+        "source": source,
+        "referrer": referrer,
+        "app_version": app_version,
+        "ip_address": ip_address,
+        "user_agent": user_agent,
+        "user_geo": user_geo,
+        "latency_ms": latency_ms,
+        "weight": 0.0,
+        "score": 0.0,
+        "is_visible": True,
+        "sample_weight": 1,
+        "created_at": datetime.utcnow(),
+    }
+
+
+# Shared per-process pipeline, started/stopped by app.main
+event_pipeline = EventPipeline()
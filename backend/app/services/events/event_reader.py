@@ -1,10 +1,13 @@
 # app/services/events/event_reader.py
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator, Sequence
 from datetime import datetime
 from sqlalchemy.orm import Session
 from sqlalchemy import func
+from app.core.pagination import estimate_count, paginate
 from app.models.event import Event
 
+STREAM_CHUNK_SIZE = 5000
+
 class EventReader:
     """
     EventReader provides flexible, efficient access to Event data.
@@ -32,9 +35,90 @@ class EventReader:
     ) -> List[Event]:
         """
         Returns a list of Event objects filtered by various criteria.
+        Prefer get_events_page() for paging: deep offsets scan every
+        skipped row.
+        """
+        query = self._filtered(target_type, target_id, actor_id, session_id, feed_id, start_date, end_date)
+
+        if order_desc:
+            query = query.order_by(Event.created_at.desc())
+        else:
+            query = query.order_by(Event.created_at.asc())
+
+        if limit is not None:
+            query = query.offset(offset).limit(limit)
+
+        return query.all()
+
+    # ----------------------------
+    # Cursor-paged events
+    # ----------------------------
+    def get_events_page(
+        self,
+        target_type: Optional[str] = None,
+        target_id: Optional[int] = None,
+        actor_id: Optional[int] = None,
+        session_id: Optional[str] = None,
+        feed_id: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        order_desc: bool = True,
+        exact_total: bool = False
+    ) -> Dict[str, Any]:
+        """
+        One page of events ordered by (created_at, id), continuing after
+        `cursor` (from the previous page's "next_cursor"). "total" is a
+        planner estimate unless exact_total is set.
+        Raises InvalidCursor for a malformed cursor.
+        """
+        query = self._filtered(target_type, target_id, actor_id, session_id, feed_id, start_date, end_date)
+        events, next_cursor = paginate(query, Event.created_at, Event.id, limit, cursor=cursor, descending=order_desc)
+        total = query.count() if exact_total else estimate_count(self.db, query)
+        return {"events": events, "next_cursor": next_cursor, "total": total}
+
+    # ----------------------------
+    # Streaming scans
+    # ----------------------------
+    def iter_events(
+        self,
+        target_type: Optional[str] = None,
+        target_ids: Optional[List[int]] = None,
+        actor_id: Optional[int] = None,
+        session_id: Optional[str] = None,
+        feed_id: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        columns: Optional[Sequence[str]] = None,
+        chunk_size: int = STREAM_CHUNK_SIZE
+    ) -> Iterator[Any]:
         """
-        query = self.db.query(Event)
+        Streams matching events in chunks of `chunk_size` rows (a server-side
+        cursor where the driver has one), so memory stays flat however much
+        history matches. With `columns`, yields plain tuples of just those
+        Event columns instead of ORM objects. No ordering is applied.
+        """
+        if columns:
+            query = self.db.query(*[getattr(Event, c) for c in columns])
+        else:
+            query = self.db.query(Event)
+        query = self._apply_filters(query, target_type, None, actor_id, session_id, feed_id, start_date, end_date)
+        if target_ids:
+            query = query.filter(Event.target_id.in_(target_ids))
+
+        rows = query.execution_options(stream_results=True).yield_per(chunk_size)
+        if columns:
+            return (tuple(row) for row in rows)
+        return iter(rows)
 
+    def _filtered(self, target_type, target_id, actor_id, session_id, feed_id, start_date, end_date):
+        return self._apply_filters(
+            self.db.query(Event), target_type, target_id, actor_id, session_id, feed_id, start_date, end_date
+        )
+
+    @staticmethod
+    def _apply_filters(query, target_type, target_id, actor_id, session_id, feed_id, start_date, end_date):
         if target_type:
             query = query.filter(Event.target_type == target_type)
         if target_id:
@@ -49,16 +133,7 @@ class EventReader:
             query = query.filter(Event.created_at >= start_date)
         if end_date:
             query = query.filter(Event.created_at <= end_date)
-
-        if order_desc:
-            query = query.order_by(Event.created_at.desc())
-        else:
-            query = query.order_by(Event.created_at.asc())
-
-        if limit is not None:
-            query = query.offset(offset).limit(limit)
-
-        return query.all()
+        return query
 
     # ----------------------------
     # Aggregate events with group_by
@@ -73,7 +148,8 @@ class EventReader:
         Example:
         [{"event_type": "question_liked", "count": 10}, ...]
         """
-        query = self.db.query(getattr(Event, group_by), func.count().label("count"))
+        # sampled view rows count for the views they stand in for
+        query = self.db.query(getattr(Event, group_by), func.sum(Event.sample_weight).label("count"))
 
         if filters:
             for k, v in filters.items():
@@ -105,7 +181,7 @@ class EventReader:
         """
         Returns total number of events matching filters.
         """
-        query = self.db.query(func.count(Event.id))
+        query = self.db.query(func.sum(Event.sample_weight))
 
         if target_type:
             query = query.filter(Event.target_type == target_type)
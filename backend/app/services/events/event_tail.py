@@ -0,0 +1,88 @@
+# app/services/events/event_tail.py
+import time
+from typing import Dict, List, Sequence, Tuple
+
+from app.models.event import Event
+
+# Events read per query of the events table
+TAIL_BATCH_SIZE = 10000
+# Id gaps wider than this (sequence jumps) are not waited for
+MAX_TRACKED_GAP = 1000
+
+
+class EventTail:
+    """
+    Reads the events table forward by id, so a resident per-worker
+    structure sees every worker's events. Ids are handed out before their
+    transaction commits, so an id below the highest one read may still
+    show up; such gaps are re-checked on every read until they appear or
+    `gap_timeout` passes (rolled back inserts never do). Not thread-safe;
+    one reader thread per tail.
+    """
+
+    def __init__(self, columns: Sequence, gap_timeout: float, batch_size: int = TAIL_BATCH_SIZE):
+        self.columns = [Event.id, *columns]
+        self.gap_timeout = gap_timeout
+        self.batch_size = batch_size
+
+        # highest event id read, plus unseen ids below it that may still
+        # commit (id -> monotonic time first noticed)
+        self.high_water = 0
+        self._gaps: Dict[int, float] = {}
+
+        self.gaps_filled = 0
+        self.gaps_expired = 0
+
+    @property
+    def pending_gaps(self) -> int:
+        return len(self._gaps)
+
+    def reset(self, high_water: int) -> None:
+        """Restarts the tail after `high_water` (e.g. after a rebuild)."""
+        self.high_water = high_water
+        self._gaps.clear()
+
+    def read(self, db) -> List[Tuple]:
+        """
+        Rows (without the id) committed since the last read, including
+        earlier gaps that have committed since.
+        """
+        return self._read_gaps(db) + self._read_new(db)
+
+    def _read_new(self, db) -> List[Tuple]:
+        rows: List[Tuple] = []
+        while True:
+            batch = db.query(*self.columns)\
+                .filter(Event.id > self.high_water)\
+                .order_by(Event.id)\
+                .limit(self.batch_size)\
+                .all()
+            now = time.monotonic()
+            for row in batch:
+                # an id below one already seen may belong to an open transaction
+                if 1 < row.id - self.high_water <= MAX_TRACKED_GAP and self.high_water:
+                    for missing in range(self.high_water + 1, row.id):
+                        self._gaps[missing] = now
+                self.high_water = row.id
+                rows.append(tuple(row)[1:])
+            if len(batch) < self.batch_size:
+                return rows
+
+    def _read_gaps(self, db) -> List[Tuple]:
+        if not self._gaps:
+            return []
+        ids = list(self._gaps)
+        rows: List[Tuple] = []
+        for i in range(0, len(ids), 500):
+            for row in db.query(*self.columns).filter(Event.id.in_(ids[i:i + 500])).all():
+                self._gaps.pop(row.id, None)
+                self.gaps_filled += 1
+                rows.append(tuple(row)[1:])
+
+        # ids from rolled-back transactions never show up
+        cutoff = time.monotonic() - self.gap_timeout
+        expired = [event_id for event_id, seen in self._gaps.items() if seen < cutoff]
+        for event_id in expired:
+            del self._gaps[event_id]
+        self.gaps_expired += len(expired)
+        return rows
@@ -0,0 +1,336 @@
+# app/services/events/rollup_service.py
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.upserts import dialect_insert
+from app.models.engagement_rollup import EngagementRollup
+from app.models.engagement_rollup_state import EngagementRollupState
+from app.models.event import Event
+from app.services.events.view_coalescer import is_view_sample, sample_weight
+
+LOG = logging.getLogger("rollups")
+
+HOUR = "hour"
+DAY = "day"
+
+# Pseudo target_type used to roll events up per actor (UserActivityService)
+ACTOR_SCOPE = "actor"
+
+STATE_NAME = "events"
+EPOCH = datetime(1970, 1, 1)
+
+KEY_COLUMNS = ["granularity", "target_type", "target_id", "event_type", "bucket_start"]
+
+
+def floor_bucket(ts: datetime, granularity: str) -> datetime:
+    ts = ts.replace(tzinfo=None)
+    if granularity == DAY:
+        return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def ceil_bucket(ts: datetime, granularity: str) -> datetime:
+    floored = floor_bucket(ts, granularity)
+    if floored == ts.replace(tzinfo=None):
+        return floored
+    return floored + bucket_width(granularity)
+
+
+def bucket_width(granularity: str) -> timedelta:
+    return timedelta(days=1) if granularity == DAY else timedelta(hours=1)
+
+
+class RollupService:
+    """
+    Maintains and reads the hourly/daily engagement rollups.
+    Rollups are keyed by (target_type, target_id, event_type, bucket) and are
+    updated by the event pipeline as batches are ingested. Reads split a time
+    window into whole day/hour buckets served from rollups, plus the partial
+    edges served from the raw `events` table.
+    """
+
+    CHUNK_SIZE = 500
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ----------------------------
+    # Ingestion
+    # ----------------------------
+    @staticmethod
+    def count_rows(rows: Iterable[Dict[str, Any]]) -> Dict[Tuple, int]:
+        """
+        Folds raw event rows into rollup keys for both granularities, plus
+        per-actor keys under ACTOR_SCOPE. A row with a "count" (a coalesced
+        view window) counts that many times.
+        """
+        counts: Dict[Tuple, int] = defaultdict(int)
+        for row in rows:
+            created_at = row.get("created_at") or datetime.utcnow()
+            n = row.get("count", 1)
+            scopes = [(row["target_type"], row["target_id"])]
+            if row.get("actor_id") is not None:
+                scopes.append((ACTOR_SCOPE, row["actor_id"]))
+            for granularity in (HOUR, DAY):
+                bucket = floor_bucket(created_at, granularity)
+                for target_type, target_id in scopes:
+                    counts[(granularity, target_type, target_id, row["event_type"], bucket)] += n
+        return counts
+
+    def apply_rows(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Adds a batch of ingested event rows to the rollups. Runs inside the
+        caller's transaction; does not commit. Sampled view rows are skipped:
+        the view coalescer already added their windows' counts.
+        """
+        counts = self.count_rows(row for row in rows if not is_view_sample(row))
+        if counts:
+            self._upsert(counts)
+
+    def _upsert(self, counts: Dict[Tuple, int]) -> None:
+        table = EngagementRollup.__table__
+        values = [dict(zip(KEY_COLUMNS, key), count=n) for key, n in counts.items()]
+        insert = dialect_insert(self.db.get_bind().dialect.name)
+
+        if insert is not None:
+            stmt = insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=KEY_COLUMNS,
+                set_={"count": table.c.count + stmt.excluded["count"]}
+            )
+            self.db.execute(stmt, values)
+            return
+
+        # Generic fallback: update, then insert what didn't exist yet
+        for v in values:
+            updated = self.db.execute(
+                table.update()
+                .where(*[table.c[col] == v[col] for col in KEY_COLUMNS])
+                .values(count=table.c.count + v["count"])
+            )
+            if updated.rowcount == 0:
+                self.db.execute(table.insert(), [v])
+
+    # ----------------------------
+    # Coverage
+    # ----------------------------
+    def get_state(self) -> Optional[EngagementRollupState]:
+        return self.db.query(EngagementRollupState).filter_by(name=STATE_NAME).first()
+
+    def ensure_state(self) -> EngagementRollupState:
+        """
+        Records when incremental maintenance started. Without a rebuild,
+        rollups are only complete from the next whole hour onwards.
+        """
+        state = self.get_state()
+        if state is None:
+            state = EngagementRollupState(name=STATE_NAME, covered_since=ceil_bucket(datetime.utcnow(), HOUR))
+            self.db.add(state)
+            self.db.commit()
+        return state
+
+    def plan_window(
+        self,
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+        allow_days: bool = True
+    ) -> Optional[List[Tuple[str, datetime, datetime]]]:
+        """
+        Splits [start_date, end_date] into ("raw" | "hour" | "day", start, end)
+        segments. Returns None when the window reaches back before the rollups
+        are complete, in which case callers should read raw events.
+        """
+        state = self.get_state()
+        if state is None:
+            return None
+
+        start = (start_date or EPOCH).replace(tzinfo=None)
+        end = (end_date or datetime.utcnow()).replace(tzinfo=None)
+
+        h0, h1 = ceil_bucket(start, HOUR), floor_bucket(end, HOUR)
+        if h0 >= h1:
+            return [("raw", start, end)]
+        if h0 < state.covered_since:
+            return None
+
+        segments = []
+        if start < h0:
+            segments.append(("raw", start, h0))
+
+        d0, d1 = ceil_bucket(h0, DAY), floor_bucket(h1, DAY)
+        if allow_days and d0 < d1:
+            if h0 < d0:
+                segments.append((HOUR, h0, d0))
+            segments.append((DAY, d0, d1))
+            if d1 < h1:
+                segments.append((HOUR, d1, h1))
+        else:
+            segments.append((HOUR, h0, h1))
+
+        segments.append(("raw", h1, end))
+        return segments
+
+    # ----------------------------
+    # Reads
+    # ----------------------------
+    def fetch_counts(
+        self,
+        target_type: str,
+        target_ids: Optional[List[int]],
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        by_time: bool = False
+    ) -> Optional[List[Tuple[int, str, Optional[datetime], int]]]:
+        """
+        Returns (target_id, event_type, time, count) tuples for the window, or
+        None if the rollups don't cover it. With by_time, only hourly buckets
+        are used and `time` is the bucket midpoint (raw edges report the exact
+        event time); otherwise `time` is None and counts are summed.
+        """
+        segments = self.plan_window(start_date, end_date, allow_days=not by_time)
+        if segments is None:
+            return None
+
+        if target_ids is None:
+            id_chunks = [None]
+        else:
+            id_chunks = [target_ids[i:i + self.CHUNK_SIZE] for i in range(0, len(target_ids), self.CHUNK_SIZE)]
+
+        results: List[Tuple[int, str, Optional[datetime], int]] = []
+        last = len(segments) - 1
+        for ids in id_chunks:
+            for i, (source, seg_start, seg_end) in enumerate(segments):
+                if source == "raw":
+                    results.extend(self._raw_counts(target_type, ids, seg_start, seg_end, i == last, by_time))
+                else:
+                    results.extend(self._bucket_counts(source, target_type, ids, seg_start, seg_end, by_time))
+        return results
+
+    def _bucket_counts(self, granularity, target_type, target_ids, seg_start, seg_end, by_time):
+        R = EngagementRollup
+        cols = [R.target_id, R.event_type]
+        if by_time:
+            cols.append(R.bucket_start)
+        query = self.db.query(*cols, func.sum(R.count)).filter(
+            R.granularity == granularity,
+            R.target_type == target_type,
+            R.bucket_start >= seg_start,
+            R.bucket_start < seg_end
+        )
+        if target_ids is not None:
+            query = query.filter(R.target_id.in_(target_ids))
+
+        half = bucket_width(granularity) / 2
+        for row in query.group_by(*cols).all():
+            if by_time:
+                yield row[0], row[1], row[2] + half, int(row[3])
+            else:
+                yield row[0], row[1], None, int(row[2])
+
+    def _raw_counts(self, target_type, target_ids, seg_start, seg_end, inclusive_end, by_time):
+        target_col = Event.actor_id if target_type == ACTOR_SCOPE else Event.target_id
+        cols = [target_col, Event.event_type]
+        if by_time:
+            cols.append(Event.created_at)
+        # sampled view rows count for the views they stand in for
+        query = self.db.query(*cols, func.sum(Event.sample_weight)).filter(Event.created_at >= seg_start)
+        query = query.filter(Event.created_at <= seg_end if inclusive_end else Event.created_at < seg_end)
+        if target_type != ACTOR_SCOPE:
+            query = query.filter(Event.target_type == target_type)
+        if target_ids is not None:
+            query = query.filter(target_col.in_(target_ids))
+
+        for row in query.group_by(*cols).all():
+            if by_time:
+                yield row[0], row[1], row[2], int(row[3])
+            else:
+                yield row[0], row[1], None, int(row[2])
+
+    # ----------------------------
+    # Rebuild from raw events
+    # ----------------------------
+    def rebuild(self, since: Optional[datetime] = None, until: Optional[datetime] = None) -> int:
+        """
+        Regenerates rollups from raw events, one day per transaction.
+        Whole days are always rebuilt; `until` is rounded up to a day boundary
+        (capped at now). Returns the number of days rebuilt.
+        """
+        now = datetime.utcnow()
+        until = now if until is None else min(ceil_bucket(until, DAY), now)
+
+        first = since
+        if first is None:
+            first = self.db.query(func.min(Event.created_at)).scalar()
+        if first is None:
+            self._mark_covered(EPOCH)
+            return 0
+
+        day = floor_bucket(first, DAY)
+        days = 0
+        while day < until:
+            self._rebuild_range(day, min(day + timedelta(days=1), until))
+            LOG.info("rebuilt rollups for %s", day.date())
+            days += 1
+            day += timedelta(days=1)
+
+        # Coverage only extends backwards if the rebuilt range joins up with
+        # the part already maintained by ingestion.
+        state = self.get_state()
+        if (state is not None and until >= state.covered_since) or (state is None and until == now):
+            self._mark_covered(EPOCH if since is None else floor_bucket(since, DAY))
+        return days
+
+    def _rebuild_range(self, start: datetime, end: datetime) -> None:
+        R = EngagementRollup
+        try:
+            self.db.query(R).filter(
+                R.bucket_start >= start, R.bucket_start < end
+            ).delete(synchronize_session=False)
+
+            # Only a sample of coalesced view windows is stored raw; each
+            # counts for its window scaled by the inverse sampling rate
+            query = self.db.query(
+                Event.target_type, Event.target_id, Event.actor_id, Event.event_type, Event.created_at,
+                Event.__table__.c["metadata"]
+            ).filter(Event.created_at >= start, Event.created_at < end)
+
+            counts = self.count_rows(
+                {
+                    "target_type": target_type,
+                    "target_id": target_id,
+                    "actor_id": actor_id,
+                    "event_type": event_type,
+                    "created_at": created_at,
+                    "count": sample_weight(metadata),
+                }
+                for target_type, target_id, actor_id, event_type, created_at, metadata in query.yield_per(5000)
+            )
+
+            if counts:
+                self._upsert(counts)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def _mark_covered(self, since: datetime) -> None:
+        state = self.get_state()
+        if state is None:
+            state = EngagementRollupState(name=STATE_NAME, covered_since=since)
+            self.db.add(state)
+        else:
+            state.covered_since = min(state.covered_since, since)
+        state.rebuilt_at = datetime.utcnow()
+        self.db.commit()
+
+
+def apply_rollups(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """
+    Event pipeline sink: keeps rollups in step with each flushed batch.
+    """
+    RollupService(db).apply_rows(rows)
@@ -0,0 +1,224 @@
+# app/services/events/unique_counter.py
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import bindparam
+from sqlalchemy.orm import Session
+
+from app.core.sketch_rows import SketchRowStore
+from app.core.sketches import HyperLogLog
+from app.models.event import Event
+from app.models.question import Question
+from app.models.unique_sketch import UniqueSketch
+from app.services.events.rollup_service import DAY, floor_bucket
+
+VIEWERS = "viewers"
+ENGAGERS = "engagers"
+
+# bucket_start of the all-time sketch
+ALL_TIME = datetime(1970, 1, 1)
+
+UNIQUE_TARGET_TYPES = ("question", "answer")
+ENGAGEMENT_SUFFIXES = ("_liked", "_disliked", "_shared")
+
+HLL_PRECISION = 12
+
+KEY_COLUMNS = ["target_type", "target_id", "kind", "bucket_start"]
+
+
+def visitor_key(row: Dict[str, Any]) -> Optional[str]:
+    """Who a row counts as: the user when known, else the session."""
+    if row.get("actor_id") is not None:
+        return f"u:{row['actor_id']}"
+    if row.get("session_id"):
+        return f"s:{row['session_id']}"
+    return None
+
+
+def counted_targets(row: Dict[str, Any]) -> List[Tuple[str, str, int]]:
+    """
+    (kind, target_type, target_id) entries an event row counts toward.
+    Answering or commenting counts as engaging with the parent.
+    """
+    event_type = row["event_type"]
+    target = (row["target_type"], row["target_id"])
+    meta = row.get("metadata") or {}
+
+    if event_type.endswith("_viewed"):
+        return [(VIEWERS, *target)] if target[0] in UNIQUE_TARGET_TYPES else []
+
+    engaged = []
+    if event_type.endswith(ENGAGEMENT_SUFFIXES):
+        engaged.append(target)
+    elif event_type == "answer_created" and meta.get("question_id"):
+        engaged.append(("question", meta["question_id"]))
+    elif event_type == "comment_created":
+        if meta.get("answer_id"):
+            engaged.append(("answer", meta["answer_id"]))
+        elif meta.get("target_type") in UNIQUE_TARGET_TYPES and meta.get("target_id"):
+            engaged.append((meta["target_type"], meta["target_id"]))
+    return [(ENGAGERS, t, tid) for t, tid in engaged if t in UNIQUE_TARGET_TYPES]
+
+
+class UniqueCounterService:
+    """
+    Distinct viewers and engagers per question/answer, kept as HyperLogLog
+    sketches per UTC day plus one all-time sketch, so unique counts never
+    scan raw events. Writes add visitors to the stored sketch under a row
+    lock, so any number of workers can write; adding is idempotent, so
+    replaying events never double counts. Question.views mirrors the
+    all-time unique viewer estimate.
+    """
+
+    CHUNK_SIZE = 500
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ----------------------------
+    # Ingestion
+    # ----------------------------
+    @staticmethod
+    def fold_rows(rows: Iterable[Dict[str, Any]]) -> Dict[Tuple, Set[str]]:
+        """
+        Visitors seen in a batch of event rows, keyed like UniqueSketch rows.
+        """
+        visitors: Dict[Tuple, Set[str]] = defaultdict(set)
+        for row in rows:
+            visitor = visitor_key(row)
+            if visitor is None:
+                continue
+            day = floor_bucket(row.get("created_at") or datetime.utcnow(), DAY)
+            for kind, target_type, target_id in counted_targets(row):
+                for bucket in (day, ALL_TIME):
+                    visitors[(target_type, target_id, kind, bucket)].add(visitor)
+        return visitors
+
+    def apply_rows(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Merges a batch of ingested event rows into the stored sketches. Runs
+        inside the caller's transaction; does not commit.
+        """
+        visitors = self.fold_rows(rows)
+        if visitors:
+            self.add(visitors)
+
+    def add(self, visitors: Dict[Tuple, Iterable[str]]) -> None:
+        """
+        Adds visitors to the stored sketches under row locks. Does not commit.
+        """
+        store = SketchRowStore(
+            self.db, UniqueSketch, KEY_COLUMNS, "registers",
+            in_column="target_id", defaults={"registers": b"", "estimate": 0}
+        )
+        stored = store.lock(visitors)
+
+        updates, views = [], []
+        for key, (row_id, data) in stored.items():
+            hll = HyperLogLog.from_bytes(data, HLL_PRECISION)
+            changed = [hll.add(visitor) for visitor in visitors[key]]
+            if data and not any(changed):
+                continue
+            estimate = hll.count()
+            updates.append({"id": row_id, "registers": hll.to_bytes(), "estimate": estimate})
+            if key[0] == "question" and key[2] == VIEWERS and key[3] == ALL_TIME:
+                views.append({"_qid": key[1], "_views": estimate})
+
+        store.update(updates)
+        if views:
+            questions = Question.__table__
+            # a view is not an edit: keep updated_at out of the onupdate
+            self.db.execute(
+                questions.update().where(questions.c.id == bindparam("_qid"))
+                .values(views=bindparam("_views"), updated_at=questions.c.updated_at),
+                views
+            )
+
+    def backfill(self, since: Optional[datetime] = None, batch_size: int = 10000) -> int:
+        """
+        Replays stored events (optionally from `since`) into the sketches,
+        committing per batch of event ids. Safe to re-run. Returns the
+        number of events read.
+        """
+        table = Event.__table__
+        columns = [table.c[c] for c in (
+            "id", "actor_id", "session_id", "event_type", "target_type", "target_id", "metadata", "created_at"
+        )]
+        after_id, total = 0, 0
+        while True:
+            query = table.select().with_only_columns(*columns).where(table.c.id > after_id)
+            if since is not None:
+                query = query.where(table.c.created_at >= since)
+            rows = [dict(row._mapping) for row in self.db.execute(query.order_by(table.c.id).limit(batch_size))]
+            if not rows:
+                return total
+            self.apply_rows(rows)
+            self.db.commit()
+            after_id = rows[-1]["id"]
+            total += len(rows)
+
+    # ----------------------------
+    # Reads
+    # ----------------------------
+    def unique_counts(
+        self,
+        target_type: str,
+        target_ids: List[int],
+        kind: str = VIEWERS,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> Dict[int, int]:
+        """
+        Estimated distinct viewers/engagers per target. Without dates this
+        reads the stored all-time estimates; with dates it merges the daily
+        sketches of every UTC day the window touches.
+        """
+        counts = {tid: 0 for tid in target_ids}
+        ids = list(counts)
+        if not ids:
+            return counts
+
+        S = UniqueSketch
+        if start_date is None and end_date is None:
+            for i in range(0, len(ids), self.CHUNK_SIZE):
+                rows = self.db.query(S.target_id, S.estimate).filter(
+                    S.target_type == target_type,
+                    S.kind == kind,
+                    S.bucket_start == ALL_TIME,
+                    S.target_id.in_(ids[i:i + self.CHUNK_SIZE])
+                ).all()
+                counts.update({tid: estimate for tid, estimate in rows})
+            return counts
+
+        start = floor_bucket(start_date, DAY) if start_date else ALL_TIME + timedelta(days=1)
+        end = end_date or datetime.utcnow()
+        merged: Dict[int, HyperLogLog] = {}
+        for i in range(0, len(ids), self.CHUNK_SIZE):
+            rows = self.db.query(S.target_id, S.registers).filter(
+                S.target_type == target_type,
+                S.kind == kind,
+                S.bucket_start >= start,
+                S.bucket_start <= end,
+                S.target_id.in_(ids[i:i + self.CHUNK_SIZE])
+            ).yield_per(1000)
+            for tid, registers in rows:
+                if tid not in merged:
+                    merged[tid] = HyperLogLog(HLL_PRECISION)
+                merged[tid].merge(HyperLogLog.from_bytes(registers, HLL_PRECISION))
+        counts.update({tid: hll.count() for tid, hll in merged.items()})
+        return counts
+
+    def unique_metrics(self, target_type: str, target_ids: List[int]) -> Dict[int, Dict[str, int]]:
+        """All-time unique viewers and engagers per target, for cards."""
+        viewers = self.unique_counts(target_type, target_ids, VIEWERS)
+        engagers = self.unique_counts(target_type, target_ids, ENGAGERS)
+        return {tid: {"unique_viewers": viewers[tid], "unique_engagers": engagers[tid]} for tid in target_ids}
+
+
+def apply_unique_counts(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """
+    Event pipeline sink: keeps the unique viewer/engager sketches in step
+    with each flushed batch.
+    """
+    UniqueCounterService(db).apply_rows(rows)
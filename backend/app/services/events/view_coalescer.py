@@ -0,0 +1,276 @@
+# app/services/events/view_coalescer.py
+import logging
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.events.event_types import EventTypes
+from app.services.events.event_pipeline import event_pipeline
+
+LOG = logging.getLogger("view_coalescer")
+
+COALESCED_EVENT_TYPES = frozenset({
+    EventTypes.QUESTION_VIEWED,
+    EventTypes.ANSWER_VIEWED,
+    EventTypes.COMMENT_VIEWED,
+    EventTypes.FEED_ITEM_SHOWN,
+})
+
+# Metadata stamped on the sampled raw rows of coalesced windows
+COALESCED_COUNT_KEY = "coalesced_count"
+SAMPLE_RATE_KEY = "sample_rate"
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def is_view_sample(row: Dict[str, Any]) -> bool:
+    """True for a raw row standing in for a sampled coalesced window."""
+    return SAMPLE_RATE_KEY in (row.get("metadata") or {})
+
+
+def sample_weight(metadata: Optional[Dict[str, Any]]) -> int:
+    """
+    Events a stored row stands for: 1 for an ordinary row, the window's
+    count scaled by the inverse sampling rate for a sampled one.
+    """
+    metadata = metadata or {}
+    if SAMPLE_RATE_KEY not in metadata:
+        return 1
+    return max(1, round(metadata.get(COALESCED_COUNT_KEY, 1) / metadata[SAMPLE_RATE_KEY]))
+
+
+class ViewCoalescer:
+    """
+    In-process coalescing of view and impression events.
+    Repeat views of one target by one visitor (user or session) from one
+    feed within a window collapse into a single counter. A background
+    thread flushes closed windows as aggregated counts to its sinks (the
+    engagement rollups and unique sketches, registered by app.main), so analytics see every view, while only a random sample
+    of windows is written to the `events` table as a raw trail (each
+    tagged with its count and the sampling rate). Windows not yet flushed
+    are lost if the process dies.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable] = None,
+        window_seconds: int = settings.VIEW_COALESCE_WINDOW_SECONDS,
+        flush_interval: float = settings.VIEW_COALESCE_FLUSH_INTERVAL_SECONDS,
+        max_entries: int = settings.VIEW_COALESCE_MAX_ENTRIES,
+        sample_rate: float = settings.VIEW_SAMPLE_RATE,
+        pipeline=None,
+        seed: Optional[int] = None,
+    ):
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("sample_rate must be between 0 and 1")
+        self._session_factory = session_factory
+        self.window_seconds = window_seconds
+        self.flush_interval = flush_interval
+        self.max_entries = max_entries
+        self.sample_rate = sample_rate
+        self._pipeline = pipeline or event_pipeline
+        self._random = random.Random(seed)
+
+        self._sinks: List[Callable] = []
+
+        # (event_type, target_type, target_id, actor_id, session_id, feed_id, window) -> [first row, count]
+        self._windows: Dict[Tuple, List[Any]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+        self._thread: Optional[threading.Thread] = None
+        self._wakeup = threading.Event()
+        self._running = False
+
+        self._counters = {
+            "recorded": 0,
+            "windows_flushed": 0,
+            "sampled": 0,
+            "flushes": 0,
+            "failed_flushes": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+        }
+
+    # ----------------------------
+    # Lifecycle
+    # ----------------------------
+    def start(self) -> None:
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            self._wakeup.clear()
+            self._thread = threading.Thread(target=self._run, name="view-coalescer", daemon=True)
+            self._thread.start()
+        LOG.info("view coalescer started (window=%ss, sample=%s)", self.window_seconds, self.sample_rate)
+
+    def stop(self, timeout: float = settings.EVENT_SHUTDOWN_TIMEOUT_SECONDS) -> None:
+        """
+        Stop the flusher and write out every open window. Call before the
+        event pipeline stops so the sampled rows still get queued.
+        """
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+            thread = self._thread
+            self._thread = None
+
+        self._wakeup.set()
+        thread.join(timeout)
+        self.flush(everything=True)
+        LOG.info("view coalescer stopped")
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def add_sink(self, sink: Callable) -> None:
+        """
+        Register `sink(db, rows)` to receive each flush's window summaries:
+        event-row dicts with a "count" of the views they stand for. Sinks
+        share one transaction per flush.
+        """
+        if sink not in self._sinks:
+            self._sinks.append(sink)
+
+    # ----------------------------
+    # Producer side
+    # ----------------------------
+    def accepts(self, row: Dict[str, Any]) -> bool:
+        return self._running and row["event_type"] in COALESCED_EVENT_TYPES
+
+    def record(self, row: Dict[str, Any]) -> None:
+        """Counts one view/impression row (as built by build_event_row)."""
+        created_at = row.get("created_at") or datetime.utcnow()
+        window = int((created_at - EPOCH).total_seconds() // self.window_seconds)
+        key = (
+            row["event_type"], row["target_type"], row["target_id"],
+            row.get("actor_id"), row.get("session_id"), row.get("feed_id"), window
+        )
+        with self._lock:
+            entry = self._windows.get(key)
+            if entry is None:
+                self._windows[key] = [row, 1]
+            else:
+                entry[1] += 1
+            self._counters["recorded"] += 1
+            full = len(self._windows) >= self.max_entries
+        if full:
+            self._wakeup.set()
+
+    # ----------------------------
+    # Flusher side
+    # ----------------------------
+    def _run(self) -> None:
+        while self._running:
+            full = self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if not self._running:
+                return
+            self.flush(everything=full)
+
+    def flush(self, everything: bool = False) -> int:
+        """
+        Writes windows that have closed (all of them with `everything`) in
+        one transaction, then queues the sampled raw rows on the event
+        pipeline. On failure the windows go back into the buffer for the
+        next attempt. Returns the number of windows flushed.
+        """
+        with self._flush_lock:
+            current = int((datetime.utcnow() - EPOCH).total_seconds() // self.window_seconds)
+            with self._lock:
+                if everything:
+                    batch, self._windows = self._windows, {}
+                else:
+                    batch = {key: entry for key, entry in self._windows.items() if key[-1] < current}
+                    for key in batch:
+                        del self._windows[key]
+            if not batch:
+                return 0
+
+            summaries = [self._summary(row, count) for row, count in batch.values()]
+            started = time.perf_counter()
+            try:
+                self._write(summaries)
+            except Exception:
+                LOG.exception("view flush failed; keeping %s windows for retry", len(batch))
+                with self._lock:
+                    for key, (row, count) in batch.items():
+                        entry = self._windows.setdefault(key, [row, 0])
+                        entry[1] += count
+                    self._counters["failed_flushes"] += 1
+                return 0
+
+            samples = [
+                self._sample(row, count)
+                for row, count in batch.values()
+                if self.sample_rate and self._random.random() < self.sample_rate
+            ]
+            for sample in samples:
+                self._pipeline.submit(sample)
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self._counters["flushes"] += 1
+                self._counters["windows_flushed"] += len(batch)
+                self._counters["sampled"] += len(samples)
+                self._counters["last_flush_ms"] = elapsed_ms
+                self._counters["max_flush_ms"] = max(self._counters["max_flush_ms"], elapsed_ms)
+            return len(batch)
+
+    @staticmethod
+    def _summary(row: Dict[str, Any], count: int) -> Dict[str, Any]:
+        return {
+            "actor_id": row.get("actor_id"),
+            "session_id": row.get("session_id"),
+            "feed_id": row.get("feed_id"),
+            "event_type": row["event_type"],
+            "target_type": row["target_type"],
+            "target_id": row["target_id"],
+            "metadata": row.get("metadata") or {},
+            "created_at": row.get("created_at"),
+            "count": count,
+        }
+
+    def _sample(self, row: Dict[str, Any], count: int) -> Dict[str, Any]:
+        metadata = dict(row.get("metadata") or {})
+        metadata[COALESCED_COUNT_KEY] = count
+        metadata[SAMPLE_RATE_KEY] = self.sample_rate
+        return {**row, "metadata": metadata, "sample_weight": sample_weight(metadata)}
+
+    def _write(self, summaries: List[Dict[str, Any]]) -> None:
+        db = self._new_session()
+        try:
+            for sink in self._sinks:
+                sink(db, summaries)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _new_session(self):
+        if self._session_factory is None:
+            from app.db.database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    # ----------------------------
+    # Metrics
+    # ----------------------------
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            c = dict(self._counters)
+            c["open_windows"] = len(self._windows)
+        c["running"] = self._running
+        return c
+
+
+# Shared per-process coalescer, started/stopped by app.main
+view_coalescer = ViewCoalescer()
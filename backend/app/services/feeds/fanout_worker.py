@@ -0,0 +1,194 @@
+# app/services/feeds/fanout_worker.py
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.events.event_types import EventTypes
+from app.services.feeds.feed_inbox import FeedInboxService
+
+LOG = logging.getLogger("fanout_worker")
+
+_STOP = object()
+
+# (question_id, author_id, created_at)
+FanoutJob = Tuple[int, int, datetime]
+
+
+class FanoutWorker:
+    """
+    Runs fan-out-on-write off the event flusher.
+    A question from a well-followed author takes one insert per batch of
+    followers, so the event pipeline sink only queues it here and this
+    worker's thread pushes it into the inboxes, one question per
+    transaction. Event flushes never wait on fan-out, and a failed fan-out
+    costs only that question's inbox entries.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable] = None,
+        max_size: int = settings.FEED_FANOUT_QUEUE_MAX_SIZE,
+        enqueue_timeout: float = settings.EVENT_ENQUEUE_TIMEOUT_SECONDS,
+    ):
+        self._session_factory = session_factory
+        self.enqueue_timeout = enqueue_timeout
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._running = False
+
+        self._stats_lock = threading.Lock()
+        self._counters = {
+            "enqueued": 0,
+            "inline": 0,
+            "questions": 0,
+            "inboxes": 0,
+            "failed": 0,
+            "last_fanout_ms": 0.0,
+            "max_fanout_ms": 0.0,
+        }
+
+    # ----------------------------
+    # Lifecycle
+    # ----------------------------
+    def start(self) -> None:
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="feed-fanout", daemon=True)
+            self._thread.start()
+        LOG.info("fan-out worker started")
+
+    def stop(self, timeout: float = settings.EVENT_SHUTDOWN_TIMEOUT_SECONDS) -> None:
+        """
+        Stop accepting questions and fan out everything already queued.
+        """
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+            thread = self._thread
+            self._thread = None
+
+        self._queue.put(_STOP)
+        thread.join(timeout)
+        if thread.is_alive():
+            LOG.warning("fan-out worker did not stop within %ss; %s questions left", timeout, self._queue.qsize())
+            return
+
+        for job in self._drain_nowait():
+            self._fan_out(job)
+        LOG.info("fan-out worker stopped")
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    # ----------------------------
+    # Producer side
+    # ----------------------------
+    def submit(self, question_id: int, author_id: int, created_at: datetime) -> None:
+        """
+        Queues a new question for fan-out. Runs it inline when the worker is
+        stopped, or when the queue stays full for `enqueue_timeout`.
+        """
+        job = (question_id, author_id, created_at)
+        if not self._running:
+            self._fan_out(job)
+            return
+        try:
+            self._queue.put(job, timeout=self.enqueue_timeout)
+        except queue.Full:
+            self._incr("inline")
+            self._fan_out(job)
+            return
+        self._incr("enqueued")
+
+    # ----------------------------
+    # Worker side
+    # ----------------------------
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is _STOP:
+                return
+            self._fan_out(job)
+
+    def _drain_nowait(self) -> List[FanoutJob]:
+        jobs = []
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                return jobs
+            if job is not _STOP:
+                jobs.append(job)
+
+    def _fan_out(self, job: FanoutJob) -> None:
+        """Fans one question out in its own transaction, retrying once."""
+        started = time.perf_counter()
+        for attempt in (1, 2):
+            db = self._new_session()
+            try:
+                written = FeedInboxService(db).fan_out(*job)
+                db.commit()
+                break
+            except Exception:
+                db.rollback()
+                if attempt == 1:
+                    LOG.exception("fan-out of question %s failed, retrying once", job[0])
+                else:
+                    LOG.exception("dropping fan-out of question %s after failed retry", job[0])
+                    self._incr("failed")
+                    return
+            finally:
+                db.close()
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._stats_lock:
+            self._counters["questions"] += 1
+            self._counters["inboxes"] += written
+            self._counters["last_fanout_ms"] = elapsed_ms
+            self._counters["max_fanout_ms"] = max(self._counters["max_fanout_ms"], elapsed_ms)
+
+    def _new_session(self):
+        if self._session_factory is None:
+            from app.db.database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    # ----------------------------
+    # Metrics
+    # ----------------------------
+    def _incr(self, key: str, n: int = 1) -> None:
+        with self._stats_lock:
+            self._counters[key] += n
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            c = dict(self._counters)
+        c["queue_depth"] = self._queue.qsize()
+        c["running"] = self._running
+        return c
+
+
+# Shared per-process worker, started/stopped by app.main
+fanout_worker = FanoutWorker()
+
+
+def apply_feed_fanout(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """
+    Event pipeline sink: queues the questions created in each flushed batch
+    for fan-out. Anonymous questions (no owner) are never fanned out.
+    """
+    for row in rows:
+        if row["event_type"] == EventTypes.QUESTION_CREATED and row.get("owner_id") is not None:
+            fanout_worker.submit(row["target_id"], row["owner_id"], row.get("created_at") or datetime.utcnow())
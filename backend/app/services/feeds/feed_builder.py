@@ -1,15 +1,68 @@
 # app/services/feeds/feed_builder.py
-from typing import List, Optional, Dict
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, List, Optional, Dict
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
+from app.core.config import settings
 from app.services.content import question_service, answer_service, comment_service
 from app.services.events.event_aggregator import EventAggregator
+from app.services.feeds.ranking_engine import FeedRankingEngine
+from app.services.feeds.hot_score import order_by_hot
+from app.services.feeds.feed_inbox import FeedInboxService
+from app.services.feeds.recent_index import recent_index
+from app.services.feeds.seen_items import SeenItemsService
+from app.services.feeds.feed_snapshot import FeedSnapshotStore, decode_feed_cursor, encode_feed_cursor
 from app.events.event_types import EventTypes
 
+LOG = logging.getLogger("feed_builder")
+
+FEED_STAGES = ("candidates", "metrics", "ranking", "seen", "snapshot", "hydration")
+
+
+class FeedStageStats:
+    """
+    Per-stage feed latency for this process: calls, total/last/max ms.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, float]] = defaultdict(
+            lambda: {"calls": 0, "total_ms": 0.0, "last_ms": 0.0, "max_ms": 0.0}
+        )
+
+    def record(self, stage: str, elapsed_ms: float) -> None:
+        with self._lock:
+            s = self._stages[stage]
+            s["calls"] += 1
+            s["total_ms"] += elapsed_ms
+            s["last_ms"] = elapsed_ms
+            s["max_ms"] = max(s["max_ms"], elapsed_ms)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            stages = {stage: dict(s) for stage, s in self._stages.items()}
+        for s in stages.values():
+            s["avg_ms"] = s["total_ms"] / s["calls"] if s["calls"] else 0.0
+        return stages
+
+
+# Shared per-process stage timings
+feed_stage_stats = FeedStageStats()
+
+
 class FeedBuilder:
     """
     Builds personalized feeds for users.
-    Fetches content, computes engagement metrics, applies ranking & filtering.
+    A feed is built in stages: candidate fetch (ids only), one bulk metrics
+    lookup, ranking, then hydration of only the page being returned. The
+    ranked ids are kept as a snapshot that later pages slice through an
+    opaque cursor, so paging never re-ranks and items don't shift between
+    pages. Each stage is timed into `last_timings` and the shared
+    feed_stage_stats.
     """
 
     def __init__(self, db: Session):
@@ -18,6 +71,21 @@ class FeedBuilder:
         self.question_service = question_service.QuestionService(db)
         self.answer_service = answer_service.AnswerService(db)
         self.comment_service = comment_service.CommentService(db)
+        self.inbox = FeedInboxService(db)
+        self.snapshots = FeedSnapshotStore(db)
+        self.seen = SeenItemsService(db)
+        self.last_timings: Dict[str, float] = {}
+        self.last_source: Optional[str] = None
+
+    @contextmanager
+    def _stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.last_timings[name] = elapsed_ms
+            feed_stage_stats.record(name, elapsed_ms)
 
     # ----------------------------
     # Core feed building
@@ -28,25 +96,210 @@ class FeedBuilder:
         limit: int = 20,
         include_answers: bool = True,
         include_comments: bool = False,
-        since_days: int = 30
+        since_days: int = 30,
+        ranking: str = "hot",
+        candidate_pool: Optional[int] = None
     ) -> List[Dict]:
         """
-        Build a personalized feed for a user:
-        - Fetch recent questions
-        - Include engagement metrics
-        - Optional answers & comments
+        Build a personalized feed for a user and return its first page.
+        See get_feed_page for the stages and for paging further.
         """
-        from app.models.question import Question
+        return self.get_feed_page(
+            user_id,
+            limit=limit,
+            include_answers=include_answers,
+            include_comments=include_comments,
+            since_days=since_days,
+            ranking=ranking,
+            candidate_pool=candidate_pool,
+            log_impressions=False
+        )["items"]
 
+    def get_feed_page(
+        self,
+        user_id: int,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        include_answers: bool = True,
+        include_comments: bool = False,
+        since_days: int = 30,
+        ranking: str = "hot",
+        candidate_pool: Optional[int] = None,
+        log_impressions: bool = True
+    ) -> Dict[str, Any]:
+        """
+        One page of a user's feed: {"feed_id", "items", "next_cursor"}.
+        Without a cursor the feed is built:
+        - Fetch candidate question ids from the user's feed inbox (falling
+          back to all recent questions when it is empty)
+        - Look up engagement metrics for all candidates at once
+        - Rank, then demote (or drop, per FEED_SEEN_MODE) questions the
+          user was already shown, using their seen-item filters
+        - Store the ranked ids as a snapshot (its id is the feed_id)
+        With a cursor the page is sliced from that snapshot; if it has
+        expired, a fresh one is built and read from the same offset.
+        Either way only the page is hydrated (with answer metrics if asked).
+        Items carry feed_id and position, which clients send back with
+        their events; the page's impressions are logged with them.
+        Candidates are the newest `candidate_pool` questions
+        (FEED_CANDIDATE_POOL by default). ranking="hot" orders them by the
+        persisted hot score; ranking="engagement" ranks them with
+        FeedRankingEngine.
+        Raises InvalidCursor for a malformed cursor.
+        """
+        self.last_timings = {}
         start_date = datetime.utcnow() - timedelta(days=since_days)
-        questions = self.db.query(Question)\
-            .filter(Question.deleted_at.is_(None), Question.created_at >= start_date)\
-            .order_by(Question.created_at.desc())\
-            .limit(limit).all()
+
+        snapshot_id, offset, item_ids = None, 0, None
+        if cursor:
+            snapshot_id, offset = decode_feed_cursor(cursor)
+            with self._stage("snapshot"):
+                item_ids = self.snapshots.get(snapshot_id, user_id)
+            self.last_source = "snapshot"
+
+        metrics_map: Dict[int, Dict] = {}
+        if item_ids is None:
+            ranked = self._rank(user_id, start_date, max(candidate_pool or settings.FEED_CANDIDATE_POOL, limit), ranking)
+            item_ids = [c["id"] for c in ranked]
+            metrics_map = {c["id"]: c["engagement_metrics"] for c in ranked if "engagement_metrics" in c}
+            with self._stage("snapshot"):
+                snapshot_id = self.snapshots.create(user_id, ranking, item_ids)
+
+        page_ids = item_ids[offset:offset + limit]
+        with self._stage("hydration"):
+            feed_items = self._hydrate(page_ids, metrics_map, start_date, include_answers)
+        for item in feed_items:
+            item["feed_id"] = snapshot_id
+            item["position"] = offset + page_ids.index(item["id"])
+
+        if log_impressions:
+            self._log_impressions(user_id, feed_items)
+
+        LOG.debug("feed for user %s: %s", user_id, {k: round(v, 2) for k, v in self.last_timings.items()})
+        next_offset = offset + limit
+        return {
+            "feed_id": snapshot_id,
+            "items": feed_items,
+            "next_cursor": encode_feed_cursor(snapshot_id, next_offset) if next_offset < len(item_ids) else None,
+        }
+
+    def _rank(self, user_id: int, start_date: datetime, pool: int, ranking: str) -> List[Dict[str, Any]]:
+        """Candidate, metrics and ranking stages: the full ranked pool."""
+        with self._stage("candidates"):
+            candidates = self._inbox_candidates(user_id, start_date, pool, ranking) \
+                if settings.FEED_FANOUT_ENABLED else []
+            self.last_source = "inbox" if candidates else "global"
+            if not candidates:
+                candidates = self._fetch_candidates(start_date, pool, ranking)
+
+        # Hot candidates are already in order; their page metrics are
+        # looked up at hydration
+        if ranking != "hot":
+            with self._stage("metrics"):
+                metrics_map = self.event_aggregator.get_batch_metrics(
+                    "question", [c["id"] for c in candidates], start_date=start_date
+                )
+                for c in candidates:
+                    c["engagement_metrics"] = metrics_map[c["id"]]
+
+            with self._stage("ranking"):
+                candidates = FeedRankingEngine.rank_items(candidates, top_k=len(candidates))
+
+        if settings.FEED_SEEN_MODE == "off":
+            return candidates
+        with self._stage("seen"):
+            return self._apply_seen(user_id, candidates)
+
+    def _apply_seen(self, user_id: int, ranked: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Moves questions already shown to the user behind the unseen ones,
+        keeping rank order within each group ("demote"), or drops them
+        ("filter"). Bloom false positives occasionally demote an unseen one.
+        """
+        seen = self.seen.seen_set(user_id)
+        if not seen:
+            return ranked
+        unseen, already = [], []
+        for c in ranked:
+            (already if ("question", c["id"]) in seen else unseen).append(c)
+        if settings.FEED_SEEN_MODE == "filter":
+            return unseen
+        return unseen + already
+
+    # ----------------------------
+    # Stages
+    # ----------------------------
+    def _fetch_candidates(self, start_date: datetime, pool: int, ranking: str) -> List[Dict[str, Any]]:
+        """
+        (id, created_at) of candidate questions, in index order. Newest
+        first comes from the resident recent-question index when it covers
+        start_date; hot order from the hot_score index.
+        """
+        from app.models.question import Question
+
+        if ranking != "hot" and recent_index.covers(start_date):
+            return [{"id": qid, "created_at": created_at} for qid, created_at in recent_index.recent(start_date, pool)]
+
+        query = self.db.query(Question.id, Question.created_at)\
+            .filter(Question.is_deleted.isnot(True), Question.created_at >= start_date)
+        if ranking == "hot":
+            query = order_by_hot(query, Question)
+        else:
+            query = query.order_by(Question.created_at.desc())
+        return [{"id": qid, "created_at": created_at} for qid, created_at in query.limit(pool).all()]
+
+    def _inbox_candidates(self, user_id: int, start_date: datetime, pool: int, ranking: str) -> List[Dict[str, Any]]:
+        """
+        Live questions from the user's inbox and pulled authors, hottest
+        first for ranking="hot", else newest first.
+        """
+        from app.models.question import Question
+
+        ids = [qid for qid, _ in self.inbox.candidates(user_id, start_date, pool)]
+        if not ids:
+            return []
+        rows = self.db.query(Question.id, Question.created_at, Question.hot_score)\
+            .filter(Question.id.in_(ids), Question.is_deleted.isnot(True)).all()
+        if ranking == "hot":
+            rows = sorted(rows, key=lambda r: (r.hot_score is not None, r.hot_score or 0.0, r.id), reverse=True)
+        else:
+            rows = sorted(rows, key=lambda r: (r.created_at, r.id), reverse=True)
+        return [{"id": r.id, "created_at": r.created_at} for r in rows]
+
+    def _hydrate(
+        self,
+        page_ids: List[int],
+        metrics_map: Dict[int, Dict],
+        start_date: datetime,
+        include_answers: bool
+    ) -> List[Dict]:
+        """
+        Loads question fields, engagement metrics not already known and
+        answer metrics for the returned page, in page order. Questions
+        deleted since the snapshot was taken are left out.
+        """
+        from app.models.question import Question
+
+        if not page_ids:
+            return []
+        rows = {
+            row.id: row for row in self.db.query(
+                Question.id, Question.title, Question.content, Question.user_id, Question.created_at
+            ).filter(Question.id.in_(page_ids), Question.is_deleted.isnot(True)).all()
+        }
+        missing = [qid for qid in page_ids if qid not in metrics_map]
+        if missing:
+            metrics_map = {
+                **metrics_map,
+                **self.event_aggregator.get_batch_metrics("question", missing, start_date=start_date)
+            }
+        answers_map = self._answer_metrics(page_ids) if include_answers else {}
 
         feed_items = []
-        for q in questions:
-            metrics = self.event_aggregator.get_engagement_metrics("question", q.id, start_date=start_date)
+        for qid in page_ids:
+            q = rows.get(qid)
+            if q is None:
+                continue
             item = {
                 "id": q.id,
                 "type": "question",
@@ -55,15 +308,61 @@ class FeedBuilder:
                 "user_id": q.user_id,
                 "is_anonymous": q.user_id is None,
                 "created_at": q.created_at,
-                "engagement_metrics": metrics
+                "engagement_metrics": metrics_map[q.id]
             }
 
             if include_answers:
-                answers = self.answer_service.get_engagement_metrics(q.id)
-                item["answers_metrics"] = answers
+                item["answers_metrics"] = answers_map[q.id]
 
             feed_items.append(item)
+        return feed_items
+
+    def _log_impressions(self, user_id: int, feed_items: List[Dict]) -> None:
+        """
+        Records the page's items in the user's seen-item filters right away,
+        so the next refresh already knows them, then logs the impressions.
+        """
+        from app.services.events.event_logger import log_event
+
+        if not feed_items:
+            return
+        bucket = self.seen.bucket_start(datetime.utcnow())
+        self.seen.add({(user_id, bucket): [("question", item["id"]) for item in feed_items]})
+        self.db.commit()
+
+        for item in feed_items:
+            log_event(
+                self.db,
+                actor_id=user_id,
+                actor_role="user",
+                event_type=EventTypes.FEED_ITEM_SHOWN,
+                target_type="question",
+                target_id=item["id"],
+                owner_id=item["user_id"],
+                feed_id=item["feed_id"],
+                position=item["position"],
+                source="feed"
+            )
+
+    def _answer_metrics(self, question_ids: List[int]) -> Dict[int, Dict]:
+        """
+        Engagement metrics of each question's answers, summed per question,
+        from one batch lookup over all answers on the page.
+        """
+        from app.models.answer import Answer
+
+        by_question: Dict[int, List[int]] = {qid: [] for qid in question_ids}
+        rows = self.db.query(Answer.id, Answer.question_id)\
+            .filter(Answer.question_id.in_(question_ids), Answer.is_deleted.isnot(True)).all()
+        for answer_id, question_id in rows:
+            by_question[question_id].append(answer_id)
 
-        # Apply ranking
-        ranked_feed = FeedRankingEngine.rank_items(feed_items)
-        return ranked_feed
+        metrics = self.event_aggregator.get_batch_metrics("answer", [answer_id for answer_id, _ in rows])
+        totals = {}
+        for question_id, answer_ids in by_question.items():
+            total = EventAggregator._empty_metrics()
+            for answer_id in answer_ids:
+                for key, value in metrics[answer_id].items():
+                    total[key] += value
+            totals[question_id] = total
+        return totals
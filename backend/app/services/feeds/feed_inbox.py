@@ -0,0 +1,208 @@
+# app/services/feeds/feed_inbox.py
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.upserts import insert_ignore
+from app.events.event_types import EventTypes
+from app.models.feed_inbox import FeedInboxEntry
+from app.models.question import Question
+from app.models.user import User
+from app.models.user_follow import UserFollow
+from app.services.feeds.recent_index import recent_index
+
+
+class FeedInboxService:
+    """
+    Fan-out-on-write feed store.
+    When a question is created its id is pushed into the capped inbox of
+    every follower of its author, so reading a feed is one index range scan
+    per user. Authors with more than `max_followers` followers are not
+    fanned out; their followers pull those authors' recent questions at
+    read time instead (hybrid push/pull).
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        cap: int = settings.FEED_INBOX_CAP,
+        max_followers: int = settings.FEED_FANOUT_MAX_FOLLOWERS,
+        batch_size: int = settings.FEED_FANOUT_BATCH_SIZE
+    ):
+        self.db = db
+        self.cap = cap
+        self.max_followers = max_followers
+        self.batch_size = batch_size
+        # Inboxes are trimmed on one question id in every cap / 10, so they
+        # run around 10% over the cap and most fan-outs skip the trim query
+        self._trim_every = max(cap // 10, 1)
+
+    # ----------------------------
+    # Follows
+    # ----------------------------
+    def follow(self, follower_id: int, followee_id: int) -> bool:
+        """
+        Follows a user and seeds the follower's inbox with the followee's
+        recent questions. Returns False if already following.
+        """
+        from app.services.events.event_logger import log_event
+
+        if follower_id == followee_id:
+            raise ValueError("users can't follow themselves")
+        exists = self.db.query(UserFollow.id).filter_by(follower_id=follower_id, followee_id=followee_id).first()
+        if exists:
+            return False
+
+        self.db.add(UserFollow(follower_id=follower_id, followee_id=followee_id))
+        self._shift_followers(followee_id, 1)
+        if not self.is_pulled(followee_id):
+            self._seed(follower_id, followee_id)
+        self.db.commit()
+
+        log_event(
+            self.db,
+            actor_id=follower_id,
+            actor_role="user",
+            event_type=EventTypes.USER_FOLLOWED,
+            target_type="user",
+            target_id=followee_id,
+            owner_id=followee_id
+        )
+        return True
+
+    def unfollow(self, follower_id: int, followee_id: int) -> bool:
+        """
+        Unfollows a user and drops their questions from the follower's
+        inbox. Returns False if not following.
+        """
+        from app.services.events.event_logger import log_event
+
+        deleted = self.db.query(UserFollow).filter_by(
+            follower_id=follower_id, followee_id=followee_id
+        ).delete(synchronize_session=False)
+        if not deleted:
+            return False
+
+        self._shift_followers(followee_id, -1)
+        self.db.query(FeedInboxEntry).filter(
+            FeedInboxEntry.user_id == follower_id, FeedInboxEntry.author_id == followee_id
+        ).delete(synchronize_session=False)
+        self.db.commit()
+
+        log_event(
+            self.db,
+            actor_id=follower_id,
+            actor_role="user",
+            event_type=EventTypes.USER_UNFOLLOWED,
+            target_type="user",
+            target_id=followee_id,
+            owner_id=followee_id
+        )
+        return True
+
+    def is_pulled(self, author_id: int) -> bool:
+        """True if the author has too many followers to fan out to."""
+        count = self.db.query(User.followers_count).filter(User.id == author_id).scalar()
+        return (count or 0) > self.max_followers
+
+    def _shift_followers(self, user_id: int, delta: int) -> None:
+        table = User.__table__
+        self.db.execute(
+            table.update().where(table.c.id == user_id)
+            .values(followers_count=table.c.followers_count + delta, updated_at=table.c.updated_at)
+        )
+
+    def _seed(self, follower_id: int, followee_id: int) -> None:
+        recent = self.db.query(Question.id, Question.created_at).filter(
+            Question.user_id == followee_id, Question.is_deleted.isnot(True)
+        ).order_by(Question.created_at.desc(), Question.id.desc()).limit(self.cap).all()
+        self._insert([
+            {"user_id": follower_id, "question_id": qid, "author_id": followee_id, "created_at": created_at}
+            for qid, created_at in recent
+        ])
+        self.trim([follower_id])
+
+    # ----------------------------
+    # Fan-out
+    # ----------------------------
+    def fan_out(self, question_id: int, author_id: int, created_at: datetime) -> int:
+        """
+        Pushes a new question into its author's followers' inboxes, in
+        batches of followers. Does not commit. Returns the number of inboxes
+        written (0 for authors served by pull).
+        """
+        if self.is_pulled(author_id):
+            return 0
+
+        F = UserFollow
+        after, written = 0, 0
+        while True:
+            followers = [fid for (fid,) in self.db.query(F.follower_id).filter(
+                F.followee_id == author_id, F.follower_id > after
+            ).order_by(F.follower_id).limit(self.batch_size)]
+            if not followers:
+                return written
+            self._insert([
+                {"user_id": fid, "question_id": question_id, "author_id": author_id, "created_at": created_at}
+                for fid in followers
+            ])
+            if question_id % self._trim_every == 0:
+                self.trim(followers)
+            written += len(followers)
+            after = followers[-1]
+
+    def _insert(self, values: List[Dict[str, Any]]) -> None:
+        insert_ignore(self.db, FeedInboxEntry.__table__, values, ["user_id", "question_id"])
+
+    def trim(self, user_ids: List[int]) -> int:
+        """
+        Cuts inboxes back to `cap` entries, oldest first. Returns the number
+        of entries removed.
+        """
+        E = FeedInboxEntry
+        over = [uid for (uid,) in self.db.query(E.user_id).filter(E.user_id.in_(user_ids))
+                .group_by(E.user_id).having(func.count(E.id) > self.cap)]
+
+        removed = 0
+        for uid in over:
+            cutoff = self.db.query(E.created_at, E.id).filter(E.user_id == uid)\
+                .order_by(E.created_at.desc(), E.id.desc()).offset(self.cap - 1).limit(1).first()
+            removed += self.db.query(E).filter(
+                E.user_id == uid,
+                or_(E.created_at < cutoff.created_at, (E.created_at == cutoff.created_at) & (E.id < cutoff.id))
+            ).delete(synchronize_session=False)
+        return removed
+
+    # ----------------------------
+    # Reads
+    # ----------------------------
+    def candidates(self, user_id: int, since: Optional[datetime], limit: int) -> List[Tuple[int, datetime]]:
+        """
+        Newest (question_id, created_at) for a user's feed: inbox entries
+        plus recent questions of followed authors served by pull.
+        """
+        E = FeedInboxEntry
+        query = self.db.query(E.question_id, E.created_at).filter(E.user_id == user_id)
+        if since is not None:
+            query = query.filter(E.created_at >= since)
+        found = query.order_by(E.created_at.desc(), E.id.desc()).limit(limit).all()
+
+        pulled = [uid for (uid,) in self.db.query(User.id).join(UserFollow, UserFollow.followee_id == User.id).filter(
+            UserFollow.follower_id == user_id, User.followers_count > self.max_followers
+        )]
+        if pulled and since is not None and recent_index.covers(since):
+            found += recent_index.recent(since, limit, owner_ids=pulled)
+        elif pulled:
+            query = self.db.query(Question.id, Question.created_at).filter(
+                Question.user_id.in_(pulled), Question.is_deleted.isnot(True)
+            )
+            if since is not None:
+                query = query.filter(Question.created_at >= since)
+            found += query.order_by(Question.created_at.desc(), Question.id.desc()).limit(limit).all()
+
+        merged = dict(sorted(found, key=lambda item: (item[1], item[0]), reverse=True))
+        return list(merged.items())[:limit]
+
@@ -0,0 +1,86 @@
+# app/services/feeds/feed_snapshot.py
+import base64
+import json
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.pagination import InvalidCursor
+from app.models.feed_snapshot import FeedSnapshot
+
+# Snapshots never change once written, so entries are only dropped by TTL
+feed_snapshot_cache = LRUCache(
+    max_entries=settings.FEED_SNAPSHOT_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.FEED_SNAPSHOT_TTL_SECONDS,
+    name="feed_snapshot",
+)
+
+
+# ----------------------------
+# Cursor tokens
+# ----------------------------
+def encode_feed_cursor(snapshot_id: str, offset: int) -> str:
+    """Opaque token for the position `offset` in a feed snapshot."""
+    raw = json.dumps([snapshot_id, offset], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_feed_cursor(token: str) -> Tuple[str, int]:
+    """(snapshot_id, offset); raises InvalidCursor for anything else."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        snapshot_id, offset = json.loads(raw)
+        if not isinstance(snapshot_id, str) or int(offset) < 0:
+            raise ValueError("bad feed cursor")
+        return snapshot_id, int(offset)
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor(f"invalid cursor: {token!r}") from exc
+
+
+class FeedSnapshotStore:
+    """
+    Stores and loads ranked feed snapshots. Reads hit the per-process cache
+    first and fall back to the feed_snapshots table, so a cursor handed out
+    by one worker pages on any other.
+    """
+
+    def __init__(self, db: Session, ttl_seconds: float = settings.FEED_SNAPSHOT_TTL_SECONDS):
+        self.db = db
+        self.ttl_seconds = ttl_seconds
+
+    def create(self, user_id: int, ranking: str, item_ids: List[int]) -> str:
+        """Stores a snapshot (and drops the user's expired ones); returns its id."""
+        now = datetime.utcnow()
+        snapshot_id, item_ids = uuid.uuid4().hex, list(item_ids)
+        expires_at = now + timedelta(seconds=self.ttl_seconds)
+        snapshot = FeedSnapshot(
+            id=snapshot_id, user_id=user_id, ranking=ranking, item_ids=item_ids, expires_at=expires_at
+        )
+        self.db.query(FeedSnapshot).filter(
+            FeedSnapshot.user_id == user_id, FeedSnapshot.expires_at <= now
+        ).delete(synchronize_session=False)
+        self.db.add(snapshot)
+        self.db.commit()
+        feed_snapshot_cache.set(snapshot_id, (user_id, item_ids, expires_at))
+        return snapshot_id
+
+    def get(self, snapshot_id: str, user_id: int) -> Optional[List[int]]:
+        """Ranked ids of a live snapshot of this user's feed, else None."""
+        now = datetime.utcnow()
+        cached = feed_snapshot_cache.get(snapshot_id)
+        if cached is None:
+            row = self.db.query(FeedSnapshot.user_id, FeedSnapshot.item_ids, FeedSnapshot.expires_at).filter(
+                FeedSnapshot.id == snapshot_id, FeedSnapshot.expires_at > now
+            ).first()
+            if row is None:
+                return None
+            cached = (row.user_id, row.item_ids, row.expires_at)
+            feed_snapshot_cache.set(snapshot_id, cached)
+        owner, item_ids, expires_at = cached
+        if owner != user_id or expires_at <= now:
+            return None
+        return item_ids
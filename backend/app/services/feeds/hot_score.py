@@ -0,0 +1,230 @@
+# app/services/feeds/hot_score.py
+import math
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.event import Event
+
+# Fixed reference point for the log-space representation. Never change it
+# without recomputing every stored score.
+HOT_SCORE_EPOCH = datetime(2024, 1, 1)
+
+# Ranking bands for targets whose decayed net score is zero or negative, so
+# they sort below every positive score on a single indexed column.
+ZERO_BAND = -1e9
+NEGATIVE_BAND = -2e9
+
+HOT_TARGET_TYPES = ("question", "answer", "comment")
+
+
+def model_for(target_type: str):
+    from app.models.question import Question
+    from app.models.answer import Answer
+    from app.models.comment import Comment
+    return {"question": Question, "answer": Answer, "comment": Comment}[target_type]
+
+
+def time_exponent(ts: datetime, half_life_hours: float) -> float:
+    """
+    log2 of an event's growth factor: an event at `ts` contributes
+    w * 2 ** time_exponent(ts), which is w * 0.5 ** (age / half_life) once
+    divided by 2 ** time_exponent(now).
+    """
+    return (ts.replace(tzinfo=None) - HOT_SCORE_EPOCH).total_seconds() / 3600.0 / half_life_hours
+
+
+def log2_add(a: Optional[float], b: Optional[float]) -> Optional[float]:
+    """log2(2**a + 2**b) without overflow; None stands for an empty sum."""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    hi, lo = (a, b) if a >= b else (b, a)
+    return hi + math.log2(1.0 + 2.0 ** (lo - hi))
+
+
+def _log2_sub(hi: float, lo: float) -> float:
+    """log2(2**hi - 2**lo) for hi > lo."""
+    return hi + math.log2(-math.expm1((lo - hi) * math.log(2.0)))
+
+
+def rank_key(pos_log: Optional[float], neg_log: Optional[float]) -> Optional[float]:
+    """
+    Single sortable value for the signed sum 2**pos_log - 2**neg_log.
+    Positive sums map to their log2; zero and negative sums go into bands
+    below every positive value. None means the target has no scored events.
+    """
+    if pos_log is None and neg_log is None:
+        return None
+    if neg_log is None:
+        return pos_log
+    if pos_log is None:
+        return NEGATIVE_BAND - neg_log
+    if pos_log > neg_log:
+        return _log2_sub(pos_log, neg_log)
+    if neg_log > pos_log:
+        return NEGATIVE_BAND - _log2_sub(neg_log, pos_log)
+    return ZERO_BAND
+
+
+def current_score(
+    pos_log: Optional[float],
+    neg_log: Optional[float],
+    now: Optional[datetime] = None,
+    half_life_hours: float = settings.HOT_SCORE_HALF_LIFE_HOURS
+) -> float:
+    """
+    Decayed score as of `now`, matching EventAggregator.aggregate_scores.
+    """
+    x_now = time_exponent(now or datetime.utcnow(), half_life_hours)
+    score = 0.0
+    if pos_log is not None:
+        score += 2.0 ** (pos_log - x_now)
+    if neg_log is not None:
+        score -= 2.0 ** (neg_log - x_now)
+    return score
+
+
+class HotScoreService:
+    """
+    Maintains the persisted hot score on questions, answers and comments.
+    Each target stores log2 of its positive and negative weighted sums of
+    2 ** (event_time / half_life). New events only add to those sums and
+    nothing ever needs rescaling; decay is applied at read time by comparing
+    against the current time, which is the same for every row and so
+    doesn't change ordering.
+    """
+
+    def __init__(self, db: Session, half_life_hours: float = settings.HOT_SCORE_HALF_LIFE_HOURS, weights: Optional[Dict[str, float]] = None):
+        from app.services.events.event_aggregator import EventAggregator
+
+        self.db = db
+        self.half_life_hours = half_life_hours
+        self.weights = weights or EventAggregator.DEFAULT_WEIGHTS
+
+    # ----------------------------
+    # Incremental updates
+    # ----------------------------
+    def _fold(self, events: Iterable[Tuple[str, int, str, datetime]]) -> Dict[Tuple[str, int], List[Optional[float]]]:
+        """
+        Folds (target_type, target_id, event_type, created_at) into per-target
+        [pos_log, neg_log] deltas.
+        """
+        deltas: Dict[Tuple[str, int], List[Optional[float]]] = defaultdict(lambda: [None, None])
+        for target_type, target_id, event_type, created_at in events:
+            w = self.weights.get(event_type, 0.0)
+            if w == 0.0 or target_type not in HOT_TARGET_TYPES:
+                continue
+            term = math.log2(abs(w)) + time_exponent(created_at, self.half_life_hours)
+            slot = 0 if w > 0 else 1
+            acc = deltas[(target_type, target_id)]
+            acc[slot] = log2_add(acc[slot], term)
+        return deltas
+
+    def apply_rows(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Adds a batch of ingested event rows to the stored scores. Runs inside
+        the caller's transaction; rows are locked in id order.
+        """
+        deltas = self._fold(
+            (r["target_type"], r["target_id"], r["event_type"], r.get("created_at") or datetime.utcnow())
+            for r in rows
+        )
+
+        by_type: Dict[str, Dict[int, List[Optional[float]]]] = defaultdict(dict)
+        for (target_type, target_id), delta in deltas.items():
+            by_type[target_type][target_id] = delta
+
+        for target_type, per_id in by_type.items():
+            Model = model_for(target_type)
+            current = self.db.query(Model.id, Model.hot_pos_log, Model.hot_neg_log)\
+                .filter(Model.id.in_(sorted(per_id)))\
+                .order_by(Model.id)\
+                .with_for_update()\
+                .all()
+
+            params = []
+            for target_id, pos_log, neg_log in current:
+                d_pos, d_neg = per_id[target_id]
+                pos_log, neg_log = log2_add(pos_log, d_pos), log2_add(neg_log, d_neg)
+                params.append({"_id": target_id, "_pos": pos_log, "_neg": neg_log, "_score": rank_key(pos_log, neg_log)})
+            self._write(Model, params)
+
+    def _write(self, Model, params: List[Dict[str, Any]]) -> None:
+        if not params:
+            return
+        table = Model.__table__
+        # score changes are not edits, so updated_at keeps its value
+        stmt = table.update()\
+            .where(table.c.id == bindparam("_id"))\
+            .values(hot_pos_log=bindparam("_pos"), hot_neg_log=bindparam("_neg"), hot_score=bindparam("_score"),
+                    updated_at=table.c.updated_at)
+        self.db.execute(stmt, params)
+
+    # ----------------------------
+    # Full recomputation / verification
+    # ----------------------------
+    def recompute(self, target_type: str) -> Dict[int, Tuple[Optional[float], Optional[float]]]:
+        """
+        Recomputes (pos_log, neg_log) for every target of a type from raw
+        events, streaming them in chunks.
+        """
+        query = self.db.query(Event.target_type, Event.target_id, Event.event_type, Event.created_at)\
+            .filter(Event.target_type == target_type, Event.event_type.in_(list(self.weights)))
+        deltas = self._fold(query.yield_per(5000))
+        return {target_id: (d[0], d[1]) for (_, target_id), d in deltas.items()}
+
+    def verify(self, target_type: str, tolerance: float = 1e-6, fix: bool = False) -> Dict[str, Any]:
+        """
+        Compares stored scores with a full recomputation. Differences are
+        measured in log2 units (1e-6 is a relative error of ~7e-7).
+        With fix=True, mismatching rows are rewritten.
+        """
+        expected = self.recompute(target_type)
+        Model = model_for(target_type)
+
+        def differs(a, b):
+            if a is None or b is None:
+                return a is not b
+            return abs(a - b) > tolerance
+
+        checked, mismatched, fixes = 0, [], []
+        for target_id, pos_log, neg_log in self.db.query(Model.id, Model.hot_pos_log, Model.hot_neg_log).yield_per(5000):
+            checked += 1
+            exp_pos, exp_neg = expected.get(target_id, (None, None))
+            if differs(pos_log, exp_pos) or differs(neg_log, exp_neg):
+                mismatched.append(target_id)
+                fixes.append({"_id": target_id, "_pos": exp_pos, "_neg": exp_neg, "_score": rank_key(exp_pos, exp_neg)})
+
+        if fix and fixes:
+            for offset in range(0, len(fixes), 1000):
+                self._write(Model, fixes[offset:offset + 1000])
+            self.db.commit()
+
+        return {
+            "target_type": target_type,
+            "checked": checked,
+            "mismatched": len(mismatched),
+            "sample_ids": mismatched[:20],
+            "fixed": fix and bool(fixes),
+        }
+
+
+def order_by_hot(query, Model):
+    """
+    Orders a query on Question/Answer/Comment by the indexed hot score,
+    hottest first, targets without scored events last.
+    """
+    return query.order_by(Model.hot_score.desc().nullslast(), Model.id.desc())
+
+
+def apply_hot_scores(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """
+    Event pipeline sink: adds each flushed batch to the stored hot scores.
+    """
+    HotScoreService(db).apply_rows(rows)
@@ -1,7 +1,16 @@
 # app/services/feeds/ranking_engine.py
-from typing import List, Dict
+import heapq
+from typing import List, Dict, Optional, Sequence
 from datetime import datetime, timedelta
 
+try:
+    import numpy as np
+except ImportError:  # optional: top-k ranking falls back to heapq
+    np = None
+
+_EPOCH = datetime(1970, 1, 1)
+
+
 class FeedRankingEngine:
     """
     Sorts feed items based on engagement metrics, recency, and custom weights.
@@ -17,11 +26,20 @@ class FeedRankingEngine:
     }
 
     @staticmethod
-    def rank_items(items: List[Dict], weights: Dict[str, float] = None, decay_hours: int = 72) -> List[Dict]:
+    def rank_items(
+        items: List[Dict],
+        weights: Dict[str, float] = None,
+        decay_hours: int = 72,
+        top_k: Optional[int] = None
+    ) -> List[Dict]:
         """
         Apply weighted scoring and time decay to rank feed items.
+        With top_k, only the best k items are returned, scored in one
+        vectorized pass and picked by partial selection (see rank_top_k).
         """
         weights = weights or FeedRankingEngine.DEFAULT_WEIGHTS
+        if top_k is not None:
+            return FeedRankingEngine.rank_top_k(items, top_k, weights, decay_hours)
 
         def compute_score(item: Dict) -> float:
             score = 0.0
@@ -36,3 +54,74 @@ class FeedRankingEngine:
 
         ranked = sorted(items, key=lambda x: compute_score(x), reverse=True)
         return ranked
+
+    # ----------------------------
+    # Vectorized top-k
+    # ----------------------------
+    @staticmethod
+    def rank_top_k(
+        items: List[Dict],
+        k: int,
+        weights: Dict[str, float] = None,
+        decay_hours: int = 72
+    ) -> List[Dict]:
+        """
+        Returns the k highest scoring items, best first, using the same score
+        as rank_items. Candidate metrics are packed into arrays once, scored in
+        a single vectorized pass and the top k picked with argpartition
+        instead of a full sort.
+        """
+        weights = weights or FeedRankingEngine.DEFAULT_WEIGHTS
+        if not items or k <= 0:
+            return []
+
+        now = datetime.utcnow()
+        keys = list(weights)
+
+        if np is None:
+            def compute_score(item: Dict) -> float:
+                metrics = item.get("engagement_metrics", {})
+                score = sum(metrics.get(key, 0) * weights[key] for key in keys)
+                age_hours = (now - item.get("created_at", now)).total_seconds() / 3600
+                return score * 0.5 ** (age_hours / decay_hours)
+            return heapq.nlargest(k, items, key=compute_score)
+
+        # Column-at-a-time packing is several times faster than per-row lists
+        metric_dicts = [item.get("engagement_metrics", {}) for item in items]
+        metrics = np.empty((len(items), len(keys)), dtype=np.float64)
+        for col, key in enumerate(keys):
+            metrics[:, col] = [m.get(key, 0) for m in metric_dicts]
+        created = np.array(
+            [(item.get("created_at", now) - _EPOCH).total_seconds() for item in items],
+            dtype=np.float64
+        )
+        scores = FeedRankingEngine.score_arrays(
+            metrics, created, [weights[key] for key in keys], decay_hours, (now - _EPOCH).total_seconds()
+        )
+        return [items[i] for i in FeedRankingEngine.top_k_indices(scores, k)]
+
+    @staticmethod
+    def score_arrays(
+        metrics: "np.ndarray",
+        created_at_seconds: "np.ndarray",
+        weight_vector: Sequence[float],
+        decay_hours: float,
+        now_seconds: float
+    ) -> "np.ndarray":
+        """
+        Scores pre-packed candidates: `metrics` is (n, len(weight_vector)) and
+        `created_at_seconds` holds epoch seconds per candidate.
+        """
+        age_hours = (now_seconds - created_at_seconds) / 3600.0
+        return (metrics @ np.asarray(weight_vector, dtype=np.float64)) * np.exp2(-age_hours / decay_hours)
+
+    @staticmethod
+    def top_k_indices(scores: "np.ndarray", k: int) -> "np.ndarray":
+        """
+        Indices of the k largest scores, best first.
+        """
+        n = scores.shape[0]
+        if k >= n:
+            return np.argsort(-scores, kind="stable")
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top], kind="stable")]
@@ -0,0 +1,335 @@
+# app/services/feeds/recent_index.py
+import logging
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.events.event_types import EventTypes
+from app.models.event import Event
+from app.services.events.event_tail import EventTail
+
+LOG = logging.getLogger("recent_index")
+
+EPOCH = datetime(1970, 1, 1)
+
+# Events after which a question's row is re-read
+STRUCTURAL_EVENTS = (EventTypes.QUESTION_CREATED, EventTypes.QUESTION_DELETED, EventTypes.QUESTION_EDITED)
+
+# Anonymous questions have no owner
+NO_OWNER = -1
+
+
+def _epoch(ts: datetime) -> float:
+    return (ts.replace(tzinfo=None) - EPOCH).total_seconds()
+
+
+class RecentQuestionIndex:
+    """
+    Resident, time-ordered index of the live questions created in the last
+    `max_age_days`, so feed and trending candidates come from memory instead
+    of a created_at range scan over `questions`. Each entry is only id,
+    created_at and owner, held in parallel arrays sorted by (created_at,
+    id): 24 bytes per question.
+
+    Like the trending engine, the index tails the events table, so every
+    worker sees every worker's questions. Created, edited and deleted
+    questions are re-read by primary key on the next poll, and their entry
+    is found by bisecting on its (created_at, id). Entries older than the
+    window are trimmed each poll.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable] = None,
+        max_age_days: int = settings.RECENT_INDEX_MAX_AGE_DAYS,
+        poll_interval: float = settings.RECENT_INDEX_POLL_INTERVAL_SECONDS,
+        gap_timeout: float = settings.TRENDING_GAP_TIMEOUT_SECONDS,
+    ):
+        self._session_factory = session_factory
+        self.max_age_days = max_age_days
+        self.poll_interval = poll_interval
+
+        # Parallel arrays, sorted by (created, id)
+        self._ids = array("q")
+        self._created = array("d")
+        self._owners = array("q")
+        # Entries created before this (epoch seconds) have been trimmed
+        self._horizon = float("inf")
+
+        # Questions to re-read on the next poll
+        self._stale: Set[int] = set()
+        self._tail = EventTail((Event.target_type, Event.target_id, Event.event_type), gap_timeout)
+
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._wakeup = threading.Event()
+        self._running = False
+        self._ready = False
+
+        self._counters = {
+            "polls": 0,
+            "failed_polls": 0,
+            "refreshed": 0,
+            "trimmed": 0,
+            "last_poll_ms": 0.0,
+            "rebuild_ms": 0.0,
+        }
+
+    # ----------------------------
+    # Lifecycle
+    # ----------------------------
+    def start(self) -> None:
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            self._wakeup.clear()
+            self._thread = threading.Thread(target=self._run, name="recent-index", daemon=True)
+            self._thread.start()
+        LOG.info("recent question index started (interval=%ss)", self.poll_interval)
+
+    def stop(self, timeout: float = settings.EVENT_SHUTDOWN_TIMEOUT_SECONDS) -> None:
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+            thread = self._thread
+            self._thread = None
+
+        self._wakeup.set()
+        thread.join(timeout)
+        LOG.info("recent question index stopped")
+
+    @property
+    def ready(self) -> bool:
+        """True once the startup rebuild has finished."""
+        return self._ready
+
+    def covers(self, start_date: datetime) -> bool:
+        """True when every live question created since start_date is indexed."""
+        return self._ready and _epoch(start_date) >= self._horizon
+
+    def _run(self) -> None:
+        while self._running:
+            try:
+                self.rebuild()
+                break
+            except Exception:
+                LOG.exception("recent index rebuild failed; retrying")
+                if self._wakeup.wait(self.poll_interval):
+                    return
+        while not self._wakeup.wait(self.poll_interval):
+            self.poll()
+
+    # ----------------------------
+    # Reads
+    # ----------------------------
+    def recent(
+        self, start_date: datetime, limit: int, owner_ids: Optional[Iterable[int]] = None
+    ) -> List[Tuple[int, datetime]]:
+        """
+        (id, created_at) of up to `limit` questions created since
+        start_date, newest first, optionally only those by `owner_ids`.
+        """
+        since = _epoch(start_date)
+        owners = None if owner_ids is None else set(owner_ids)
+        found: List[Tuple[int, float]] = []
+        with self._lock:
+            i = len(self._ids) - 1
+            while i >= 0 and len(found) < limit and self._created[i] >= since:
+                if owners is None or self._owners[i] in owners:
+                    found.append((self._ids[i], self._created[i]))
+                i -= 1
+        return [(qid, EPOCH + timedelta(seconds=created)) for qid, created in found]
+
+    def ids_since(self, start_date: datetime, owner_id: Optional[int] = None) -> List[int]:
+        """Ids of all questions created since start_date, oldest first."""
+        with self._lock:
+            start = bisect_left(self._created, _epoch(start_date))
+            if owner_id is None:
+                return self._ids[start:].tolist()
+            return [self._ids[i] for i in range(start, len(self._ids)) if self._owners[i] == owner_id]
+
+    # ----------------------------
+    # Tailing the events table
+    # ----------------------------
+    def poll(self) -> int:
+        """
+        Reads events committed since the last poll, re-reads the questions
+        they created, edited or deleted and trims entries past the window.
+        Returns the number of events read.
+        """
+        started = time.perf_counter()
+        try:
+            db = self._new_session()
+            try:
+                rows = self._tail.read(db)
+                self._mark_stale(rows)
+                self._refresh(db)
+            finally:
+                db.close()
+        except Exception:
+            LOG.exception("recent index poll failed")
+            self._counters["failed_polls"] += 1
+            return 0
+
+        self.trim()
+        self._counters["polls"] += 1
+        self._counters["last_poll_ms"] = (time.perf_counter() - started) * 1000
+        return len(rows)
+
+    def _mark_stale(self, rows: List[Tuple[str, int, str]]) -> None:
+        """Schedules re-reads of the questions a batch of events changed."""
+        for target_type, target_id, event_type in rows:
+            if target_type == "question" and event_type in STRUCTURAL_EVENTS:
+                self._stale.add(target_id)
+
+    def _refresh(self, db) -> None:
+        """Re-reads the stale questions and adds, keeps or drops their entries."""
+        from app.models.question import Question
+
+        due = list(self._stale)
+        for i in range(0, len(due), 500):
+            chunk = due[i:i + 500]
+            rows = {row.id: row for row in db.query(*self._columns(Question)).filter(Question.id.in_(chunk)).all()}
+            with self._lock:
+                for qid in chunk:
+                    row = rows.get(qid)
+                    if row is None:
+                        self._discard_missing(qid)
+                    elif row.created_at is not None:
+                        self._apply(row)
+            self._stale.difference_update(chunk)
+            self._counters["refreshed"] += len(chunk)
+
+    def trim(self, now: Optional[datetime] = None) -> int:
+        """Drops entries created before the window; returns how many."""
+        cutoff = _epoch((now or datetime.utcnow()) - timedelta(days=self.max_age_days))
+        with self._lock:
+            n = bisect_left(self._created, cutoff)
+            if n:
+                for values in self._arrays():
+                    del values[:n]
+            self._horizon = max(self._horizon, cutoff)
+        self._counters["trimmed"] += n
+        return n
+
+    # ----------------------------
+    # Startup rebuild
+    # ----------------------------
+    def rebuild(self, now: Optional[datetime] = None) -> None:
+        """
+        Loads the live questions created within the window. The tail starts
+        at the highest event id seen beforehand, so questions committed while
+        loading are re-read rather than missed.
+        """
+        from app.models.question import Question
+
+        started = time.perf_counter()
+        now = now or datetime.utcnow()
+        horizon = now - timedelta(days=self.max_age_days)
+        db = self._new_session()
+        try:
+            high_water = db.query(Event.id).order_by(Event.id.desc()).limit(1).scalar() or 0
+            rows = db.query(*self._columns(Question)).filter(
+                Question.is_deleted.isnot(True),
+                Question.created_at >= horizon
+            ).order_by(Question.created_at, Question.id).yield_per(10000)
+
+            ids, created, owners = array("q"), array("d"), array("q")
+            for row in rows:
+                if row.created_at is None:
+                    continue
+                ids.append(row.id)
+                created.append(_epoch(row.created_at))
+                owners.append(NO_OWNER if row.user_id is None else row.user_id)
+        finally:
+            db.close()
+
+        with self._lock:
+            self._ids, self._created, self._owners = ids, created, owners
+            self._horizon = _epoch(horizon)
+            self._stale.clear()
+            self._tail.reset(high_water)
+        self._ready = True
+        self._counters["rebuild_ms"] = (time.perf_counter() - started) * 1000
+        LOG.info("recent question index rebuilt: %d questions in %.0f ms", len(ids), self._counters["rebuild_ms"])
+
+    # ----------------------------
+    # Internals
+    # ----------------------------
+    @staticmethod
+    def _columns(Question) -> list:
+        return [Question.id, Question.created_at, Question.user_id, Question.is_deleted]
+
+    def _arrays(self) -> list:
+        return [self._ids, self._created, self._owners]
+
+    def _locate(self, question_id: int, created: float) -> Tuple[int, bool]:
+        """
+        Where (created, question_id) sits in the arrays, and whether it is
+        already there. Caller holds the lock.
+        """
+        i = bisect_left(self._created, created)
+        end = bisect_right(self._created, created, lo=i)
+        # questions created in the same instant are ordered by id
+        while i < end and self._ids[i] < question_id:
+            i += 1
+        return i, i < end and self._ids[i] == question_id
+
+    def _apply(self, row: Any) -> None:
+        """Indexes a live question row, or drops a deleted one. Caller holds the lock."""
+        created = _epoch(row.created_at)
+        if created < self._horizon:
+            return
+        i, indexed = self._locate(row.id, created)
+        if row.is_deleted:
+            if indexed:
+                for values in self._arrays():
+                    del values[i]
+        elif not indexed:
+            # new questions land at or near the end
+            self._ids.insert(i, row.id)
+            self._created.insert(i, created)
+            self._owners.insert(i, NO_OWNER if row.user_id is None else row.user_id)
+
+    def _discard_missing(self, question_id: int) -> None:
+        """
+        Drops a question whose row is gone (hard-deleted), so its created_at
+        is unknown. Caller holds the lock.
+        """
+        try:
+            i = self._ids.index(question_id)
+        except ValueError:
+            return
+        for values in self._arrays():
+            del values[i]
+
+    def _new_session(self):
+        if self._session_factory is None:
+            from app.db.database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    # ----------------------------
+    # Metrics
+    # ----------------------------
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            c = dict(self._counters)
+            c["questions"] = len(self._ids)
+            c["bytes"] = sum(values.itemsize * len(values) for values in self._arrays())
+            c["stale"] = len(self._stale)
+            c["pending_gaps"] = self._tail.pending_gaps
+            c["high_water"] = self._tail.high_water
+        c["ready"] = self._ready
+        c["running"] = self._running
+        return c
+
+
+# Shared per-process index, started/stopped by app.main
+recent_index = RecentQuestionIndex()
@@ -0,0 +1,97 @@
+# app/services/feeds/seen_items.py
+from datetime import datetime, timedelta
+from typing import Dict, Hashable, Iterable, List, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.sketch_rows import SketchRowStore
+from app.core.sketches import BloomFilter
+from app.models.seen_filter import SeenFilter
+
+EPOCH = datetime(1970, 1, 1)
+
+KEY_COLUMNS = ["user_id", "bucket_start"]
+
+
+class SeenSet:
+    """Membership test over a user's live seen-item filters."""
+
+    def __init__(self, filters: List[BloomFilter]):
+        self.filters = filters
+
+    def __contains__(self, item: Hashable) -> bool:
+        return any(item in f for f in self.filters)
+
+    def __bool__(self) -> bool:
+        return bool(self.filters)
+
+
+class SeenItemsService:
+    """
+    Per-user record of the feed items already shown, written by the feed
+    builder as it serves each page. Each user has one Bloom filter per time
+    bucket and keeps only the newest `buckets` of them, so storage per user
+    is bounded by buckets x filter size however much they scroll; items
+    age out as their bucket rotates away. Reading a user's seen set is one
+    indexed query, never a scan of the events table.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        bucket_hours: int = settings.FEED_SEEN_BUCKET_HOURS,
+        buckets: int = settings.FEED_SEEN_BUCKETS,
+        capacity: int = settings.FEED_SEEN_CAPACITY,
+        error_rate: float = settings.FEED_SEEN_ERROR_RATE
+    ):
+        self.db = db
+        self.bucket_hours = bucket_hours
+        self.buckets = buckets
+        self.capacity = capacity
+        self.error_rate = error_rate
+
+    def bucket_start(self, ts: datetime) -> datetime:
+        hours = int((ts.replace(tzinfo=None) - EPOCH).total_seconds() // 3600)
+        return EPOCH + timedelta(hours=hours - hours % self.bucket_hours)
+
+    def oldest_live_bucket(self, now: datetime = None) -> datetime:
+        current = self.bucket_start(now or datetime.utcnow())
+        return current - timedelta(hours=self.bucket_hours * (self.buckets - 1))
+
+    # ----------------------------
+    # Writes
+    # ----------------------------
+    def add(self, shown: Dict[Tuple[int, datetime], Iterable[Tuple[str, int]]]) -> None:
+        """
+        Adds items to the stored filters under row locks and drops the
+        touched users' expired buckets. Does not commit.
+        """
+        store = SketchRowStore(self.db, SeenFilter, KEY_COLUMNS, "bits", in_column="user_id", defaults={"bits": b""})
+        stored = store.lock(shown)
+
+        updates = []
+        for key, (row_id, data) in stored.items():
+            bloom = BloomFilter.from_bytes(data, self.capacity, self.error_rate)
+            changed = [bloom.add(item) for item in shown[key]]
+            if data and not any(changed):
+                continue
+            updates.append({"id": row_id, "bits": bloom.to_bytes()})
+        store.update(updates)
+
+        table = SeenFilter.__table__
+        self.db.execute(table.delete().where(
+            table.c.user_id.in_({user_id for user_id, _ in shown}),
+            table.c.bucket_start < self.oldest_live_bucket()
+        ))
+
+    # ----------------------------
+    # Reads
+    # ----------------------------
+    def seen_set(self, user_id: int) -> SeenSet:
+        """The user's live filters; test membership with (target_type, id)."""
+        rows = self.db.query(SeenFilter.bits).filter(
+            SeenFilter.user_id == user_id, SeenFilter.bucket_start >= self.oldest_live_bucket()
+        ).all()
+        return SeenSet([BloomFilter.from_bytes(bits, self.capacity, self.error_rate) for (bits,) in rows if bits])
+
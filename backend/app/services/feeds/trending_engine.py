@@ -0,0 +1,632 @@
+# app/services/feeds/trending_engine.py
+import heapq
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.sketches import CountMinSketch, HeavyHitters, SpaceSaving
+from app.models.event import Event
+from app.services.events.event_aggregator import EventAggregator
+from app.services.events.event_tail import EventTail
+
+LOG = logging.getLogger("trending_engine")
+
+EPOCH = datetime(1970, 1, 1)
+TRENDING_TARGET_TYPES = ("question", "answer", "comment")
+
+MINUTE_SLOTS = 60
+HOUR_SLOTS = 168
+
+# Window name -> span; "1h" sums minute buckets, the others hour buckets
+WINDOWS = {
+    "1h": timedelta(hours=1),
+    "24h": timedelta(hours=24),
+    "7d": timedelta(days=7),
+}
+
+# Sketch backend: window -> (span, bucket width) in minutes; coarser buckets
+# bound sketch memory at the cost of a window edge that moves in steps
+SKETCH_BUCKETS = {
+    "1h": (60, 5),
+    "24h": (24 * 60, 60),
+    "7d": (7 * 24 * 60, 12 * 60),
+}
+
+def _minute(ts: datetime) -> int:
+    return int((ts.replace(tzinfo=None) - EPOCH).total_seconds() // 60)
+
+
+def _bump(sums: Dict[int, float], target_id: int, value: float) -> None:
+    """Adds to a running sum, dropping targets that net out to zero."""
+    left = sums.get(target_id, 0.0) + value
+    # tolerance absorbs float residue from subtracting expired buckets
+    if abs(left) < 1e-9:
+        sums.pop(target_id, None)
+    else:
+        sums[target_id] = left
+
+
+class TrendingEngine:
+    """
+    Resident sliding-window trending counts for the 1h, 24h and 7d windows.
+    Weighted event counts (EventAggregator.DEFAULT_WEIGHTS) live in ring
+    buffers of per-minute and per-hour buckets; each window keeps a running
+    sum per target, so advancing the clock only subtracts the buckets that
+    fall out of it. The top targets per window and type are recomputed after
+    each poll and served straight from memory.
+
+    The engine tails the events table by id rather than hooking into this
+    worker's event pipeline, so every worker sees every worker's events.
+    On start it rebuilds the rings from the hourly rollups (raw events when
+    they don't cover the week) and from the last hour of raw events.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable] = None,
+        poll_interval: float = settings.TRENDING_POLL_INTERVAL_SECONDS,
+        top_n: int = settings.TRENDING_TOP_N,
+        gap_timeout: float = settings.TRENDING_GAP_TIMEOUT_SECONDS,
+        weights: Optional[Dict[str, float]] = None,
+    ):
+        self._session_factory = session_factory
+        self.poll_interval = poll_interval
+        self.top_n = top_n
+        self.gap_timeout = gap_timeout
+        self.weights = dict(weights or EventAggregator.DEFAULT_WEIGHTS)
+
+        # Ring buffers of {(target_type, target_id): weighted count}
+        self._minutes: List[Dict[Tuple[str, int], float]] = [defaultdict(float) for _ in range(MINUTE_SLOTS)]
+        self._hours: List[Dict[Tuple[str, int], float]] = [defaultdict(float) for _ in range(HOUR_SLOTS)]
+        self._minute_now: Optional[int] = None
+        self._hour_now: Optional[int] = None
+
+        # window -> target_type -> {target_id: running sum}
+        self._sums: Dict[str, Dict[str, Dict[int, float]]] = {
+            window: {t: {} for t in TRENDING_TARGET_TYPES} for window in WINDOWS
+        }
+        # (window, target_type) -> [(target_id, score)], replaced wholesale
+        self._top: Dict[Tuple[str, str], List[Tuple[int, float]]] = {}
+        self._dirty = False
+
+        # Deleted targets -> hour of deletion; dropped once out of every window
+        self._deleted: Dict[Tuple[str, int], int] = {}
+
+        self._tail = EventTail(
+            (Event.target_type, Event.target_id, Event.event_type, Event.created_at, Event.sample_weight), gap_timeout
+        )
+
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._wakeup = threading.Event()
+        self._running = False
+        self._ready = False
+
+        self._counters = {
+            "events": 0,
+            "polls": 0,
+            "failed_polls": 0,
+            "last_poll_ms": 0.0,
+            "rebuild_ms": 0.0,
+        }
+
+    # ----------------------------
+    # Lifecycle
+    # ----------------------------
+    def start(self) -> None:
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            self._wakeup.clear()
+            self._thread = threading.Thread(target=self._run, name="trending-engine", daemon=True)
+            self._thread.start()
+        LOG.info("trending engine started (interval=%ss)", self.poll_interval)
+
+    def stop(self, timeout: float = settings.EVENT_SHUTDOWN_TIMEOUT_SECONDS) -> None:
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+            thread = self._thread
+            self._thread = None
+
+        self._wakeup.set()
+        thread.join(timeout)
+        LOG.info("trending engine stopped")
+
+    @property
+    def ready(self) -> bool:
+        """True once the startup rebuild has finished."""
+        return self._ready
+
+    def _run(self) -> None:
+        while self._running:
+            try:
+                self.rebuild()
+                break
+            except Exception:
+                LOG.exception("trending rebuild failed; retrying")
+                if self._wakeup.wait(self.poll_interval):
+                    return
+        while not self._wakeup.wait(self.poll_interval):
+            self.poll()
+
+    # ----------------------------
+    # Reads
+    # ----------------------------
+    def get_trending(self, target_type: str, window: str = "24h", top_n: int = 10) -> List[Dict[str, Any]]:
+        """
+        Top targets of a type by weighted event count over the window.
+        Only the precomputed top `self.top_n` are available.
+        """
+        if window not in WINDOWS:
+            raise ValueError(f"unknown trending window {window!r}")
+        top = self._top.get((window, target_type), [])
+        return [{"target_id": tid, "score": score} for tid, score in top[:top_n]]
+
+    # ----------------------------
+    # Ingestion
+    # ----------------------------
+    def ingest(self, events: Iterable[Tuple], now: Optional[datetime] = None) -> int:
+        """
+        Adds (target_type, target_id, event_type, created_at[, count]) events
+        and moves the windows to `now`; count defaults to 1 (a sampled view
+        row's sample_weight when tailed). Returns the number of events counted.
+        """
+        now = now or datetime.utcnow()
+        counted = 0
+        with self._lock:
+            self._advance(_minute(now))
+            for target_type, target_id, event_type, created_at, *count in events:
+                if self._add(target_type, target_id, event_type, created_at or now, *count):
+                    counted += 1
+            self._counters["events"] += counted
+        return counted
+
+    def _add(self, target_type: str, target_id: int, event_type: str, created_at: datetime, count: int = 1) -> bool:
+        if target_type not in TRENDING_TARGET_TYPES:
+            return False
+        key = (target_type, target_id)
+        if event_type.endswith("_deleted"):
+            self._drop(key)
+            return True
+        weight = self.weights.get(event_type)
+        if not weight or key in self._deleted:
+            return False
+
+        # Future-dated events count in the current bucket, stale ones nowhere
+        self._add_minute(target_type, target_id, event_type, created_at, count)
+        self._add_hour(target_type, target_id, event_type, created_at, count)
+        return True
+
+    def _drop(self, key: Tuple[str, int]) -> None:
+        target_type, target_id = key
+        self._deleted[key] = self._hour_now
+        for ring in (self._minutes, self._hours):
+            for bucket in ring:
+                bucket.pop(key, None)
+        for window in WINDOWS:
+            self._sums[window][target_type].pop(target_id, None)
+        self._dirty = True
+
+    # ----------------------------
+    # Window expiry
+    # ----------------------------
+    def _advance(self, minute_now: int) -> None:
+        """
+        Moves the clock forward, subtracting every bucket that leaves a window.
+        """
+        if self._minute_now is None:
+            self._minute_now, self._hour_now = minute_now, minute_now // 60
+            return
+        if minute_now <= self._minute_now:
+            return
+
+        if minute_now - self._minute_now >= MINUTE_SLOTS:
+            self._reset_minutes()
+        else:
+            for minute in range(self._minute_now + 1, minute_now + 1):
+                # the slot still holds minute - 60, which just left the hour
+                self._expire(self._minutes[minute % MINUTE_SLOTS], ("1h",), clear=True)
+        self._minute_now = minute_now
+
+        hour_now = minute_now // 60
+        if hour_now - self._hour_now >= HOUR_SLOTS:
+            self._reset_hours()
+        else:
+            for hour in range(self._hour_now + 1, hour_now + 1):
+                self._expire(self._hours[(hour - 24) % HOUR_SLOTS], ("24h",), clear=False)
+                self._expire(self._hours[hour % HOUR_SLOTS], ("7d",), clear=True)
+        if hour_now != self._hour_now:
+            cutoff = hour_now - HOUR_SLOTS
+            self._deleted = {key: hour for key, hour in self._deleted.items() if hour > cutoff}
+        self._hour_now = hour_now
+
+    def _expire(self, bucket: Dict[Tuple[str, int], float], windows: Tuple[str, ...], clear: bool) -> None:
+        if not bucket:
+            return
+        for (target_type, target_id), value in bucket.items():
+            for window in windows:
+                _bump(self._sums[window][target_type], target_id, -value)
+        if clear:
+            bucket.clear()
+        self._dirty = True
+
+    def _reset_minutes(self) -> None:
+        for bucket in self._minutes:
+            bucket.clear()
+        for sums in self._sums["1h"].values():
+            sums.clear()
+        self._dirty = True
+
+    def _reset_hours(self) -> None:
+        for bucket in self._hours:
+            bucket.clear()
+        for window in ("24h", "7d"):
+            for sums in self._sums[window].values():
+                sums.clear()
+        self._dirty = True
+
+    # ----------------------------
+    # Top-N
+    # ----------------------------
+    def refresh_top(self) -> None:
+        """
+        Recomputes the top targets per window and type if anything changed.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            top = {
+                (window, target_type): heapq.nlargest(self.top_n, sums.items(), key=lambda item: item[1])
+                for window, by_type in self._sums.items()
+                for target_type, sums in by_type.items()
+            }
+            self._dirty = False
+        self._top = top
+
+    # ----------------------------
+    # Tailing the events table
+    # ----------------------------
+    def poll(self) -> int:
+        """
+        Reads events committed since the last poll (including ids that were
+        skipped earlier and have committed since), then refreshes the top
+        lists. Returns the number of events read.
+        """
+        started = time.perf_counter()
+        try:
+            db = self._new_session()
+            try:
+                rows = self._tail.read(db)
+            finally:
+                db.close()
+        except Exception:
+            LOG.exception("trending poll failed")
+            self._counters["failed_polls"] += 1
+            return 0
+
+        self.ingest(rows)
+        self.refresh_top()
+        self._counters["polls"] += 1
+        self._counters["last_poll_ms"] = (time.perf_counter() - started) * 1000
+        return len(rows)
+
+    # ----------------------------
+    # Startup rebuild
+    # ----------------------------
+    def rebuild(self, now: Optional[datetime] = None) -> None:
+        """
+        Fills the rings from history: hour buckets for the last week from the
+        hourly rollups (or raw events), minute buckets for the last hour from
+        raw events. The tail starts at the highest event id seen beforehand,
+        so events committed while rebuilding may be counted twice.
+        """
+        from app.services.events.event_reader import EventReader
+        from app.services.events.rollup_service import RollupService
+
+        started = time.perf_counter()
+        now = now or datetime.utcnow()
+        minute_now = _minute(now)
+        hour_start = EPOCH + timedelta(hours=minute_now // 60 - HOUR_SLOTS + 1)
+        minute_start = EPOCH + timedelta(minutes=minute_now - MINUTE_SLOTS + 1)
+
+        db = self._new_session()
+        try:
+            high_water = db.query(Event.id).order_by(Event.id.desc()).limit(1).scalar() or 0
+
+            hours: List[Tuple[str, int, str, datetime, int]] = []
+            rollups = RollupService(db)
+            reader = EventReader(db)
+            for target_type in TRENDING_TARGET_TYPES:
+                counts = rollups.fetch_counts(target_type, None, hour_start, now, by_time=True)
+                if counts is None:
+                    rows = reader.iter_events(
+                        target_type=target_type,
+                        start_date=hour_start,
+                        end_date=now,
+                        columns=("target_id", "event_type", "created_at", "sample_weight")
+                    )
+                    counts = rows
+                hours.extend((target_type, tid, event_type, ts, count) for tid, event_type, ts, count in counts)
+
+            minutes = list(reader.iter_events(
+                start_date=minute_start,
+                end_date=now,
+                columns=("target_type", "target_id", "event_type", "created_at", "sample_weight")
+            ))
+        finally:
+            db.close()
+
+        with self._lock:
+            self._minute_now = None
+            self._reset_minutes()
+            self._reset_hours()
+            self._deleted.clear()
+            self._advance(minute_now)
+
+            # Hour and minute rings load separately; deletions apply after both
+            deleted = []
+            for target_type, target_id, event_type, ts, count in hours:
+                if event_type.endswith("_deleted"):
+                    deleted.append((target_type, target_id))
+                else:
+                    self._add_hour(target_type, target_id, event_type, ts, count)
+            for target_type, target_id, event_type, ts, count in minutes:
+                if event_type.endswith("_deleted"):
+                    deleted.append((target_type, target_id))
+                else:
+                    self._add_minute(target_type, target_id, event_type, ts, count)
+            for key in deleted:
+                if key[0] in TRENDING_TARGET_TYPES:
+                    self._drop(key)
+
+            self._tail.reset(high_water)
+        self.refresh_top()
+        self._ready = True
+        self._counters["rebuild_ms"] = (time.perf_counter() - started) * 1000
+        LOG.info("trending engine rebuilt in %.0f ms", self._counters["rebuild_ms"])
+
+    def _add_hour(self, target_type: str, target_id: int, event_type: str, ts: datetime, count: int) -> None:
+        weight = self.weights.get(event_type)
+        if not weight or target_type not in TRENDING_TARGET_TYPES:
+            return
+        hour = min(_minute(ts) // 60, self._hour_now)
+        if hour <= self._hour_now - HOUR_SLOTS:
+            return
+        value = weight * count
+        self._hours[hour % HOUR_SLOTS][(target_type, target_id)] += value
+        _bump(self._sums["7d"][target_type], target_id, value)
+        if hour > self._hour_now - 24:
+            _bump(self._sums["24h"][target_type], target_id, value)
+        self._dirty = True
+
+    def _add_minute(self, target_type: str, target_id: int, event_type: str, ts: datetime, count: int = 1) -> None:
+        weight = self.weights.get(event_type)
+        if not weight or target_type not in TRENDING_TARGET_TYPES:
+            return
+        minute = min(_minute(ts), self._minute_now)
+        if minute <= self._minute_now - MINUTE_SLOTS:
+            return
+        value = weight * count
+        self._minutes[minute % MINUTE_SLOTS][(target_type, target_id)] += value
+        _bump(self._sums["1h"][target_type], target_id, value)
+        self._dirty = True
+
+    def _new_session(self):
+        if self._session_factory is None:
+            from app.db.database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    # ----------------------------
+    # Metrics
+    # ----------------------------
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            c = dict(self._counters)
+            c["tracked_targets"] = {window: sum(len(s) for s in by_type.values()) for window, by_type in self._sums.items()}
+            c["pending_gaps"] = self._tail.pending_gaps
+            c["high_water"] = self._tail.high_water
+            c["gaps_filled"] = self._tail.gaps_filled
+            c["gaps_expired"] = self._tail.gaps_expired
+        c["ready"] = self._ready
+        c["running"] = self._running
+        return c
+
+
+
+class SketchWindow:
+    """
+    One sliding window for the sketch backend: a ring of HeavyHitters
+    buckets plus running Count-Min sketches of the whole window. Expiring a
+    bucket subtracts its sketches from the running ones; candidates come
+    from the buckets' Space-Saving summaries merged at read time.
+    """
+
+    def __init__(self, span_minutes: int, bucket_minutes: int, capacity: int, epsilon: float, delta: float):
+        self.bucket_minutes = bucket_minutes
+        self.slots = span_minutes // bucket_minutes
+        self.capacity = capacity
+        self.epsilon = epsilon
+        self.delta = delta
+        self.positive = CountMinSketch(epsilon, delta)
+        self.negative = CountMinSketch(epsilon, delta)
+        # allocated on first write, so idle buckets hold no sketch memory
+        self.buckets: List[Optional[HeavyHitters]] = [None] * self.slots
+        self.bucket_now: Optional[int] = None
+
+    def add(self, key: Tuple[str, int], value: float, minute: int, indexes: List[int]) -> None:
+        bucket_no = min(minute // self.bucket_minutes, self.bucket_now)
+        if bucket_no <= self.bucket_now - self.slots:
+            return
+        slot = bucket_no % self.slots
+        bucket = self.buckets[slot]
+        if bucket is None:
+            bucket = self.buckets[slot] = HeavyHitters(self.capacity, self.epsilon, self.delta)
+        bucket.add(key, value, group=key[0], indexes=indexes)
+        if value > 0:
+            self.positive.add(key, value, indexes)
+        elif value < 0:
+            self.negative.add(key, -value, indexes)
+
+    def advance(self, minute_now: int) -> None:
+        bucket_now = minute_now // self.bucket_minutes
+        if self.bucket_now is not None and bucket_now - self.bucket_now >= self.slots:
+            self.reset()
+        elif self.bucket_now is not None:
+            for bucket_no in range(self.bucket_now + 1, bucket_now + 1):
+                slot = bucket_no % self.slots
+                bucket = self.buckets[slot]
+                if bucket is not None:
+                    self.positive.subtract(bucket.positive)
+                    self.negative.subtract(bucket.negative)
+                    self.buckets[slot] = None
+        self.bucket_now = bucket_now
+
+    def reset(self) -> None:
+        self.buckets = [None] * self.slots
+        self.positive.clear()
+        self.negative.clear()
+
+    def discard(self, key: Tuple[str, int]) -> None:
+        for bucket in self.buckets:
+            if bucket is not None:
+                bucket.discard(key, group=key[0])
+
+    def top(self, target_type: str, n: int, exclude: Iterable[Tuple[str, int]]) -> List[Tuple[int, float]]:
+        merged = SpaceSaving.merged(
+            [b.summaries.get(target_type) for b in self.buckets if b is not None], self.capacity
+        )
+        excluded = set(exclude)
+        scored = []
+        for key in merged.counts:
+            if key in excluded:
+                continue
+            indexes = self.positive.indexes(key)
+            scored.append((key[1], self.positive.estimate(key, indexes) - self.negative.estimate(key, indexes)))
+        return heapq.nlargest(n, scored, key=lambda item: item[1])
+
+    def merge(self, other: "SketchWindow") -> None:
+        """
+        Folds in the same window from another worker; both must have been
+        advanced to the same time.
+        """
+        if other.bucket_now != self.bucket_now:
+            raise ValueError("windows are at different times")
+        for slot, theirs in enumerate(other.buckets):
+            if theirs is None:
+                continue
+            if self.buckets[slot] is None:
+                self.buckets[slot] = HeavyHitters(self.capacity, self.epsilon, self.delta)
+            self.buckets[slot].merge(theirs)
+        self.positive.merge(other.positive)
+        self.negative.merge(other.negative)
+
+    @property
+    def nbytes(self) -> int:
+        held = self.positive.nbytes + self.negative.nbytes
+        return held + sum(b.nbytes for b in self.buckets if b is not None)
+
+
+class SketchTrendingEngine(TrendingEngine):
+    """
+    Trending engine whose memory doesn't grow with the number of targets:
+    each window keeps Count-Min sketches and Space-Saving summaries
+    (SketchWindow) instead of an exact sum per target. Scores overestimate
+    positive weight by at most epsilon times the window's total with
+    probability 1 - delta; any target holding more than 1/capacity of a
+    bucket's positive weight is a candidate. Feeding, expiry and the
+    startup rebuild are the exact engine's.
+    """
+
+    def __init__(
+        self,
+        *args,
+        capacity: int = settings.TRENDING_SKETCH_CAPACITY,
+        epsilon: float = settings.TRENDING_SKETCH_EPSILON,
+        delta: float = settings.TRENDING_SKETCH_DELTA,
+        **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        self._windows: Dict[str, SketchWindow] = {
+            window: SketchWindow(span, width, capacity, epsilon, delta)
+            for window, (span, width) in SKETCH_BUCKETS.items()
+        }
+        # an event reaches _add_minute and _add_hour back to back; hash once
+        self._last_hashed: Tuple[Optional[Tuple[str, int]], List[int]] = (None, [])
+
+    def _add_hour(self, target_type: str, target_id: int, event_type: str, ts: datetime, count: int) -> None:
+        self._add_to(("24h", "7d"), target_type, target_id, event_type, ts, count)
+
+    def _add_minute(self, target_type: str, target_id: int, event_type: str, ts: datetime, count: int = 1) -> None:
+        self._add_to(("1h",), target_type, target_id, event_type, ts, count)
+
+    def _add_to(self, windows, target_type, target_id, event_type, ts, count) -> None:
+        weight = self.weights.get(event_type)
+        if not weight or target_type not in TRENDING_TARGET_TYPES:
+            return
+        key = (target_type, target_id)
+        minute = min(_minute(ts), self._minute_now)
+        last_key, indexes = self._last_hashed
+        if last_key != key:
+            indexes = self._windows[windows[0]].positive.indexes(key)
+            self._last_hashed = (key, indexes)
+        for window in windows:
+            self._windows[window].add(key, weight * count, minute, indexes)
+        self._dirty = True
+
+    def _drop(self, key: Tuple[str, int]) -> None:
+        self._deleted[key] = self._hour_now
+        for window in self._windows.values():
+            window.discard(key)
+        self._dirty = True
+
+    def _advance(self, minute_now: int) -> None:
+        if self._minute_now is not None and minute_now <= self._minute_now:
+            return
+        for window in self._windows.values():
+            window.advance(minute_now)
+        hour_now = minute_now // 60
+        if self._hour_now is not None and hour_now != self._hour_now:
+            cutoff = hour_now - HOUR_SLOTS
+            self._deleted = {key: hour for key, hour in self._deleted.items() if hour > cutoff}
+        self._minute_now, self._hour_now = minute_now, hour_now
+        self._dirty = True
+
+    def _reset_minutes(self) -> None:
+        self._windows["1h"].reset()
+        self._dirty = True
+
+    def _reset_hours(self) -> None:
+        self._windows["24h"].reset()
+        self._windows["7d"].reset()
+        self._dirty = True
+
+    def refresh_top(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            top = {
+                (window, target_type): sketch.top(target_type, self.top_n, self._deleted)
+                for window, sketch in self._windows.items()
+                for target_type in TRENDING_TARGET_TYPES
+            }
+            self._dirty = False
+        self._top = top
+
+    def stats(self) -> Dict[str, Any]:
+        c = super().stats()
+        c.pop("tracked_targets", None)
+        with self._lock:
+            c["sketch_bytes"] = {window: sketch.nbytes for window, sketch in self._windows.items()}
+        return c
+
+
+# Shared per-process engine, started/stopped by app.main
+trending_engine = SketchTrendingEngine() if settings.TRENDING_BACKEND == "sketch" else TrendingEngine()
@@ -1,7 +1,11 @@
 # app/services/feeds/trending_service.py
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
+from app.core.config import settings
 from app.services.events.event_aggregator import EventAggregator
+from app.services.feeds import hot_score
+from app.services.feeds.recent_index import recent_index
+from app.services.feeds.trending_engine import WINDOWS, trending_engine
 
 class TrendingService:
     """
@@ -19,14 +23,27 @@ class TrendingService:
         top_n: int = 10,
         last_days: int = 7,
         decay_hours: int = 72,
-        filters: Optional[Dict] = None
+        filters: Optional[Dict] = None,
+        window: Optional[str] = None
     ) -> List[Dict]:
         """
         Returns top N trending items of a given type.
+        With `window` ("1h", "24h" or "7d") items are ranked by undecayed
+        weighted event count over that window, served from the in-memory
+        trending engine when it is ready and no filters are given. Without
+        a window, recent question candidates come from the recent-question
+        index.
         """
         from app.models import question, answer, comment
 
-        start_date = datetime.utcnow() - timedelta(days=last_days)
+        if window is not None:
+            if window not in WINDOWS:
+                raise ValueError(f"unknown trending window {window!r}")
+            if not filters and trending_engine.ready and top_n <= trending_engine.top_n:
+                return trending_engine.get_trending(target_type, window, top_n)
+            start_date = datetime.utcnow() - WINDOWS[window]
+        else:
+            start_date = datetime.utcnow() - timedelta(days=last_days)
 
         # Fetch all relevant targets
         model_map = {"question": question.Question, "answer": answer.Answer, "comment": comment.Comment}
@@ -34,22 +51,63 @@ class TrendingService:
         if not Model:
             return []
 
-        query = self.db.query(Model).filter(Model.deleted_at.is_(None), Model.created_at >= start_date)
+        query = self.db.query(Model.id).filter(Model.is_deleted.isnot(True))
+        # Windowed counts include older targets, as the engine does
+        if window is None:
+            query = query.filter(Model.created_at >= start_date)
         if filters:
             for attr, val in filters.items():
                 query = query.filter(getattr(Model, attr) == val)
 
-        targets = query.all()
-        target_ids = [t.id for t in targets]
+        # Persisted hot score: ORDER BY hot_score LIMIT n over its index.
+        # Events can't predate their target, so the window is implied by created_at.
+        if window is None and decay_hours == settings.HOT_SCORE_HALF_LIFE_HOURS:
+            rows = hot_score.order_by_hot(
+                query.add_columns(Model.hot_pos_log, Model.hot_neg_log).filter(Model.hot_score.isnot(None)),
+                Model
+            ).limit(top_n).all()
+            now = datetime.utcnow()
+            return [{"target_id": tid, "score": hot_score.current_score(pos, neg, now)} for tid, pos, neg in rows]
 
-        # Compute scores using EventAggregator
+        # Recent questions come from the resident index rather than a scan
+        owner_id = (filters or {}).get("user_id")
+        if target_type == "question" and window is None and recent_index.covers(start_date) \
+                and (not filters or (set(filters) == {"user_id"} and owner_id is not None)):
+            target_ids = recent_index.ids_since(start_date, owner_id=owner_id)
+        else:
+            target_ids = [row.id for row in query.all()]
+
+        # Compute scores using EventAggregator (served from rollups when covered)
         scores = self.event_aggregator.aggregate_scores(
             target_type=target_type,
             target_ids=target_ids,
             start_date=start_date,
             decay_hours=decay_hours
-        )
+        ) if window is None else self._window_scores(target_type, target_ids, start_date)
 
         # Sort and return top N
         top_items = sorted(scores.items(), key=lambda x: x[1], reverse=True)[:top_n]
         return [{"target_id": tid, "score": score} for tid, score in top_items]
+
+    def _window_scores(self, target_type: str, target_ids: List[int], start_date: datetime) -> Dict[int, float]:
+        """
+        Undecayed weighted event counts since start_date, matching what the
+        trending engine keeps for its windows.
+        """
+        weights = self.event_aggregator.DEFAULT_WEIGHTS
+        if not target_ids:
+            return {}
+        rows = self.event_aggregator.rollups.fetch_counts(target_type, target_ids, start_date)
+        if rows is None:
+            events = self.event_aggregator.reader.iter_events(
+                target_type=target_type,
+                target_ids=target_ids,
+                start_date=start_date,
+                columns=("target_id", "event_type", "sample_weight")
+            )
+            rows = ((tid, event_type, None, count) for tid, event_type, count in events)
+
+        scores: Dict[int, float] = {}
+        for target_id, event_type, _, count in rows:
+            scores[target_id] = scores.get(target_id, 0.0) + weights.get(event_type, 0.0) * count
+        return scores
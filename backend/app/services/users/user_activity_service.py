@@ -1,10 +1,12 @@
 # app/services/users/user_activity_service.py
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from app.models.event import Event
 from app.events.event_types import EventTypes
 from app.services.events.event_aggregator import EventAggregator
+from app.services.events.rollup_service import ACTOR_SCOPE
 
 class UserActivityService:
     """
@@ -48,10 +50,19 @@ class UserActivityService:
         Returns activity counts for the last N days.
         """
         start_date = datetime.utcnow() - timedelta(days=last_days)
-        events = self.get_user_events(user_id=user_id, start_date=start_date)
 
+        rolled = self.event_aggregator.rollups.fetch_counts(ACTOR_SCOPE, [user_id], start_date=start_date)
+        if rolled is not None:
+            return self._summarize((event_type, count) for _, event_type, _, count in rolled)
+
+        events = self.event_aggregator.reader.iter_events(
+            actor_id=user_id, start_date=start_date, columns=("event_type", "sample_weight")
+        )
+        return self._summarize(events)
+
+    def _summarize(self, counts) -> Dict[str, int]:
         summary = {
-            "total_events": len(events),
+            "total_events": 0,
             "questions_created": 0,
             "answers_created": 0,
             "comments_created": 0,
@@ -61,22 +72,27 @@ class UserActivityService:
             "shares": 0
         }
 
-        for e in events:
-            if e.event_type in [EventTypes.QUESTION_CREATED, EventTypes.ANSWER_CREATED, EventTypes.COMMENT_CREATED]:
-                if e.event_type == EventTypes.QUESTION_CREATED:
-                    summary["questions_created"] += 1
-                elif e.event_type == EventTypes.ANSWER_CREATED:
-                    summary["answers_created"] += 1
-                elif e.event_type == EventTypes.COMMENT_CREATED:
-                    summary["comments_created"] += 1
-            elif e.event_type in [EventTypes.QUESTION_LIKED, EventTypes.ANSWER_LIKED, EventTypes.COMMENT_LIKED]:
-                summary["likes"] += 1
-            elif e.event_type in [EventTypes.QUESTION_DISLIKED, EventTypes.ANSWER_DISLIKED, EventTypes.COMMENT_DISLIKED]:
-                summary["dislikes"] += 1
-            elif e.event_type in [EventTypes.QUESTION_REPORTED, EventTypes.ANSWER_REPORTED, EventTypes.COMMENT_REPORTED]:
-                summary["reports"] += 1
-            elif e.event_type in [EventTypes.QUESTION_SHARED, EventTypes.ANSWER_SHARED, EventTypes.COMMENT_SHARED]:
-                summary["shares"] += 1
+        for event_type, n in counts:
+            summary["total_events"] += n
+            if event_type in [EventTypes.QUESTION_CREATED, EventTypes.ANSWER_CREATED, EventTypes.COMMENT_CREATED]:
+                if event_type == EventTypes.QUESTION_CREATED:
+                    summary["questions_created"] += n
+                elif event_type == EventTypes.ANSWER_CREATED:
+                    summary["answers_created"] += n
+                elif event_type == EventTypes.COMMENT_CREATED:
+                    summary["comments_created"] += n
+            elif event_type in [EventTypes.QUESTION_LIKED, EventTypes.ANSWER_LIKED, EventTypes.COMMENT_LIKED]:
+                summary["likes"] += n
+            elif event_type in [EventTypes.QUESTION_DISLIKED, EventTypes.ANSWER_DISLIKED, EventTypes.COMMENT_DISLIKED]:
+                summary["dislikes"] += n
+            elif event_type in [EventTypes.QUESTION_UNLIKED, EventTypes.ANSWER_UNLIKED, EventTypes.COMMENT_UNLIKED]:
+                summary["likes"] -= n
+            elif event_type in [EventTypes.QUESTION_UNDISLIKED, EventTypes.ANSWER_UNDISLIKED, EventTypes.COMMENT_UNDISLIKED]:
+                summary["dislikes"] -= n
+            elif event_type in [EventTypes.QUESTION_REPORTED, EventTypes.ANSWER_REPORTED, EventTypes.COMMENT_REPORTED]:
+                summary["reports"] += n
+            elif event_type in [EventTypes.QUESTION_SHARED, EventTypes.ANSWER_SHARED, EventTypes.COMMENT_SHARED]:
+                summary["shares"] += n
 
         return summary
 
@@ -87,7 +103,4 @@ class UserActivityService:
         """
         Returns the timestamp of the most recent user event.
         """
-        events = self.get_user_events(user_id=user_id)
-        if not events:
-            return None
-        return max(e.created_at for e in events)
+        return self.db.query(func.max(Event.created_at)).filter(Event.actor_id == user_id).scalar()
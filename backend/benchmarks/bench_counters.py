@@ -0,0 +1,145 @@
+# benchmarks/bench_counters.py
+"""
+Hot-row contention: N concurrent users toggling a like on the same answer.
+
+Usage (from backend/, against the database in DATABASE_URL):
+    DATABASE_URL=sqlite:////tmp/bench_counters.db python -m benchmarks.bench_counters
+    DATABASE_URL=postgresql://... python -m benchmarks.bench_counters --likers 200 --rounds 5
+
+Modes:
+  direct        ReactionService updating answers.likes_count in every toggle
+  write_behind  ReactionService with the CounterBuffer running (one UPDATE per
+                flush interval for the hot row)
+
+Creates the tables it needs and uses answer/question ids well above normal
+ranges (--answer-id); rows it creates are removed afterwards. Reports toggles/s,
+latency percentiles and checks that likes_count matches the like reactions.
+"""
+import argparse
+import statistics
+import threading
+import time
+
+from sqlalchemy import func, select
+
+from app.db.database import Base, SessionLocal, engine
+from app.models.user import User
+from app.models.question import Question
+from app.models.answer import Answer
+from app.models.reaction import Reaction
+from app.services.content.counter_buffer import CounterBuffer
+from app.services.content.reaction_service import ReactionService, LIKE
+
+TABLES = [User.__table__, Question.__table__, Answer.__table__, Reaction.__table__]
+REACTIONS = Reaction.__table__
+
+
+def reset(answer_id: int, question_id: int) -> None:
+    with engine.begin() as conn:
+        conn.execute(REACTIONS.delete().where(REACTIONS.c.target_type == "answer", REACTIONS.c.target_id == answer_id))
+        conn.execute(Answer.__table__.delete().where(Answer.__table__.c.id == answer_id))
+        conn.execute(Question.__table__.delete().where(Question.__table__.c.id == question_id))
+        conn.execute(Question.__table__.insert().values(id=question_id, title="bench", content_version=0))
+        conn.execute(Answer.__table__.insert().values(
+            id=answer_id, question_id=question_id, content="bench", likes_count=0, dislikes_count=0, is_deleted=False
+        ))
+
+
+def cleanup(answer_id: int, question_id: int) -> None:
+    with engine.begin() as conn:
+        conn.execute(REACTIONS.delete().where(REACTIONS.c.target_type == "answer", REACTIONS.c.target_id == answer_id))
+        conn.execute(Answer.__table__.delete().where(Answer.__table__.c.id == answer_id))
+        conn.execute(Question.__table__.delete().where(Question.__table__.c.id == question_id))
+
+
+def run(mode: str, likers: int, rounds: int, answer_id: int, question_id: int, user_base: int):
+    reset(answer_id, question_id)
+    counters = CounterBuffer(session_factory=SessionLocal, flush_interval=0.5)
+    if mode == "write_behind":
+        counters.start()
+
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(likers)
+
+    def liker(user_id: int):
+        db = SessionLocal()
+        service = ReactionService(db, counters=counters)
+        local = []
+        try:
+            barrier.wait()
+            for _ in range(rounds):
+                started = time.perf_counter()
+                try:
+                    service.toggle("answer", answer_id, user_id, LIKE)
+                except Exception as exc:  # lock timeouts etc. are part of the result
+                    with lock:
+                        errors.append(type(exc).__name__)
+                    continue
+                local.append(time.perf_counter() - started)
+        finally:
+            db.close()
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=liker, args=(user_base + i,)) for i in range(likers)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    counters.stop()
+
+    with engine.connect() as conn:
+        stored = conn.execute(select(Answer.__table__.c.likes_count).where(Answer.__table__.c.id == answer_id)).scalar()
+        actual = conn.execute(
+            select(func.count()).select_from(REACTIONS)
+            .where(REACTIONS.c.target_type == "answer", REACTIONS.c.target_id == answer_id, REACTIONS.c.kind == LIKE)
+        ).scalar()
+
+    latencies.sort()
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000 if latencies else float("nan")
+
+    return {
+        "mode": mode,
+        "toggles": len(latencies),
+        "seconds": elapsed,
+        "toggles_per_s": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": pct(0.50),
+        "p99_ms": pct(0.99),
+        "mean_ms": statistics.mean(latencies) * 1000 if latencies else float("nan"),
+        "errors": len(errors),
+        "consistent": stored == actual,
+        "likes_count": stored,
+        "like_reactions": actual,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--likers", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=5, help="toggles per liker")
+    parser.add_argument("--answer-id", type=int, default=900_000_001)
+    parser.add_argument("--question-id", type=int, default=900_000_001)
+    parser.add_argument("--user-base", type=int, default=900_000_000)
+    parser.add_argument("--modes", nargs="+", default=["direct", "write_behind"])
+    args = parser.parse_args()
+
+    Base.metadata.create_all(engine, tables=TABLES)
+    print(f"{engine.dialect.name}: {args.likers} likers x {args.rounds} toggles on one answer")
+    print(f"{'mode':>13} {'toggles/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7} {'consistent':>11}")
+    try:
+        for mode in args.modes:
+            r = run(mode, args.likers, args.rounds, args.answer_id, args.question_id, args.user_base)
+            print(f"{r['mode']:>13} {r['toggles_per_s']:>10.0f} {r['p50_ms']:>8.1f} {r['p99_ms']:>8.1f} "
+                  f"{r['errors']:>7} {str(r['consistent']):>11}")
+    finally:
+        cleanup(args.answer_id, args.question_id)
+
+
+if __name__ == "__main__":
+    main()
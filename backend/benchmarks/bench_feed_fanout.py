@@ -0,0 +1,149 @@
+# benchmarks/bench_feed_fanout.py
+"""
+Feed inboxes: fan-out-on-write cost and feed read latency vs follower count.
+
+Usage (from backend/, against the database in DATABASE_URL):
+    DATABASE_URL=sqlite:////tmp/bench_feed.db python -m benchmarks.bench_feed_fanout
+    DATABASE_URL=postgresql://... python -m benchmarks.bench_feed_fanout --followers 100 10000 100000 --authors 10
+
+For each follower count F, --authors authors are each followed by the same
+F users and post --questions questions each. Reports:
+  fanout ms     time to push one question into F inboxes (FeedInboxService.fan_out)
+  push p50/p95  FeedBuilder.build_user_feed latency for a follower reading
+                from their inbox
+  pull p50/p95  the same feed when every author is served by pull at read
+                time (what followers of authors over FEED_FANOUT_MAX_FOLLOWERS get)
+plus the candidate stage alone for both. Rows live above --id-base and are
+removed afterwards.
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from app.db.database import Base, SessionLocal, engine
+from app.models.user import User
+from app.models.question import Question
+from app.models.answer import Answer
+from app.models.event import Event
+from app.models.engagement_rollup import EngagementRollup
+from app.models.engagement_rollup_state import EngagementRollupState
+from app.models.user_follow import UserFollow
+from app.models.feed_inbox import FeedInboxEntry
+from app.services.feeds.feed_builder import FeedBuilder
+from app.services.feeds.feed_inbox import FeedInboxService
+
+TABLES = [
+    User.__table__, Question.__table__, Answer.__table__, Event.__table__,
+    EngagementRollup.__table__, EngagementRollupState.__table__,
+    UserFollow.__table__, FeedInboxEntry.__table__,
+]
+
+
+def cleanup(id_base: int) -> None:
+    with engine.begin() as conn:
+        conn.execute(FeedInboxEntry.__table__.delete().where(FeedInboxEntry.__table__.c.user_id >= id_base))
+        conn.execute(UserFollow.__table__.delete().where(UserFollow.__table__.c.followee_id >= id_base))
+        conn.execute(Question.__table__.delete().where(Question.__table__.c.id >= id_base))
+        conn.execute(User.__table__.delete().where(User.__table__.c.id >= id_base))
+
+
+def setup(followers: int, authors: int, id_base: int):
+    """Users id_base.. follow authors placed right after them."""
+    follower_ids = list(range(id_base, id_base + followers))
+    author_ids = list(range(id_base + followers, id_base + followers + authors))
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [
+            {"id": uid, "username": f"bench{uid}", "email": f"bench{uid}@example.com", "followers_count": 0}
+            for uid in follower_ids + author_ids
+        ])
+        for author_id in author_ids:
+            for offset in range(0, followers, 10000):
+                conn.execute(UserFollow.__table__.insert(), [
+                    {"follower_id": fid, "followee_id": author_id}
+                    for fid in follower_ids[offset:offset + 10000]
+                ])
+            conn.execute(
+                User.__table__.update().where(User.__table__.c.id == author_id).values(followers_count=followers)
+            )
+    return follower_ids, author_ids
+
+
+def post_and_fan_out(author_ids, questions: int, id_base: int):
+    """Creates the questions and fans each out; returns per-question ms."""
+    db = SessionLocal()
+    service = FeedInboxService(db, max_followers=10 ** 12)
+    timings = []
+    now = datetime.utcnow()
+    qid = id_base
+    try:
+        for n in range(questions):
+            for author_id in author_ids:
+                created_at = now - timedelta(minutes=n * len(author_ids) + author_id % 1000)
+                db.execute(Question.__table__.insert(), [{
+                    "id": qid, "title": f"bench {qid}", "content": "", "user_id": author_id,
+                    "created_at": created_at, "content_version": 0,
+                }])
+                started = time.perf_counter()
+                service.fan_out(qid, author_id, created_at)
+                db.commit()
+                timings.append((time.perf_counter() - started) * 1000)
+                qid += 1
+    finally:
+        db.close()
+    return timings
+
+
+def read_latency(reader_id: int, reads: int, max_followers: int, limit: int):
+    db = SessionLocal()
+    builder = FeedBuilder(db)
+    builder.inbox.max_followers = max_followers
+    total, candidates = [], []
+    try:
+        builder.build_user_feed(reader_id, limit=limit, include_answers=False)  # warm up
+        for _ in range(reads):
+            started = time.perf_counter()
+            builder.build_user_feed(reader_id, limit=limit, include_answers=False)
+            total.append((time.perf_counter() - started) * 1000)
+            candidates.append(builder.last_timings["candidates"])
+    finally:
+        db.close()
+    return total, candidates
+
+
+def pct(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p * len(values)))] if values else float("nan")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--followers", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--authors", type=int, default=5)
+    parser.add_argument("--questions", type=int, default=10, help="questions per author")
+    parser.add_argument("--reads", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--id-base", type=int, default=900_000_000)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(engine, tables=TABLES)
+    print(f"{engine.dialect.name}: {args.authors} authors x {args.questions} questions, feed of {args.limit}")
+    print(f"{'followers':>9} {'fanout ms':>10} {'push p50':>9} {'push p95':>9} {'pull p50':>9} {'pull p95':>9}"
+          f" {'cand push':>10} {'cand pull':>10}")
+    try:
+        for followers in args.followers:
+            cleanup(args.id_base)
+            follower_ids, author_ids = setup(followers, args.authors, args.id_base)
+            fanout = post_and_fan_out(author_ids, args.questions, args.id_base)
+            reader = follower_ids[len(follower_ids) // 2]
+            push, push_cand = read_latency(reader, args.reads, 10 ** 12, args.limit)
+            pull, pull_cand = read_latency(reader, args.reads, -1, args.limit)
+            print(f"{followers:>9} {statistics.mean(fanout):>10.1f} {pct(push, .5):>9.2f} {pct(push, .95):>9.2f}"
+                  f" {pct(pull, .5):>9.2f} {pct(pull, .95):>9.2f}"
+                  f" {statistics.median(push_cand):>10.2f} {statistics.median(pull_cand):>10.2f}")
+    finally:
+        cleanup(args.id_base)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# benchmarks/bench_pagination.py
+"""
+Deep-page cost: OFFSET pages vs keyset cursors over one question's answers.
+
+Usage (from backend/, against the database in DATABASE_URL):
+    DATABASE_URL=sqlite:////tmp/bench_pagination.db python -m benchmarks.bench_pagination
+    DATABASE_URL=postgresql://... python -m benchmarks.bench_pagination --answers 10000 --pages 1 100 500
+
+Inserts --answers answers under a question id well above normal ranges
+(--question-id) and removes them afterwards. For each requested page,
+reports the median time to fetch it with OFFSET and with the cursor the
+previous page returned (cursors are collected by walking the pages first).
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from app.core.pagination import paginate
+from app.db.database import Base, SessionLocal, engine
+from app.models.user import User
+from app.models.question import Question
+from app.models.answer import Answer
+
+TABLES = [User.__table__, Question.__table__, Answer.__table__]
+
+
+def seed(question_id: int, n: int) -> None:
+    answers = Answer.__table__
+    t0 = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(answers.delete().where(answers.c.question_id == question_id))
+        conn.execute(Question.__table__.delete().where(Question.__table__.c.id == question_id))
+        conn.execute(Question.__table__.insert().values(id=question_id, title="bench", answers_count=n))
+        rows = [
+            # a few answers share each second, like bursts of real traffic
+            {"question_id": question_id, "content": "bench", "created_at": t0 + timedelta(seconds=i // 3)}
+            for i in range(n)
+        ]
+        for offset in range(0, n, 5000):
+            conn.execute(answers.insert(), rows[offset:offset + 5000])
+
+
+def cleanup(question_id: int) -> None:
+    with engine.begin() as conn:
+        conn.execute(Answer.__table__.delete().where(Answer.__table__.c.question_id == question_id))
+        conn.execute(Question.__table__.delete().where(Question.__table__.c.id == question_id))
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--answers", type=int, default=10000)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 100, 500])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--question-id", type=int, default=900_000_001)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(engine, tables=TABLES)
+    seed(args.question_id, args.answers)
+    db = SessionLocal()
+    try:
+        query = db.query(Answer).filter(Answer.question_id == args.question_id)
+
+        # Walk once to collect the cursor that leads to each page
+        cursors = {1: None}
+        cursor = None
+        for page in range(1, max(args.pages)):
+            _, cursor = paginate(query, Answer.created_at, Answer.id, args.page_size, cursor=cursor)
+            if cursor is None:
+                break
+            cursors[page + 1] = cursor
+
+        print(f"{engine.dialect.name}: {args.answers} answers, page size {args.page_size}")
+        print(f"{'page':>6} {'offset ms':>10} {'cursor ms':>10}")
+        for page in args.pages:
+            if page not in cursors:
+                print(f"{page:>6} {'(past the end)':>21}")
+                continue
+            by_offset = timed(lambda: paginate(query, Answer.created_at, Answer.id, args.page_size, page=page), args.repeat)
+            by_cursor = timed(
+                lambda: paginate(query, Answer.created_at, Answer.id, args.page_size, cursor=cursors[page]), args.repeat
+            )
+            print(f"{page:>6} {by_offset:>10.2f} {by_cursor:>10.2f}")
+    finally:
+        db.close()
+        cleanup(args.question_id)
+
+
+if __name__ == "__main__":
+    main()
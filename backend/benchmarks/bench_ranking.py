@@ -0,0 +1,93 @@
+# benchmarks/bench_ranking.py
+"""
+Feed ranking throughput: full sort vs vectorized top-k.
+
+Usage (from backend/):
+    python -m benchmarks.bench_ranking
+    python -m benchmarks.bench_ranking --sizes 10000 100000 --k 50 --skip-full-sort-above 200000
+
+Reports candidates/second for:
+  full_sort      FeedRankingEngine.rank_items (per-item lambda + sorted)
+  top_k_dicts    FeedRankingEngine.rank_top_k (packs dicts into arrays, argpartition)
+  top_k_arrays   FeedRankingEngine.score_arrays + top_k_indices on pre-packed arrays
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app.services.feeds.ranking_engine import FeedRankingEngine, _EPOCH
+
+
+def make_items(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    return [
+        {
+            "id": i,
+            "created_at": now - timedelta(hours=rng.uniform(0, 24 * 30)),
+            "engagement_metrics": {
+                "likes_events": rng.randint(0, 500),
+                "dislikes_events": rng.randint(0, 50),
+                "shares_events": rng.randint(0, 40),
+                "reports_events": rng.randint(0, 5),
+                "comments_events": rng.randint(0, 120),
+            },
+        }
+        for i in range(n)
+    ]
+
+
+def timed(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--skip-full-sort-above", type=int, default=None)
+    args = parser.parse_args()
+
+    weights = FeedRankingEngine.DEFAULT_WEIGHTS
+    keys = list(weights)
+    print(f"{'candidates':>10} {'mode':>13} {'seconds':>9} {'cand/s':>12}")
+
+    for n in args.sizes:
+        items = make_items(n)
+
+        now = datetime.utcnow()
+        metrics = np.array([[it["engagement_metrics"][key] for key in keys] for it in items], dtype=np.float64)
+        created = np.array([(it["created_at"] - _EPOCH).total_seconds() for it in items], dtype=np.float64)
+        now_s = (now - _EPOCH).total_seconds()
+        w = [weights[key] for key in keys]
+
+        modes = {
+            "full_sort": lambda: FeedRankingEngine.rank_items(items)[:args.k],
+            "top_k_dicts": lambda: FeedRankingEngine.rank_top_k(items, args.k),
+            "top_k_arrays": lambda: FeedRankingEngine.top_k_indices(
+                FeedRankingEngine.score_arrays(metrics, created, w, 72, now_s), args.k
+            ),
+        }
+        if args.skip_full_sort_above and n > args.skip_full_sort_above:
+            modes.pop("full_sort")
+
+        # sanity: both paths agree on the winners
+        expected = [it["id"] for it in FeedRankingEngine.rank_items(items[:5000])[:args.k]]
+        got = [it["id"] for it in FeedRankingEngine.rank_top_k(items[:5000], args.k)]
+        assert expected == got, "top-k disagrees with full sort"
+
+        for mode, fn in modes.items():
+            seconds = timed(fn, repeat=1 if n >= 1_000_000 else 3)
+            print(f"{n:>10} {mode:>13} {seconds:>9.4f} {n / seconds:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
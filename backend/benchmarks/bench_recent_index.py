@@ -0,0 +1,118 @@
+# benchmarks/bench_recent_index.py
+"""
+Feed candidates: created_at range query over `questions` vs the resident
+recent-question index.
+
+Usage (from backend/, against the database in DATABASE_URL):
+    DATABASE_URL=sqlite:////tmp/bench_recent.db python -m benchmarks.bench_recent_index
+    DATABASE_URL=postgresql://... python -m benchmarks.bench_recent_index --questions 100000 1000000
+
+For each table size N, N questions spread over --days days (with content of
+--content-bytes) are inserted above --id-base. Reports:
+  rebuild ms   loading the index (RecentQuestionIndex.rebuild)
+  index KB     resident size of the index arrays
+  db p50/p95   newest --pool live questions since --since-days, from the table
+  idx p50/p95  the same candidates from the index
+  trend        TrendingService candidate ids since --since-days: table vs index
+Rows are removed afterwards.
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from app.db.database import Base, SessionLocal, engine
+from app.models.user import User
+from app.models.question import Question
+from app.models.event import Event
+from app.services.feeds.recent_index import RecentQuestionIndex
+
+TABLES = [User.__table__, Question.__table__, Event.__table__]
+
+
+def cleanup(id_base: int) -> None:
+    with engine.begin() as conn:
+        conn.execute(Question.__table__.delete().where(Question.__table__.c.id >= id_base))
+
+
+def setup(questions: int, days: int, content_bytes: int, id_base: int) -> None:
+    now = datetime.utcnow()
+    content = "x" * content_bytes
+    rng = random.Random(questions)
+    with engine.begin() as conn:
+        for offset in range(0, questions, 10000):
+            conn.execute(Question.__table__.insert(), [{
+                "id": id_base + n, "title": f"bench {n}", "content": content, "user_id": None,
+                "created_at": now - timedelta(seconds=rng.randint(0, days * 86400)),
+                "is_deleted": n % 50 == 0, "content_version": 0,
+            } for n in range(offset, min(offset + 10000, questions))])
+
+
+def timed(fn, runs: int):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def pct(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p * len(values)))] if values else float("nan")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--since-days", type=int, default=30)
+    parser.add_argument("--pool", type=int, default=200)
+    parser.add_argument("--content-bytes", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--id-base", type=int, default=900_000_000)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(engine, tables=TABLES)
+    print(f"{engine.dialect.name}: questions over {args.days} days, pool of {args.pool} since {args.since_days} days")
+    print(f"{'questions':>9} {'rebuild ms':>10} {'index KB':>9} {'db p50':>8} {'db p95':>8}"
+          f" {'idx p50':>8} {'idx p95':>8} {'trend db':>9} {'trend idx':>9}")
+    try:
+        for questions in args.questions:
+            cleanup(args.id_base)
+            setup(questions, args.days, args.content_bytes, args.id_base)
+
+            index = RecentQuestionIndex(session_factory=SessionLocal, max_age_days=args.since_days + 1)
+            started = time.perf_counter()
+            index.rebuild()
+            rebuild_ms = (time.perf_counter() - started) * 1000
+
+            since = datetime.utcnow() - timedelta(days=args.since_days)
+            db = SessionLocal()
+            try:
+                live = db.query(Question.id, Question.created_at)\
+                    .filter(Question.is_deleted.isnot(True), Question.created_at >= since)
+
+                def from_db():
+                    return live.order_by(Question.created_at.desc()).limit(args.pool).all()
+
+                def trend_db():
+                    return [row.id for row in live.all()]
+
+                db_ms = timed(from_db, args.runs)
+                idx_ms = timed(lambda: index.recent(since, args.pool), args.runs)
+                trend_db_ms = timed(trend_db, max(1, args.runs // 10))
+                trend_idx_ms = timed(lambda: index.ids_since(since), max(1, args.runs // 10))
+            finally:
+                db.close()
+
+            print(f"{questions:>9} {rebuild_ms:>10.0f} {index.stats()['bytes'] / 1024:>9.0f}"
+                  f" {pct(db_ms, .5):>8.2f} {pct(db_ms, .95):>8.2f} {pct(idx_ms, .5):>8.3f} {pct(idx_ms, .95):>8.3f}"
+                  f" {statistics.median(trend_db_ms):>9.2f} {statistics.median(trend_idx_ms):>9.2f}")
+    finally:
+        cleanup(args.id_base)
+
+
+if __name__ == "__main__":
+    main()
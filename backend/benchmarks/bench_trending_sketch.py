@@ -0,0 +1,106 @@
+# benchmarks/bench_trending_sketch.py
+"""
+Trending backends: exact per-target window sums vs Count-Min + Space-Saving.
+
+Usage (from backend/):
+    python -m benchmarks.bench_trending_sketch
+    python -m benchmarks.bench_trending_sketch --targets 100000 1000000 --events 2000000 --k 50
+
+Feeds the same synthetic event stream (Zipf-distributed targets, events
+spread over the last 7 days, mixed event types) into TrendingEngine and
+SketchTrendingEngine through ingest(), no database involved. Reports, per
+window, memory held by each engine (tracemalloc), ingest rate, and how well
+the sketch top-k matches the exact one: recall of the exact top-k ids and
+the mean relative error of the sketch scores for those ids.
+"""
+import argparse
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from app.services.feeds.trending_engine import WINDOWS, SketchTrendingEngine, TrendingEngine
+
+EVENT_TYPES = ["question_liked"] * 6 + ["question_shared"] * 2 + ["question_disliked", "question_reported"]
+
+
+def make_events(targets: int, events: int, now: datetime, zipf: float, seed: int = 7):
+    rng = random.Random(seed)
+    # inverse-CDF sampling of a truncated power law over target ranks
+    weights = [1.0 / (rank ** zipf) for rank in range(1, targets + 1)]
+    ids = rng.sample(range(1, targets * 10), targets)
+    picked = rng.choices(ids, weights=weights, k=events)
+    week = 7 * 24 * 3600
+    return [
+        ("question", tid, rng.choice(EVENT_TYPES), now - timedelta(seconds=rng.uniform(0, week)))
+        for tid in picked
+    ]
+
+
+def feed(engine, events, now) -> float:
+    started = time.perf_counter()
+    for offset in range(0, len(events), 50000):
+        engine.ingest(events[offset:offset + 50000], now=now)
+    engine.refresh_top()
+    return time.perf_counter() - started
+
+
+def measure(make_engine, events, now):
+    """
+    Ingest time from an untraced run (tracemalloc slows allocation-heavy
+    code severalfold), memory from a second, traced run.
+    """
+    engine = make_engine()
+    seconds = feed(engine, events, now)
+    del engine
+
+    tracemalloc.start()
+    engine = make_engine()
+    feed(engine, events, now)
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return engine, seconds, held, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--targets", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--events", type=int, default=500_000)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--zipf", type=float, default=1.1)
+    parser.add_argument("--capacity", type=int, default=1000)
+    parser.add_argument("--epsilon", type=float, default=0.002)
+    parser.add_argument("--delta", type=float, default=0.01)
+    args = parser.parse_args()
+
+    now = datetime.utcnow()
+    print(f"{'targets':>9} {'backend':>7} {'ingest s':>9} {'ev/s':>10} {'held MB':>8} {'peak MB':>8}"
+          f"  window recall@k  rel.err")
+
+    for targets in args.targets:
+        events = make_events(targets, args.events, now, args.zipf)
+        makers = {
+            "exact": lambda: TrendingEngine(top_n=args.k),
+            "sketch": lambda: SketchTrendingEngine(
+                top_n=args.k, capacity=args.capacity, epsilon=args.epsilon, delta=args.delta
+            ),
+        }
+        engines = {}
+        for name, make_engine in makers.items():
+            engine, seconds, held, peak = measure(make_engine, events, now)
+            engines[name] = engine
+            print(f"{targets:>9} {name:>7} {seconds:>9.2f} {len(events) / seconds:>10,.0f}"
+                  f" {held / 1e6:>8.1f} {peak / 1e6:>8.1f}")
+
+        exact, sketch = engines["exact"], engines["sketch"]
+        for window in WINDOWS:
+            truth = {r["target_id"]: r["score"] for r in exact.get_trending("question", window, args.k)}
+            approx = {r["target_id"]: r["score"] for r in sketch.get_trending("question", window, args.k)}
+            recall = len(set(truth) & set(approx)) / max(len(truth), 1)
+            errors = [abs(approx[tid] - score) / abs(score) for tid, score in truth.items() if tid in approx and score]
+            rel_err = sum(errors) / len(errors) if errors else float("nan")
+            print(f"{'':>57}  {window:>6} {recall:>8.2f} {rel_err:>8.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+# scripts/backfill_comment_hierarchy.py
+"""
+Fill the comment hierarchy index (root_type/root_id/depth/path) for comments
+created before it existed. New comments are indexed on insert.
+
+Usage (from backend/):
+    python -m scripts.backfill_comment_hierarchy
+    python -m scripts.backfill_comment_hierarchy --batch-size 5000
+"""
+import argparse
+import logging
+
+from app.db.database import SessionLocal
+from app.services.content.comment_hierarchy import backfill_hierarchy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill materialized paths on comments")
+    parser.add_argument("--batch-size", type=int, default=1000, help="rows updated per transaction")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        result = backfill_hierarchy(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(f"Indexed {result['updated']} comment(s) over {result['levels']} level(s); "
+          f"{result['orphaned']} left without a reachable parent")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+# scripts/backfill_reactions.py
+"""
+Copy likes/dislikes/reports/shares from the per-type tables (question_likes,
+answer_reports, comment_shares, ..., and the generic reports table) into the
+unified reactions table. The API reads and writes reactions only.
+
+Run it once before deploying the code that uses the reactions table and
+once more right after, to pick up rows written in between. Then recount the
+denormalized counters:
+    python -m scripts.reconcile_counters
+
+Usage (from backend/):
+    python -m scripts.backfill_reactions
+    python -m scripts.backfill_reactions --batch-size 50000
+"""
+import argparse
+import logging
+
+from app.db.database import SessionLocal, engine
+from app.models.reaction import Reaction
+from app.services.content.reaction_backfill import backfill_reactions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill the reactions table from the per-type reaction tables")
+    parser.add_argument("--batch-size", type=int, default=10000, help="legacy ids copied per transaction")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    Reaction.__table__.create(bind=engine, checkfirst=True)
+    db = SessionLocal()
+    try:
+        result = backfill_reactions(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+    for table, inserted in result["tables"].items():
+        print(f"{table:>18}: {inserted}")
+    print(f"Copied {result['inserted']} reaction(s); {result['skipped_anonymous']} legacy row(s) without a user skipped")
+
+
+if __name__ == "__main__":
+    main()
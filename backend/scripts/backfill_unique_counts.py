@@ -0,0 +1,37 @@
+# scripts/backfill_unique_counts.py
+"""
+Build the unique viewer/engager sketches (and Question.views) from the
+events already stored. New events are counted by the event pipeline; this
+only covers history. Re-running is harmless: adding a visitor a sketch has
+already seen changes nothing.
+
+Usage (from backend/):
+    python -m scripts.backfill_unique_counts
+    python -m scripts.backfill_unique_counts --since-days 30 --batch-size 20000
+"""
+import argparse
+from datetime import datetime, timedelta
+
+from app.db.database import SessionLocal, engine
+from app.models.unique_sketch import UniqueSketch
+from app.services.events.unique_counter import UniqueCounterService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill unique viewer/engager sketches from stored events")
+    parser.add_argument("--since-days", type=int, default=None, help="only replay events from the last N days")
+    parser.add_argument("--batch-size", type=int, default=10000, help="events folded per transaction")
+    args = parser.parse_args()
+
+    since = datetime.utcnow() - timedelta(days=args.since_days) if args.since_days else None
+    UniqueSketch.__table__.create(bind=engine, checkfirst=True)
+    db = SessionLocal()
+    try:
+        total = UniqueCounterService(db).backfill(since=since, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(f"Replayed {total} event(s) into unique sketches")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+# scripts/rebuild_rollups.py
+"""
+Regenerate engagement rollups from the raw events table.
+
+Usage (from backend/):
+    python -m scripts.rebuild_rollups                       # everything
+    python -m scripts.rebuild_rollups --since 2024-05-01    # from a date
+    python -m scripts.rebuild_rollups --since 2024-05-01 --until 2024-05-08
+"""
+import argparse
+import logging
+from datetime import datetime
+
+from app.db.database import SessionLocal
+from app.services.events.rollup_service import RollupService
+
+
+def _parse_date(value: str) -> datetime:
+    return datetime.fromisoformat(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild hourly/daily engagement rollups from raw events")
+    parser.add_argument("--since", type=_parse_date, default=None, help="ISO date/time to rebuild from (default: first event)")
+    parser.add_argument("--until", type=_parse_date, default=None, help="ISO date/time to rebuild up to (default: now)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        days = RollupService(db).rebuild(since=args.since, until=args.until)
+    finally:
+        db.close()
+    print(f"Rebuilt rollups for {days} day(s)")
+
+
+if __name__ == "__main__":
+    main()
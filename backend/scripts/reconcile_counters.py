@@ -0,0 +1,49 @@
+# scripts/reconcile_counters.py
+"""
+Recount the denormalized counters on questions, answers and comments from
+their source tables and repair rows that drifted (e.g. write-behind deltas
+lost when a worker died). Safe to run while the API is serving traffic.
+
+Usage (from backend/):
+    python -m scripts.reconcile_counters                          # everything
+    python -m scripts.reconcile_counters --types answer comment --workers 8
+    python -m scripts.reconcile_counters --dry-run                # report only
+"""
+import argparse
+import logging
+
+from app.services.content.counter_reconciler import CounterReconciler, DEFAULT_CHUNK_SIZE
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recount denormalized counters and fix drifted rows")
+    parser.add_argument("--types", nargs="+", choices=["question", "answer", "comment"], default=None,
+                        help="target types to reconcile (default: all)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="ids per chunk")
+    parser.add_argument("--workers", type=int, default=4, help="worker processes (1 = run inline)")
+    parser.add_argument("--settle-seconds", type=float, default=None,
+                        help="wait before re-checking drifted rows (default: 2x counter flush interval + 1s)")
+    parser.add_argument("--dry-run", action="store_true", help="report drift without writing")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    options = {}
+    if args.settle_seconds is not None:
+        options["settle_seconds"] = args.settle_seconds
+    reconciler = CounterReconciler(
+        target_types=args.types, chunk_size=args.chunk_size, workers=args.workers, dry_run=args.dry_run, **options
+    )
+    totals = reconciler.run()
+
+    for target_type, total in totals.items():
+        print(f"{target_type}: checked={total['checked']} drifted={total['drifted']} fixed={total['fixed']} "
+              f"unstable={total['skipped_unstable']} concurrent={total['skipped_concurrent']}")
+        for column, col in sorted(total["columns"].items()):
+            if col["drifted"]:
+                print(f"  {column:>15}: rows={col['drifted']} abs_drift={col['abs_drift']} max={col['max_abs_drift']}")
+    if args.dry_run:
+        print("Dry run: nothing written")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# scripts/upgrade_schema.py
+"""
+Bring an existing database up to the current models. create_all only creates
+missing tables; this also adds the columns, indexes and unique keys since
+added to existing tables (questions.content_version and hot_*, the comment
+hierarchy columns, users.followers_count, events.sample_weight, ...).
+Idempotent: only what is missing is added, so it can be re-run.
+
+Run it before starting the new version, then the backfills
+(backfill_comment_hierarchy, backfill_reactions, backfill_unique_counts,
+rebuild_rollups, verify_hot_scores --fix).
+
+Usage (from backend/):
+    python -m scripts.upgrade_schema --dry-run
+    python -m scripts.upgrade_schema
+"""
+import argparse
+import logging
+import sys
+
+from app.db.database import engine
+from app.db.schema_upgrade import upgrade_schema
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Add missing columns and indexes to existing tables")
+    parser.add_argument("--dry-run", action="store_true", help="print the DDL without running it")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    result = upgrade_schema(engine, dry_run=args.dry_run)
+    for statement in result["applied"]:
+        print(f"{'would run' if args.dry_run else 'applied'}: {statement}")
+    for statement in result["failed"]:
+        print(f"FAILED: {statement}")
+    if not result["applied"] and not result["failed"]:
+        print("Schema is up to date")
+    if result["failed"]:
+        print("Remove duplicate rows behind any failed unique index and re-run", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
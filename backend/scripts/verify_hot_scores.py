@@ -0,0 +1,44 @@
+# scripts/verify_hot_scores.py
+"""
+Check stored hot scores against a full recomputation from raw events.
+
+Usage (from backend/):
+    python -m scripts.verify_hot_scores                 # report only
+    python -m scripts.verify_hot_scores --fix           # rewrite mismatches (backfill / half-life change)
+    python -m scripts.verify_hot_scores --target-type answer --tolerance 1e-4
+
+Exits with status 1 if mismatches were found and not fixed.
+"""
+import argparse
+import sys
+
+from app.db.database import SessionLocal
+from app.services.feeds.hot_score import HotScoreService, HOT_TARGET_TYPES
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify persisted hot scores against raw events")
+    parser.add_argument("--target-type", choices=HOT_TARGET_TYPES, action="append", help="defaults to all types")
+    parser.add_argument("--tolerance", type=float, default=1e-6, help="allowed difference in log2 units")
+    parser.add_argument("--fix", action="store_true", help="rewrite rows that don't match")
+    args = parser.parse_args()
+
+    failed = False
+    db = SessionLocal()
+    try:
+        service = HotScoreService(db)
+        for target_type in args.target_type or HOT_TARGET_TYPES:
+            report = service.verify(target_type, tolerance=args.tolerance, fix=args.fix)
+            print(
+                f"{target_type}: checked={report['checked']} mismatched={report['mismatched']} "
+                f"fixed={report['fixed']} sample={report['sample_ids']}"
+            )
+            failed = failed or (report["mismatched"] and not args.fix)
+    finally:
+        db.close()
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()